@@ -0,0 +1,73 @@
+"""Compare exact and approximate search in utils/vector_index.py.
+
+    python benchmark_vector_index.py                     # 1M x 128-d vectors
+    python benchmark_vector_index.py --n 100000 --dim 64 --kinds ivf
+
+Vectors are drawn around random cluster centres (uniform noise has no neighbourhood
+structure, which makes every approximate index look bad) and stored on disk in a
+temporary directory. Recall@k is measured against the exact results.
+"""
+import time
+import argparse
+import tempfile
+import numpy as np
+import faiss
+from utils.vector_index import VectorIndex
+
+def make_vectors(rng, n, dim, clusters=1000, block=100_000):
+    centres = rng.standard_normal((clusters, dim), dtype=np.float32)
+    for start in range(0, n, block):
+        size = min(block, n - start)
+        yield centres[rng.integers(clusters, size=size)] + 0.3 * rng.standard_normal((size, dim), dtype=np.float32)
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def latency_ms(index, queries, k):
+    """Mean time of one-query-at-a-time searches"""
+    _, elapsed = timed(lambda: [index.search(q, k) for q in queries])
+    return elapsed / len(queries) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--kinds", default="ivf,hnsw", help="approximate kinds to compare")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    queries = next(make_vectors(rng, args.queries, args.dim))
+
+    with tempfile.TemporaryDirectory() as path:
+        index = VectorIndex(args.dim, path=path, kind="flat")
+        first = True
+        start = time.perf_counter()
+        for vectors in make_vectors(rng, args.n, args.dim):
+            if first:
+                # The old utility added one reshaped vector per call
+                sample = vectors[:10_000]
+                flat = faiss.IndexFlatL2(args.dim)
+                _, one_by_one = timed(lambda: [flat.add(v.reshape(1, -1)) for v in sample])
+                _, bulk = timed(lambda: VectorIndex(args.dim).upsert(range(len(sample)), sample))
+                print(f"add {len(sample):,} vectors: one at a time {one_by_one:.3f}s, bulk upsert {bulk:.3f}s")
+                first = False
+            index.upsert(range(index.count, index.count + len(vectors)), vectors)
+        index.save()
+        print(f"upserted {len(index):,} x {args.dim}-d vectors in {time.perf_counter() - start:.1f}s")
+
+        (exact, _), batch = timed(lambda: index.search(queries, args.k))
+        print(f"\n{'kind':<6} {'build s':>8} {'batch ms/q':>11} {'single ms/q':>12} {'recall@' + str(args.k):>10}")
+        print(f"{'flat':<6} {'-':>8} {batch / len(queries) * 1000:>11.3f} {latency_ms(index, queries[:20], args.k):>12.3f} {1:>10.3f}")
+
+        for kind in filter(None, args.kinds.split(",")):
+            index.kind = kind
+            _, build = timed(index.build)
+            (found, _), batch = timed(lambda: index.search(queries, args.k))
+            recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(found, exact)])
+            print(f"{kind:<6} {build:>8.1f} {batch / len(queries) * 1000:>11.3f} {latency_ms(index, queries[:200], args.k):>12.3f} {recall:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
+import asyncio
 from flow import chat_flow
 
-def run_chat_memory_demo():
+async def run_chat_memory_demo():
     """
     Run an interactive chat interface with memory retrieval.
     
@@ -20,7 +21,7 @@ def run_chat_memory_demo():
     print("=" * 50)
     
     # Run the chat flow
-    chat_flow.run({})
+    await chat_flow.run({})
 
 if __name__ == "__main__":
-    run_chat_memory_demo()
\ No newline at end of file
+    asyncio.run(run_chat_memory_demo())
\ No newline at end of file
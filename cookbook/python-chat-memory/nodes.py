@@ -1,5 +1,5 @@
 from brainyflow import Node
-from utils.vector_index import create_index, add_vector, search_vectors
+from utils.vector_index import VectorIndex
 from utils.call_llm import call_llm
 from utils.get_embedding import get_embedding
 
@@ -129,11 +129,13 @@ class EmbedNode(Node):
             
         # Initialize vector index if not exist
         if "vector_index" not in shared:
-            shared["vector_index"] = create_index()
+            shared["vector_index"] = VectorIndex(dimension=len(exec_res["embedding"]))
             shared["vector_items"] = []  # Track items separately
             
         # Add the embedding to the index and store the conversation
-        position = add_vector(shared["vector_index"], exec_res["embedding"])
+        # The conversation's position in vector_items doubles as its id in the index
+        position = len(shared["vector_items"])
+        shared["vector_index"].upsert([position], [exec_res["embedding"]])
         shared["vector_items"].append(exec_res["conversation"])
         
         print(f"✅ Added conversation to index at position {position}")
@@ -179,7 +181,7 @@ class RetrieveNode(Node):
         query_embedding = get_embedding(query)
         
         # Search for the most similar conversation
-        indices, distances = search_vectors(vector_index, query_embedding, k=1)
+        indices, distances = vector_index.search(query_embedding, k=1)
         
         if not indices:
             return None
@@ -1,65 +1,252 @@
+import os
+import json
 import numpy as np
-import faiss
 
-def create_index(dimension=1536):
-    return faiss.IndexFlatL2(dimension)
+class VectorIndex:
+    """A vector store with bulk upserts, batched search, deletes and on-disk persistence.
+
+    Rows are append-only: an upsert writes new rows and marks the rows it replaces as
+    deleted, and `compact()` reclaims them. With a `path`, vectors live in memory-mapped
+    files, so a large index opens instantly and is paged in on demand.
+
+    Search is exact (squared L2, like `faiss.IndexFlatL2`) until the index holds
+    `approximate_threshold` vectors, then switches to a FAISS approximate index
+    (`kind="ivf"` or `"hnsw"`). Pass `kind="flat"` to always search exactly.
+    """
+
+    def __init__(self, dimension=1536, path=None, kind="auto", approximate_threshold=50_000, nprobe=32, ef_search=128):
+        if kind not in ("auto", "flat", "ivf", "hnsw"):
+            raise ValueError(f"Unknown index kind {kind!r}")
+        self.dimension, self.path, self.kind = dimension, path, kind
+        self.approximate_threshold, self.nprobe, self.ef_search = approximate_threshold, nprobe, ef_search
+        self.count = 0  # rows written, including deleted ones
+        self.positions = {}  # id -> row
+        self.ann = None  # approximate index over rows [0, ann_rows)
+        self.ann_rows = 0
+        self.ann_kind = None
+        self.stale = 0  # deleted rows still present in the approximate index
+        capacity = 1024
+        if path and os.path.exists(os.path.join(path, "meta.json")):
+            with open(os.path.join(path, "meta.json")) as f:
+                meta = json.load(f)
+            self.dimension, self.count, capacity = meta["dimension"], meta["count"], meta["capacity"]
+            self.ann_rows, self.ann_kind = meta.get("ann_rows", 0), meta.get("ann_kind")
+        elif path:
+            os.makedirs(path, exist_ok=True)
+        self._allocate(capacity)
+        alive = np.flatnonzero(self.alive[:self.count])
+        self.positions = dict(zip(self.ids[alive].tolist(), alive.tolist()))
+        if self.ann_kind and os.path.exists(os.path.join(path, "ann.faiss")):
+            import faiss
+            self.ann = faiss.read_index(os.path.join(path, "ann.faiss"))
+            self._index_rows()  # rows written after the last save
+            self.stale = self.ann_rows - int(self.alive[:self.ann_rows].sum())
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, id):
+        return id in self.positions
+
+    def _allocate(self, capacity):
+        """(Re)open the row storage with room for `capacity` rows"""
+        columns = {"vectors": (np.float32, (capacity, self.dimension)), "norms": (np.float32, (capacity,)),
+                   "ids": (np.int64, (capacity,)), "alive": (np.bool_, (capacity,))}
+        for name, (dtype, shape) in columns.items():
+            old = getattr(self, name, None)
+            if self.path:
+                if old is not None:
+                    old.flush()
+                    setattr(self, name, None)
+                    del old  # release the mapping before growing the file
+                filename = os.path.join(self.path, f"{name}.bin")
+                with open(filename, "ab") as f:
+                    f.truncate(int(np.prod(shape)) * np.dtype(dtype).itemsize)
+                setattr(self, name, np.memmap(filename, dtype=dtype, mode="r+", shape=shape))
+            else:
+                new = np.zeros(shape, dtype=dtype)
+                if old is not None:
+                    new[:self.count] = old[:self.count]
+                setattr(self, name, new)
+        self.capacity = capacity
+
+    def upsert(self, ids, vectors):
+        """Insert or replace many vectors at once; `vectors` has shape (len(ids), dimension)"""
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dimension)
+        if len(set(ids.tolist())) != len(ids):
+            # Keep only the last vector given for a repeated id
+            _, last = np.unique(ids[::-1], return_index=True)
+            keep = np.sort(len(ids) - 1 - last)
+            ids, vectors = ids[keep], vectors[keep]
+        self.delete(ids)
+
+        start, end = self.count, self.count + len(ids)
+        if end > self.capacity:
+            self._allocate(max(end, self.capacity * 2))
+        self.vectors[start:end] = vectors
+        self.norms[start:end] = np.einsum("ij,ij->i", vectors, vectors)
+        self.ids[start:end] = ids
+        self.alive[start:end] = True
+        self.count = end
+        self.positions.update(zip(ids.tolist(), range(start, end)))
+        if self.ann is not None:
+            self._index_rows()
+
+    def delete(self, ids):
+        """Remove vectors by id; unknown ids are ignored"""
+        rows = [self.positions.pop(id) for id in np.asarray(ids, dtype=np.int64).reshape(-1).tolist() if id in self.positions]
+        self.alive[rows] = False
+        self.stale += sum(row < self.ann_rows for row in rows)
+
+    def search(self, queries, k=1):
+        """Find the `k` nearest vectors to each query.
+
+        Returns (ids, distances). For a single query vector these are flat lists,
+        for a (n, dimension) batch they are lists of n lists.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        single = queries.ndim == 1
+        queries = queries.reshape(-1, self.dimension)
+        k = min(k, len(self))
+        if k == 0:
+            ids, distances = [[] for _ in queries], [[] for _ in queries]
+        else:
+            if self._wants_ann() and (self.ann is None or self.stale > len(self) // 4):
+                self.build()
+            rows, distances = self._search_ann(queries, k) if self.ann is not None else self._search_exact(queries, k)
+            ids = [self.ids[r[r >= 0]].tolist() for r in rows]
+            distances = [d[r >= 0].tolist() for r, d in zip(rows, distances)]
+        return (ids[0], distances[0]) if single else (ids, distances)
+
+    def _search_exact(self, queries, k):
+        """Brute-force search over the rows in blocks, keeping a running top-k"""
+        best_d = np.full((len(queries), k), np.inf, dtype=np.float32)
+        best_r = np.full((len(queries), k), -1, dtype=np.int64)
+        q_norms = np.einsum("ij,ij->i", queries, queries)[:, None]
+        block = max(4096, (1 << 24) // len(queries))  # bound the distance matrix to ~64MB
+        for start in range(0, self.count, block):
+            end = min(start + block, self.count)
+            d = q_norms - 2 * queries @ self.vectors[start:end].T + self.norms[start:end]
+            d[:, ~self.alive[start:end]] = np.inf
+            d = np.concatenate([best_d, d], axis=1)
+            r = np.concatenate([best_r, np.broadcast_to(np.arange(start, end), (len(queries), end - start))], axis=1)
+            top = np.argpartition(d, k - 1, axis=1)[:, :k]
+            best_d, best_r = np.take_along_axis(d, top, 1), np.take_along_axis(r, top, 1)
+        order = np.argsort(best_d, axis=1)
+        best_d, best_r = np.take_along_axis(best_d, order, 1), np.take_along_axis(best_r, order, 1)
+        best_r[np.isinf(best_d)] = -1
+        return best_r, np.maximum(best_d, 0)
+
+    def _search_ann(self, queries, k):
+        # Deleted rows stay in the approximate index, so fetch enough extra to skip them
+        distances, rows = self.ann.search(queries, k + self.stale)
+        dead = rows >= 0
+        dead[dead] = ~self.alive[rows[dead]]
+        distances[dead], rows[dead] = np.inf, -1
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(rows, order, 1), np.take_along_axis(distances, order, 1)
+
+    def _wants_ann(self):
+        return self.kind in ("ivf", "hnsw") or (self.kind == "auto" and len(self) >= self.approximate_threshold)
+
+    def build(self):
+        """(Re)build the approximate index over the live rows"""
+        import faiss
+        self.compact()
+        self.ann_kind = "hnsw" if self.kind == "hnsw" else "ivf"
+        if self.ann_kind == "hnsw":
+            self.ann = faiss.IndexHNSWFlat(self.dimension, 32)
+            self.ann.hnsw.efConstruction = 200
+        else:
+            nlist = max(1, min(int(4 * np.sqrt(self.count)), self.count // 39))
+            self.ann = faiss.IndexIVFFlat(faiss.IndexFlatL2(self.dimension), self.dimension, nlist)
+            sample = np.random.default_rng(0).choice(self.count, min(self.count, 64 * nlist), replace=False)
+            self.ann.train(np.ascontiguousarray(self.vectors[np.sort(sample)]))
+        self.ann_rows, self.stale = 0, 0
+        self._index_rows()
+
+    def _index_rows(self, block=100_000):
+        """Add rows written since the approximate index was last extended"""
+        if self.ann_kind == "hnsw":
+            self.ann.hnsw.efSearch = self.ef_search
+        else:
+            self.ann.nprobe = self.nprobe
+        for start in range(self.ann_rows, self.count, block):
+            end = min(start + block, self.count)
+            if self.ann_kind == "hnsw":
+                self.ann.add(np.ascontiguousarray(self.vectors[start:end]))  # HNSW ids are row numbers
+            else:
+                self.ann.add_with_ids(np.ascontiguousarray(self.vectors[start:end]), np.arange(start, end, dtype=np.int64))
+        self.ann_rows = self.count
+
+    def compact(self):
+        """Drop deleted rows, renumbering the rest (invalidates the approximate index)"""
+        if len(self) == self.count:
+            return
+        keep = np.flatnonzero(self.alive[:self.count])
+        for name in ("vectors", "norms", "ids", "alive"):
+            column = getattr(self, name)
+            column[:len(keep)] = column[keep]
+        self.alive[len(keep):self.count] = False
+        self.count = len(keep)
+        self.positions = dict(zip(self.ids[:self.count].tolist(), range(self.count)))
+        self.ann, self.ann_kind, self.ann_rows, self.stale = None, None, 0, 0
+
+    def save(self):
+        """Flush vectors and metadata to `path`"""
+        if not self.path:
+            raise ValueError("VectorIndex was created without a path")
+        for name in ("vectors", "norms", "ids", "alive"):
+            getattr(self, name).flush()
+        if self.ann is not None:
+            import faiss
+            faiss.write_index(self.ann, os.path.join(self.path, "ann.faiss"))
+        meta = {"dimension": self.dimension, "count": self.count, "capacity": self.capacity,
+                "ann_rows": self.ann_rows, "ann_kind": self.ann_kind}
+        with open(os.path.join(self.path, "meta.json.tmp"), "w") as f:
+            json.dump(meta, f)
+        os.replace(os.path.join(self.path, "meta.json.tmp"), os.path.join(self.path, "meta.json"))
+
+def create_index(dimension=1536, path=None):
+    return VectorIndex(dimension, path=path)
 
 def add_vector(index, vector):
-    # Make sure the vector is a numpy array with the right shape for FAISS
-    vector = np.array(vector).reshape(1, -1).astype(np.float32)
-    
-    # Add the vector to the index
-    index.add(vector)
-    
-    # Return the position (index.ntotal is the total number of vectors in the index)
-    return index.ntotal - 1
+    """Add one vector and return its position (prefer `index.upsert` for many vectors)"""
+    position = max(index.positions, default=-1) + 1
+    index.upsert([position], [vector])
+    return position
 
 def search_vectors(index, query_vector, k=1):
     """Search for the k most similar vectors to the query vector
-    
+
     Args:
-        index: The FAISS index
+        index: The VectorIndex
         query_vector: The query vector (numpy array or list)
         k: Number of results to return (default: 1)
-        
+
     Returns:
         tuple: (indices, distances) where:
             - indices is a list of positions in the index
             - distances is a list of the corresponding distances
     """
-    # Make sure we don't try to retrieve more vectors than exist in the index
-    k = min(k, index.ntotal)
-    if k == 0:
-        return [], []
-        
-    # Make sure the query is a numpy array with the right shape for FAISS
-    query_vector = np.array(query_vector).reshape(1, -1).astype(np.float32)
-    
-    # Search the index
-    distances, indices = index.search(query_vector, k)
-    
-    return indices[0].tolist(), distances[0].tolist()
+    return index.search(np.asarray(query_vector, dtype=np.float32).reshape(-1), k)
 
 # Example usage
 if __name__ == "__main__":
     # Create a new index
     index = create_index(dimension=3)
-    
-    # Add some random vectors and track them separately
-    items = []
-    for i in range(5):
-        vector = np.random.random(3)
-        position = add_vector(index, vector)
-        items.append(f"Item {i}")
-        print(f"Added vector at position {position}")
-        
-    print(f"Index contains {index.ntotal} vectors")
-    
-    # Search for a similar vector
-    query = np.random.random(3)
-    indices, distances = search_vectors(index, query, k=2)
-    
-    print("Query:", query)
+
+    # Add some random vectors in a single call, keyed by item number
+    items = [f"Item {i}" for i in range(5)]
+    index.upsert(range(5), np.random.random((5, 3)))
+    print(f"Index contains {len(index)} vectors")
+
+    # Search for the 2 nearest vectors to each of 2 queries at once
+    queries = np.random.random((2, 3))
+    indices, distances = index.search(queries, k=2)
+
+    print("Queries:", queries)
     print("Found indices:", indices)
     print("Distances:", distances)
-    print("Retrieved items:", [items[idx] for idx in indices]) 
\ No newline at end of file
+    print("Retrieved items:", [[items[idx] for idx in row] for row in indices])
@@ -0,0 +1,37 @@
+import re
+import collections
+from brainyflow import Node, ParallelBatchFlow
+
+class AnalyzeDocument(Node):
+    """CPU-bound work per document: word statistics"""
+    async def prep(self, shared):
+        return self.params["doc_id"], self.params["text"]
+
+    async def exec(self, inputs):
+        doc_id, text = inputs
+        words = re.findall(r"[a-z']+", text.lower())
+        counts = collections.Counter(words)
+        # Make the work heavy enough for parallelism to matter
+        for _ in range(20):
+            counts = collections.Counter(re.findall(r"[a-z']+", text.lower()))
+        return {"doc_id": doc_id, "words": len(words), "top": counts.most_common(3)}
+
+    async def post(self, shared, prep_res, exec_res):
+        # Each run's changes are merged into the driver's shared store when it completes:
+        # dicts per key, and total_words by adding up each run's delta (see AnalyzeCorpus.merge)
+        shared["stats"][exec_res["doc_id"]] = exec_res["top"]
+        shared["total_words"] += exec_res["words"]
+
+class AnalyzeCorpus(ParallelBatchFlow):
+    async def prep(self, shared):
+        # Documents travel in params: the shared store is shipped to every worker, so keep it small
+        return [{"doc_id": i, "text": text} for i, text in enumerate(shared.pop("documents"))]
+
+    def merge(self, key, base, old, new):
+        # total_words is a counter: add up each run's increment (plain numbers are last-writer-wins)
+        if key == "total_words":
+            return base + new - old
+        return super().merge(key, base, old, new)
+
+def create_flow(executor=None):
+    return AnalyzeCorpus(start=AnalyzeDocument(), executor=executor)
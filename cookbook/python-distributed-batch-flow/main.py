@@ -0,0 +1,41 @@
+import sys
+import time
+import random
+import asyncio
+from flow import create_flow
+from queue_executor import QueueExecutor
+
+WORDS = "the quick brown fox jumps over lazy dog flow node batch worker queue shared store".split()
+
+def make_documents(n, rng=random.Random(0)):
+    return [" ".join(rng.choice(WORDS) for _ in range(2000)) for _ in range(n)]
+
+async def run(label, executor, documents):
+    shared = {"documents": documents, "stats": {}, "total_words": 0}
+    start = time.perf_counter()
+    await create_flow(executor).run(shared)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:6.2f}s  {len(shared['stats'])} docs, {shared['total_words']:,} words")
+    return elapsed
+
+async def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    documents = make_documents(n)
+    print(f"Analyzing {n} documents\n")
+
+    # 1. Everything on the event loop (CPU-bound work runs one document at a time)
+    await run("in the event loop", None, documents)
+
+    # 2. A local process pool
+    await run("executor='process'", "process", documents)
+
+    # 3. The queue stand-in with 4 local workers; more can join from other machines
+    executor = QueueExecutor(workers=4)
+    print(f"(queue server at {executor.address[0]}:{executor.address[1]})")
+    try:
+        await run("QueueExecutor(workers=4)", executor, documents)
+    finally:
+        executor.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""A queue-backed executor: a local stand-in for a Redis (or SQS, RabbitMQ...) work queue.
+
+The driver pushes pickled tasks onto a `tasks` queue and reads outcomes from a `results`
+queue. Both queues are served over TCP by a `multiprocessing` manager, so workers can run
+on this machine (`workers=N`) or on any other one (`python worker.py HOST:PORT`).
+
+Tasks and results are pickles, so anyone who knows the authkey can run code on the driver
+and the workers. There is no default key: the driver takes QUEUE_AUTHKEY (or `authkey=`)
+and otherwise makes a random one, which it prints when the server is reachable from
+other machines. Workers on other machines need the same QUEUE_AUTHKEY.
+"""
+import os
+import sys
+import uuid
+import secrets
+import ipaddress
+import pickle
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import Executor, Future
+from multiprocessing.managers import BaseManager
+
+def _env_authkey():
+    key = os.environ.get("QUEUE_AUTHKEY")
+    return key.encode() if key else None
+
+def _loopback(host):
+    try:
+        return host == "localhost" or ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+class QueueManager(BaseManager):
+    pass
+
+_tasks, _results = queue.Queue(), queue.Queue()
+
+def _get_tasks():
+    return _tasks
+
+def _get_results():
+    return _results
+
+QueueManager.register("tasks", callable=_get_tasks)
+QueueManager.register("results", callable=_get_results)
+
+def serve_worker(address, authkey=None):
+    """Run tasks from the queue at `address` until a stop message arrives"""
+    authkey = authkey or _env_authkey()
+    if not authkey:
+        raise ValueError("Set QUEUE_AUTHKEY to the key the driver uses")
+    manager = QueueManager(address=address, authkey=authkey)
+    manager.connect()
+    tasks, results = manager.tasks(), manager.results()
+    while True:
+        task_id, payload = tasks.get()
+        if task_id is None:
+            break
+        try:
+            fn, args, kwargs = pickle.loads(payload)
+            outcome = (True, fn(*args, **kwargs))
+        except Exception as e:
+            outcome = (False, e)
+        try:
+            results.put((task_id, pickle.dumps(outcome)))
+        except Exception as e:  # the result or exception itself isn't picklable
+            results.put((task_id, pickle.dumps((False, RuntimeError(repr(e))))))
+
+class QueueExecutor(Executor):
+    """Executor whose tasks go through the queue server, to be run by any connected worker.
+
+    `_max_workers` tells ParallelBatchFlow how many runs to keep queued at a time;
+    set it to roughly the total number of workers you expect to connect.
+    """
+
+    def __init__(self, address=("127.0.0.1", 0), workers=0, max_workers=None, authkey=None):
+        authkey = authkey or _env_authkey()
+        if not authkey:
+            authkey = secrets.token_hex(16).encode()
+            if not _loopback(address[0]):
+                print(f"Queue authkey (start workers with QUEUE_AUTHKEY={authkey.decode()}): keep it secret", file=sys.stderr)
+        self._manager = QueueManager(address=address, authkey=authkey)
+        self._manager.start()
+        self.address = self._manager.address
+        self._tasks, self._results = self._manager.tasks(), self._manager.results()
+        self._futures, self._lock = {}, threading.Lock()
+        self._workers = [
+            multiprocessing.get_context("spawn").Process(target=serve_worker, args=(self.address, authkey), daemon=True)
+            for _ in range(workers)
+        ]
+        for w in self._workers:
+            w.start()
+        self._max_workers = max_workers or workers or os.cpu_count()
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+
+    def submit(self, fn, /, *args, **kwargs):
+        future, task_id = Future(), uuid.uuid4().hex
+        with self._lock:
+            self._futures[task_id] = future
+        self._tasks.put((task_id, pickle.dumps((fn, args, kwargs))))
+        return future
+
+    def _read_results(self):
+        while True:
+            task_id, payload = self._results.get()
+            if task_id is None:
+                return
+            with self._lock:
+                future = self._futures.pop(task_id, None)
+            # A future cancelled by the driver (e.g. its flow timed out) just drops the result
+            if future is None or not future.set_running_or_notify_cancel():
+                continue
+            ok, value = pickle.loads(payload)
+            future.set_result(value) if ok else future.set_exception(value)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        for _ in self._workers:
+            self._tasks.put((None, None))
+        if wait:
+            for w in self._workers:
+                w.join()
+        self._results.put((None, None))
+        self._reader.join()
+        self._manager.shutdown()
+
+if __name__ == "__main__":
+    print("Usage: python worker.py HOST:PORT", file=sys.stderr)
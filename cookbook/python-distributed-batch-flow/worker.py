@@ -0,0 +1,14 @@
+"""Connect to a QueueExecutor's queue server and run batch flow tasks.
+
+    python worker.py 127.0.0.1:50000
+
+Start as many as you like, on any machine that can reach the driver and import this
+example's modules (the flow's nodes are unpickled in the worker).
+"""
+import sys
+from queue_executor import serve_worker
+
+if __name__ == "__main__":
+    host, port = sys.argv[1].rsplit(":", 1)
+    print(f"Worker connected to {host}:{port}")
+    serve_worker((host, int(port)))
@@ -1,51 +1,62 @@
-import time
 import threading
 import asyncio
 from brainyflow import Node, Flow
-from utils import fake_stream_llm, stream_llm
+from utils import fake_stream_llm
+
+def listen_for_enter():
+    """Return an event that is set once the user presses ENTER"""
+    loop, pressed = asyncio.get_running_loop(), asyncio.Event()
+
+    def wait_for_enter():
+        input("Press ENTER at any time to interrupt streaming...\n")
+        loop.call_soon_threadsafe(pressed.set)
+
+    # A daemon thread doesn't keep the program alive once the flow is done
+    threading.Thread(target=wait_for_enter, daemon=True).start()
+    return pressed
 
 class StreamNode(Node):
     async def prep(self, shared):
-        # Create interrupt event
-        interrupt_event = threading.Event()
-
-        # Start a thread to listen for user interrupt
-        def wait_for_interrupt():
-            input("Press ENTER at any time to interrupt streaming...\n")
-            interrupt_event.set()
-        listener_thread = threading.Thread(target=wait_for_interrupt)
-        listener_thread.start()
-        
         # Get prompt from shared store
-        prompt = shared["prompt"]
-        # Get chunks from LLM function
-        chunks = fake_stream_llm(prompt)
-        return chunks, interrupt_event, listener_thread
-
-    async def exec(self, prep_res):
-        chunks, interrupt_event, listener_thread = prep_res
-        for chunk in chunks:
-            if interrupt_event.is_set():
-                print("User interrupted streaming.")
-                break
-            
+        return shared["prompt"]
+
+    async def exec(self, prompt):
+        # An async generator: each chunk is handed to the next node as soon as it arrives
+        for chunk in fake_stream_llm(prompt):
             if hasattr(chunk.choices[0].delta, 'content') and chunk.choices[0].delta.content is not None:
-                chunk_content = chunk.choices[0].delta.content
-                print(chunk_content, end="", flush=True)
                 await asyncio.sleep(0.1)  # simulate latency
-        return interrupt_event, listener_thread
+                yield chunk.choices[0].delta.content
 
     async def post(self, shared, prep_res, exec_res):
-        interrupt_event, listener_thread = exec_res
-        # Join the interrupt listener so it doesn't linger
-        interrupt_event.set()
-        listener_thread.join()
+        # exec_res is a Stream: the flow moves on while chunks are still being generated
+        shared["response"] = exec_res
         return "default"
 
+class PrintNode(Node):
+    async def prep(self, shared):
+        return shared["response"]
+
+    async def exec(self, stream):
+        interrupted = listen_for_enter()
+        text = ""
+        async for chunk in stream:
+            if interrupted.is_set():
+                # Stop the producer too, so no more chunks are generated
+                await stream.aclose()
+                print("\nUser interrupted streaming.")
+                break
+            print(chunk, end="", flush=True)
+            text += chunk
+        return text
+
+    async def post(self, shared, prep_res, exec_res):
+        shared["text"] = exec_res
+
 async def main():
     # Usage:
-    node = StreamNode()
-    flow = Flow(start=node)
+    stream_node = StreamNode()
+    stream_node >> PrintNode()
+    flow = Flow(start=stream_node)
 
     shared = {"prompt": "What's the meaning of life?"}
     await flow.run(shared)
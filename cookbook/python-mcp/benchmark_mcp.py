@@ -0,0 +1,57 @@
+"""Tool-call latency against simple_server.py: a new server per call vs pooled sessions.
+
+    python benchmark_mcp.py                  # 5 calls per approach
+    python benchmark_mcp.py --calls 20 --concurrent 200
+
+"spawn per call" is what utils.call_tool used to do: start the server process and
+run the MCP handshake for every call. "pooled" reuses one MCPSessionPool session.
+"""
+import sys
+import time
+import asyncio
+import argparse
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from utils import MCPSessionPool
+
+SERVER = "simple_server.py"
+
+async def spawn_per_call(a, b):
+    params = StdioServerParameters(command=sys.executable, args=[SERVER])
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            return (await session.call_tool("add", {"a": a, "b": b})).content[0].text
+
+async def timed(name, calls, coro):
+    start = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {elapsed / calls * 1000:>10.1f} ms/call {calls / elapsed:>10.1f} calls/s")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5)
+    parser.add_argument("--concurrent", type=int, default=100)
+    parser.add_argument("--size", type=int, default=2, help="server processes in the pool")
+    args = parser.parse_args()
+
+    async def sequential(call):
+        for i in range(args.calls):
+            await call(i, i)
+
+    await timed("spawn per call", args.calls, sequential(spawn_per_call))
+    pool = MCPSessionPool(SERVER, size=args.size)
+    # Start the pool's servers outside the timings
+    await asyncio.gather(*(pool.call_tool("add", {"a": i, "b": i}) for i in range(args.size * 4)))
+    await pool.list_tools()
+    try:
+        await timed("pooled", args.calls, sequential(lambda a, b: pool.call_tool("add", {"a": a, "b": b})))
+        await timed(f"pooled, {args.concurrent} at once", args.concurrent,
+                    asyncio.gather(*(pool.call_tool("add", {"a": i, "b": i}) for i in range(args.concurrent))))
+        await timed("cached list_tools", args.calls, sequential(lambda a, b: pool.list_tools()))
+    finally:
+        await pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
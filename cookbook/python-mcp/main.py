@@ -1,7 +1,8 @@
 from brainyflow import Node, Flow
-from utils import call_llm, get_tools, call_tool
+from utils import call_llm, get_tools, call_tool, close_pools, close_client
 import yaml
 import sys
+import asyncio
 
 class GetToolsNode(Node):
     async def prep(self, shared):
@@ -12,7 +13,7 @@ class GetToolsNode(Node):
 
     async def exec(self, server_path):
         """Retrieve tools from the MCP server"""
-        tools = get_tools(server_path)
+        tools = await get_tools(server_path)
         return tools
 
     async def post(self, shared, prep_res, exec_res):
@@ -76,7 +77,7 @@ IMPORTANT:
     async def exec(self, prompt):
         """Call LLM to process the question and decide which tool to use"""
         print("🤔 Analyzing question and deciding which tool to use...")
-        response = call_llm(prompt)
+        response = await call_llm(prompt)
         return response
 
     async def post(self, shared, prep_res, exec_res):
@@ -107,7 +108,7 @@ class ExecuteToolNode(Node):
         """Execute the chosen tool"""
         tool_name, parameters = inputs
         print(f"🔧 Executing tool '{tool_name}' with parameters: {parameters}")
-        result = call_tool("simple_server.py", tool_name, parameters)
+        result = await call_tool("simple_server.py", tool_name, parameters)
         return result
 
     async def post(self, shared, prep_res, exec_res):
@@ -115,7 +116,7 @@ class ExecuteToolNode(Node):
         return "done"
 
 
-if __name__ == "__main__":
+async def main():
     # Default question
     default_question = "What is 982713504867129384651 plus 73916582047365810293746529?"
     
@@ -140,4 +141,12 @@ if __name__ == "__main__":
     # Create and run flow
     flow = Flow(start=get_tools_node)
     shared = {"question": question}
-    await flow.run(shared)
\ No newline at end of file
+    try:
+        await flow.run(shared)
+    finally:
+        # Stop the MCP server processes kept alive between steps, and the LLM client's connections
+        await close_pools()
+        await close_client()
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
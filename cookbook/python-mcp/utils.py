@@ -1,35 +1,163 @@
-from openai import OpenAI
+from openai import AsyncOpenAI
 import os
+import sys
+import time
 import asyncio
-from mcp import ClientSession, StdioServerParameters
+from mcp import ClientSession, StdioServerParameters, types
 from mcp.client.stdio import stdio_client
 
-def call_llm(prompt):    
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY", "your-api-key"))
-    r = client.chat.completions.create(
+_client = None
+
+def get_client():
+    """Return the process-wide async client
+
+    Its pool of keep-alive connections is shared by every call_llm, instead of a new
+    client (and connection) per call. The client must be used from a single event loop.
+    """
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY", "your-api-key"))
+    return _client
+
+async def close_client():
+    """Close the pooled connections (call once, before the event loop ends)"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+async def call_llm(prompt):
+    r = await get_client().chat.completions.create(
         model="gpt-4o",
         messages=[{"role": "user", "content": prompt}]
     )
     return r.choices[0].message.content
 
-def get_tools(server_script_path):
-    """Get available tools from an MCP server.
+class MCPSessionPool:
+    """Long-lived client sessions to one stdio MCP server, shared by every step of an agent loop
+
+    Server processes are spawned (and the MCP handshake done) on first use, then kept
+    running: up to `size` of them, a new one being added only while all others are busy.
+    Each session multiplexes concurrent requests over its pipe, and a call goes to the
+    session with the fewest calls in flight. `list_tools()` is cached until the server
+    announces a change (notifications/tools/list_changed), `tools_ttl` seconds pass, or a
+    session is restarted. A session whose server process died is replaced on next use.
     """
-    async def _get_tools():
-        server_params = StdioServerParameters(
-            command="python",
-            args=[server_script_path]
-        )
-        
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                tools_response = await session.list_tools()
-                return tools_response.tools
-    
-    return asyncio.run(_get_tools())
 
-def local_get_tools(server_script_path=None):
+    def __init__(self, server_script_path, size=1, command=sys.executable, tools_ttl=None):
+        self.params = StdioServerParameters(command=command, args=[server_script_path])
+        self.size, self.tools_ttl = size, tools_ttl
+        self.sessions = []
+        self._lock = asyncio.Lock()
+        self._tools, self._tools_at = None, 0.0
+
+    def invalidate_tools(self):
+        self._tools = None
+
+    async def _on_message(self, message):
+        if isinstance(getattr(message, "root", message), types.ToolListChangedNotification):
+            self.invalidate_tools()
+
+    async def _session(self):
+        """The least busy live session, starting one if every session is busy and there is room"""
+        async with self._lock:
+            self.sessions = [s for s in self.sessions if s.alive]
+            idle = min(self.sessions, key=lambda s: s.in_flight, default=None)
+            if idle is None or (idle.in_flight and len(self.sessions) < self.size):
+                idle = _Session(self.params, self._on_message)
+                await idle.start()
+                self.sessions.append(idle)
+                self.invalidate_tools()  # a new server process may expose different tools
+            return idle
+
+    async def _request(self, call):
+        for attempt in range(2):
+            session = await self._session()
+            session.in_flight += 1
+            try:
+                return await call(session.session)
+            except Exception:
+                if attempt or await session.healthy():
+                    raise  # a real error, not a dead server: don't repeat the call
+                await session.close()
+            finally:
+                session.in_flight -= 1
+
+    async def list_tools(self, refresh=False):
+        expired = self.tools_ttl is not None and time.monotonic() - self._tools_at > self.tools_ttl
+        if refresh or expired or self._tools is None:
+            tools = (await self._request(lambda session: session.list_tools())).tools
+            self._tools, self._tools_at = tools, time.monotonic()
+        return self._tools
+
+    async def call_tool(self, tool_name, arguments=None):
+        result = await self._request(lambda session: session.call_tool(tool_name, arguments))
+        return result.content[0].text
+
+    async def close(self):
+        sessions, self.sessions = self.sessions, []
+        await asyncio.gather(*(s.close() for s in sessions))
+
+class _Session:
+    """One server process and its ClientSession, owned by a background task
+    (the MCP client context managers must be entered and exited in the same task)"""
+
+    def __init__(self, params, message_handler):
+        self.params, self.message_handler = params, message_handler
+        self.session, self.in_flight, self.alive = None, 0, False
+
+    async def start(self):
+        self._ready, self._stop = asyncio.get_running_loop().create_future(), asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        await self._ready
+
+    async def _run(self):
+        try:
+            async with stdio_client(self.params) as (read, write):
+                async with ClientSession(read, write, message_handler=self.message_handler) as session:
+                    await session.initialize()
+                    self.session, self.alive = session, True
+                    self._ready.set_result(None)
+                    await self._stop.wait()
+        except BaseException as e:
+            if not self._ready.done():
+                self._ready.set_exception(e)
+        finally:
+            self.session, self.alive = None, False
+
+    async def healthy(self, timeout=5):
+        """Ping the server; a session that doesn't answer is marked dead"""
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception:
+            self.alive = False
+            return False
+
+    async def close(self):
+        self._stop.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+_pools = {}
+
+def get_pool(server_script_path, **kwargs):
+    """The process-wide session pool for a server script, created on first use"""
+    if server_script_path not in _pools:
+        _pools[server_script_path] = MCPSessionPool(server_script_path, **kwargs)
+    return _pools[server_script_path]
+
+async def close_pools():
+    """Stop every pooled server process (call once, before the event loop ends)"""
+    pools = list(_pools.values())
+    _pools.clear()
+    await asyncio.gather(*(pool.close() for pool in pools))
+
+async def get_tools(server_script_path):
+    """Get available tools from an MCP server (cached by its session pool).
+    """
+    return await get_pool(server_script_path).list_tools()
+
+async def local_get_tools(server_script_path=None):
     """A simple dummy implementation of get_tools without MCP."""
     tools = [
         {
@@ -63,24 +191,12 @@ def local_get_tools(server_script_path=None):
 
     return [DictObject(tool) for tool in tools]
 
-def call_tool(server_script_path=None, tool_name=None, arguments=None):
-    """Call a tool on an MCP server.
+async def call_tool(server_script_path=None, tool_name=None, arguments=None):
+    """Call a tool on an MCP server, over a pooled session.
     """
-    async def _call_tool():
-        server_params = StdioServerParameters(
-            command="python",
-            args=[server_script_path]
-        )
-        
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                result = await session.call_tool(tool_name, arguments)
-                return result.content[0].text
-    
-    return asyncio.run(_call_tool())
+    return await get_pool(server_script_path).call_tool(tool_name, arguments)
 
-def local_call_tool(server_script_path=None, tool_name=None, arguments=None):
+async def local_call_tool(server_script_path=None, tool_name=None, arguments=None):
     """A simple dummy implementation of call_tool without MCP."""
     # Simple implementation of tools
     if tool_name == "add":
@@ -91,16 +207,16 @@ def local_call_tool(server_script_path=None, tool_name=None, arguments=None):
     else:
         return f"Error: Unknown tool '{tool_name}'"
 
-if __name__ == "__main__":
+async def main():
     print("=== Testing call_llm ===")
     prompt = "In a few words, what is the meaning of life?"
     print(f"Prompt: {prompt}")
-    response = call_llm(prompt)
+    response = await call_llm(prompt)
     print(f"Response: {response}")
 
-        # Find available tools
+    # Find available tools
     print("=== Finding available tools ===")
-    tools = get_tools("simple_server.py")
+    tools = await get_tools("simple_server.py")
     
     # Print tool information nicely formatted
     for i, tool in enumerate(tools, 1):
@@ -126,11 +242,16 @@ if __name__ == "__main__":
     # Call a tool
     print("\n=== Calling the add tool ===")
     a, b = 5, 3
-    result = call_tool("simple_server.py", "add", {"a": a, "b": b})
+    result = await call_tool("simple_server.py", "add", {"a": a, "b": b})
     print(f"Result of {a} + {b} = {result}")
     
     # You can easily call with different parameters
     a, b = 10, 20
-    result = call_tool("simple_server.py", "add", {"a": a, "b": b})
+    result = await call_tool("simple_server.py", "add", {"a": a, "b": b})
     print(f"Result of {a} + {b} = {result}")
 
+    await close_pools()
+    await close_client()
+
+if __name__ == "__main__":
+    asyncio.run(main())
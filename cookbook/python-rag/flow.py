@@ -4,13 +4,15 @@ from nodes import EmbedDocumentsNode, CreateIndexNode, EmbedQueryNode, RetrieveD
 def get_offline_flow():
     # Create offline flow for document indexing
     chunk_docs_node = ChunkDocumentsNode()
-    embed_docs_node = EmbedDocumentsNode()
+    # At most 8 embedding requests of 32 chunks in flight; also bounds the embeddings waiting for the index
+    embed_docs_node = EmbedDocumentsNode(max_concurrency=8 * 32)
     create_index_node = CreateIndexNode()
     
     # Connect the nodes
     chunk_docs_node >> embed_docs_node >> create_index_node
     
-    offline_flow = Flow(start=chunk_docs_node)
+    # Pipelined: embedding starts on the first chunks and indexing on the first embeddings
+    offline_flow = Flow(start=chunk_docs_node, pipeline=True)
     return offline_flow
 
 def get_online_flow():
@@ -1,6 +1,7 @@
 import sys
 import asyncio
 from flow import offline_flow, online_flow
+from utils import close_client
 
 async def run_rag_demo():
     """
@@ -82,6 +83,9 @@ async def run_rag_demo():
     # Run the online flow to retrieve the most relevant document and generate an answer
     await online_flow.run(shared)
 
+    # Release the pooled connections shared by every node
+    await close_client()
+
 
 if __name__ == "__main__":
-    run_rag_demo()
\ No newline at end of file
+    asyncio.run(run_rag_demo())
\ No newline at end of file
@@ -1,9 +1,18 @@
-from brainyflow import Node, Flow, SequentialBatchNode
+from brainyflow import Node, SequentialBatchNode, ParallelBatchNode
 import numpy as np
 import faiss
-from utils import call_llm, get_embedding, get_simple_embedding, fixed_size_chunk
+from utils import call_llm, get_embedding, get_embeddings, fixed_size_chunk
 
 # Nodes for the offline flow
+# The offline flow is pipelined (see flow.py): each batch node hands its post a Stream
+# of results, so chunking, embedding and indexing overlap instead of running one after another.
+async def flatten(chunk_lists, texts):
+    """Yield chunks as documents are chunked, recording them in `texts` for retrieval"""
+    async for chunks in chunk_lists:
+        for chunk in chunks:
+            texts.append(chunk)
+            yield chunk
+
 class ChunkDocumentsNode(SequentialBatchNode):
     async def prep(self, shared):
         """Read texts from shared store"""
@@ -13,33 +22,25 @@ class ChunkDocumentsNode(SequentialBatchNode):
         """Chunk a single text into smaller pieces"""
         return fixed_size_chunk(text)
     
-    async def post(self, shared, prep_res, exec_res_list):
-        """Store chunked texts in the shared store"""
-        # Flatten the list of lists into a single list of chunks
-        all_chunks = []
-        for chunks in exec_res_list:
-            all_chunks.extend(chunks)
-        
-        # Replace the original texts with the flat list of chunks
-        shared["texts"] = all_chunks
-        
-        print(f"✅ Created {len(all_chunks)} chunks from {len(prep_res)} documents")
+    async def post(self, shared, prep_res, exec_res_stream):
+        """Hand the chunks on as they are produced"""
+        # Replace the original texts with the flat list of chunks, filled in as they stream by
+        shared["texts"] = []
+        shared["chunks"] = flatten(exec_res_stream, shared["texts"])
         return "default"
     
-class EmbedDocumentsNode(SequentialBatchNode):
+class EmbedDocumentsNode(ParallelBatchNode):
     async def prep(self, shared):
-        """Read texts from shared store and return as an iterable"""
-        return shared["texts"]
+        """Read chunks from shared store, as an async iterable"""
+        return shared["chunks"]
     
-    async def exec(self, text):
-        """Embed a single text"""
-        return get_embedding(text)
+    async def exec_batch(self, texts):
+        """Embed up to `batch_size` texts per API call"""
+        return await get_embeddings(texts)
     
-    async def post(self, shared, prep_res, exec_res_list):
-        """Store embeddings in the shared store"""
-        embeddings = np.array(exec_res_list, dtype=np.float32)
-        shared["embeddings"] = embeddings
-        print(f"✅ Created {len(embeddings)} document embeddings")
+    async def post(self, shared, prep_res, exec_res_stream):
+        """Hand the embeddings on, in chunk order, as they arrive"""
+        shared["embeddings"] = exec_res_stream
         return "default"
 
 class CreateIndexNode(Node):
@@ -47,25 +48,33 @@ class CreateIndexNode(Node):
         """Get embeddings from shared store"""
         return shared["embeddings"]
     
-    async def exec(self, embeddings):
-        """Create FAISS index and add embeddings"""
+    async def exec(self, embeddings, block=256):
+        """Create a FAISS index, adding embeddings in blocks as they arrive"""
         print("🔍 Creating search index...")
-        dimension = embeddings.shape[1]
-        
-        # Create a flat L2 index
-        index = faiss.IndexFlatL2(dimension)
-        
-        # Add the embeddings to the index
-        index.add(embeddings)
-        
-        return index
+        index, pending = None, []
+        async for embedding in embeddings:
+            pending.append(embedding)
+            if len(pending) == block:
+                index = add_block(index, pending)
+        return add_block(index, pending)
     
     async def post(self, shared, prep_res, exec_res):
         """Store the index in shared store"""
         shared["index"] = exec_res
+        print(f"✅ Created {len(shared['texts'])} chunks and their embeddings")
         print(f"✅ Index created with {exec_res.ntotal} vectors")
         return "default"
 
+def add_block(index, pending):
+    """Add the pending embeddings to a flat L2 index, creating it on first use"""
+    if pending:
+        embeddings = np.array(pending, dtype=np.float32)
+        if index is None:
+            index = faiss.IndexFlatL2(embeddings.shape[1])
+        index.add(embeddings)
+        pending.clear()
+    return index
+
 # Nodes for the online flow
 class EmbedQueryNode(Node):
     async def prep(self, shared):
@@ -75,7 +84,7 @@ class EmbedQueryNode(Node):
     async def exec(self, query):
         """Embed the query"""
         print(f"🔍 Embedding query: {query}")
-        query_embedding = get_embedding(query)
+        query_embedding = await get_embedding(query)
         return np.array([query_embedding], dtype=np.float32)
     
     async def post(self, shared, prep_res, exec_res):
@@ -132,7 +141,7 @@ Context: {retrieved_doc['text']}
 Answer:
 """
         
-        answer = call_llm(prompt)
+        answer = await call_llm(prompt)
         return answer
     
     async def post(self, shared, prep_res, exec_res):
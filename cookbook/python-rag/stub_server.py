@@ -0,0 +1,101 @@
+"""A local stand-in for the OpenAI API, for running and load-testing this example offline.
+
+    python stub_server.py [port]
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python main.py
+
+Implements POST /v1/chat/completions and POST /v1/embeddings with deterministic
+responses, speaks HTTP/1.1 keep-alive, and reports how many TCP connections and
+requests it has served at GET /stats, so connection reuse can be checked.
+"""
+import sys
+import json
+import time
+import base64
+import struct
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EMBEDDING_DIM = 64
+stats = {"connections": 0, "requests": 0}
+stats_lock = threading.Lock()
+
+def fake_embedding(text):
+    """Deterministic unit vector derived from the text's hash"""
+    digest = hashlib.sha256(text.encode()).digest() * (EMBEDDING_DIM // 32 + 1)
+    vector = [b / 255 - 0.5 for b in digest[:EMBEDDING_DIM]]
+    norm = sum(v * v for v in vector) ** 0.5
+    return [v / norm for v in vector]
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+
+    def setup(self):
+        super().setup()
+        with stats_lock:
+            stats["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with stats_lock:
+                return self.send_json(dict(stats))
+        self.send_json({"error": {"message": f"Unknown path {self.path}"}}, 404)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with stats_lock:
+            stats["requests"] += 1
+
+        if self.path.endswith("/chat/completions"):
+            prompt = request["messages"][-1]["content"]
+            return self.send_json({
+                "id": f"chatcmpl-{stats['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": f"Stub answer to: {prompt.strip()[:80]}"},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": 5, "total_tokens": len(prompt.split()) + 5},
+            })
+
+        if self.path.endswith("/embeddings"):
+            texts = request["input"] if isinstance(request["input"], list) else [request["input"]]
+            data = []
+            for i, text in enumerate(texts):
+                vector = fake_embedding(text)
+                if request.get("encoding_format") == "base64":
+                    vector = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode()
+                data.append({"object": "embedding", "index": i, "embedding": vector})
+            tokens = sum(len(t.split()) for t in texts)
+            return self.send_json({
+                "object": "list",
+                "data": data,
+                "model": request.get("model", "stub"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            })
+
+        self.send_json({"error": {"message": f"Unknown path {self.path}"}}, 404)
+
+def serve(port=8765):
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    return server
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    print(f"Stub OpenAI API on http://127.0.0.1:{port}/v1 (stats at /stats)")
+    serve(port).serve_forever()
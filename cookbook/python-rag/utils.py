@@ -1,28 +1,60 @@
 import os
+import httpx
 import numpy as np
-from openai import OpenAI
+from openai import AsyncOpenAI
 
-def call_llm(prompt):    
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY", "your-api-key"))
-    r = client.chat.completions.create(
+_client = None
+
+def get_client():
+    """Return the process-wide async client.
+
+    Creating a client per call opens a new connection (and TLS handshake) per call.
+    Sharing one client keeps a pool of keep-alive connections that every node reuses.
+    Pool size comes from LLM_POOL_SIZE; OPENAI_BASE_URL points it at another server
+    (e.g. `python stub_server.py`). The client must be used from a single event loop.
+    """
+    global _client
+    if _client is None:
+        pool_size = int(os.environ.get("LLM_POOL_SIZE", 20))
+        _client = AsyncOpenAI(
+            api_key=os.environ.get("OPENAI_API_KEY", "your-api-key"),
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                    keepalive_expiry=60,
+                ),
+                timeout=httpx.Timeout(60, connect=10),
+            ),
+        )
+    return _client
+
+async def close_client():
+    """Close the pooled connections (call once, before the event loop ends)"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+async def call_llm(prompt):
+    r = await get_client().chat.completions.create(
         model="gpt-4o",
         messages=[{"role": "user", "content": prompt}]
     )
     return r.choices[0].message.content
 
-def get_embedding(text):
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY", "your-api-key"))
-    
-    response = client.embeddings.create(
+async def get_embedding(text):
+    return (await get_embeddings([text]))[0]
+
+async def get_embeddings(texts):
+    """Embed many texts with a single API call"""
+    response = await get_client().embeddings.create(
         model="text-embedding-ada-002",
-        input=text
+        input=list(texts)
     )
-    
-    # Extract the embedding vector from the response
-    embedding = response.data[0].embedding
-    
-    # Convert to numpy array for consistency with other embedding functions
-    return np.array(embedding, dtype=np.float32)
+
+    # The API returns one embedding per input, in the same order
+    return [np.array(item.embedding, dtype=np.float32) for item in response.data]
 
 def fixed_size_chunk(text, chunk_size=2000):
     chunks = []
@@ -31,19 +63,24 @@ def fixed_size_chunk(text, chunk_size=2000):
     return chunks
 
 if __name__ == "__main__":
-    print("=== Testing call_llm ===")
-    prompt = "In a few words, what is the meaning of life?"
-    print(f"Prompt: {prompt}")
-    response = call_llm(prompt)
-    print(f"Response: {response}")
-
-    print("=== Testing embedding function ===")
-    
-    text1 = "The quick brown fox jumps over the lazy dog."
-    text2 = "Python is a popular programming language for data science."
-    
-    oai_emb1 = get_embedding(text1)
-    oai_emb2 = get_embedding(text2)
-    print(f"OpenAI Embedding 1 shape: {oai_emb1.shape}")
-    oai_similarity = np.dot(oai_emb1, oai_emb2)
-    print(f"OpenAI similarity between texts: {oai_similarity:.4f}")
\ No newline at end of file
+    import asyncio
+
+    async def main():
+        print("=== Testing call_llm ===")
+        prompt = "In a few words, what is the meaning of life?"
+        print(f"Prompt: {prompt}")
+        response = await call_llm(prompt)
+        print(f"Response: {response}")
+
+        print("=== Testing embedding function ===")
+
+        text1 = "The quick brown fox jumps over the lazy dog."
+        text2 = "Python is a popular programming language for data science."
+
+        oai_emb1, oai_emb2 = await get_embeddings([text1, text2])
+        print(f"OpenAI Embedding 1 shape: {oai_emb1.shape}")
+        oai_similarity = np.dot(oai_emb1, oai_emb2)
+        print(f"OpenAI similarity between texts: {oai_similarity:.4f}")
+        await close_client()
+
+    asyncio.run(main())
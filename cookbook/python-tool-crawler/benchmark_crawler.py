@@ -0,0 +1,58 @@
+"""Pages/second of the crawler against the local fixture site (fixture_server.py).
+
+    python benchmark_crawler.py                     # 200 pages, 20ms server latency
+    python benchmark_crawler.py --pages 1000 --latency 5
+
+Compares the old approach (one page at a time, a new connection per request) with
+the async crawler at a few concurrency levels, and counts the requests and TCP
+connections the server saw.
+"""
+import time
+import asyncio
+import argparse
+import httpx
+from fixture_server import serve, FixtureHandler
+from tools.crawler import WebCrawler
+
+def stats(url):
+    return httpx.get(url + "stats").json()
+
+def sequential_crawl(base_url, max_pages):
+    """The previous crawler's strategy: FIFO list, O(n) dedup, no session"""
+    crawler, to_visit, visited = WebCrawler(base_url, max_pages), [base_url], set()
+    while to_visit and len(visited) < max_pages:
+        url = to_visit.pop(0)
+        if url in visited:
+            continue
+        response = httpx.get(url)
+        content = crawler.parse_page(url, response.text)
+        visited.add(url)
+        to_visit.extend(u for u in content["links"] if u not in visited and u not in to_visit)
+    return visited
+
+def measure(name, url, crawl):
+    before = stats(url)
+    start = time.perf_counter()
+    pages = len(crawl())
+    elapsed = time.perf_counter() - start
+    after = stats(url)
+    print(f"{name:<28} {pages:>6} {after['requests'] - before['requests']:>9} {pages / elapsed:>10.1f} {after['connections'] - before['connections']:>12}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=20, help="simulated server time per page, in ms")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    server = serve(args.port, args.pages, args.latency / 1000)
+    url = f"http://127.0.0.1:{args.port}/"
+
+    print(f"{'crawler':<28} {'pages':>6} {'requests':>9} {'pages/s':>10} {'connections':>12}")
+    measure("sequential, no session", url, lambda: sequential_crawl(url, args.pages))
+    for concurrency in (1, 4, 16):
+        crawler = lambda: WebCrawler(url, args.pages, max_concurrency=concurrency, per_host=concurrency, verbose=False)
+        measure(f"async, concurrency {concurrency}", url, lambda: asyncio.run(crawler().crawl()))
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
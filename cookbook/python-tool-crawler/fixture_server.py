@@ -0,0 +1,71 @@
+"""A local synthetic website, for running and benchmarking the crawler offline.
+
+    python fixture_server.py [port] [pages] [latency_ms]
+    python main.py   # then enter http://127.0.0.1:8766/
+
+Serves `pages` HTML pages (/page/0 ... /page/N-1), each linking to a few others,
+after `latency_ms` of simulated server time. Speaks HTTP/1.1 keep-alive and reports
+how many TCP connections and requests it has served at GET /stats.
+"""
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+    pages = 500
+    latency = 0.02
+    links_per_page = 5
+    stats = {"connections": 0, "requests": 0}
+    stats_lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with self.stats_lock:
+            self.stats["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, body, content_type="text/html", status=200):
+        body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.stats_lock:
+                return self.send_body(json.dumps(self.stats), "application/json")
+        with self.stats_lock:
+            self.stats["requests"] += 1
+        n = 0 if self.path == "/" else int(self.path.rsplit("/", 1)[-1]) if self.path.startswith("/page/") and self.path.rsplit("/", 1)[-1].isdigit() else -1
+        if not 0 <= n < self.pages:
+            return self.send_body("<html><title>Not found</title></html>", status=404)
+        time.sleep(self.latency)
+        # Deterministic links spread over the site, plus duplicates and fragments the crawler must dedupe
+        targets = [(n * 7 + k * 13 + 1) % self.pages for k in range(self.links_per_page)]
+        links = "".join(f'<li><a href="/page/{t}">Page {t}</a> <a href="/page/{t}#top">again</a></li>' for t in targets)
+        paragraphs = "".join(f"<p>Paragraph {i} of page {n}: lorem ipsum dolor sit amet.</p>" for i in range(5))
+        self.send_body(f"<html><head><title>Page {n}</title></head><body><h1>Page {n}</h1>{paragraphs}"
+                       f'<ul>{links}<li><a href="https://example.com/">External</a></li></ul></body></html>')
+
+def serve(port=8766, pages=500, latency=0.02):
+    """Start the fixture server in a background thread; returns the server (call .shutdown() to stop)"""
+    FixtureHandler.pages, FixtureHandler.latency = pages, latency
+    server = ThreadingHTTPServer(("127.0.0.1", port), FixtureHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8766
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.02
+    FixtureHandler.pages, FixtureHandler.latency = pages, latency
+    print(f"Serving {pages} pages with {latency * 1000:.0f}ms latency on http://127.0.0.1:{port}/")
+    ThreadingHTTPServer(("127.0.0.1", port), FixtureHandler).serve_forever()
@@ -7,15 +7,15 @@ class CrawlWebsiteNode(Node):
     """Node to crawl a website and extract content"""
     
     async def prep(self, shared):
-        return shared.get("base_url"), shared.get("max_pages", 10)
+        return shared.get("base_url"), shared.get("max_pages", 10), shared.get("max_concurrency", 8)
         
     async def exec(self, inputs):
-        base_url, max_pages = inputs
+        base_url, max_pages, max_concurrency = inputs
         if not base_url:
             return []
             
-        crawler = WebCrawler(base_url, max_pages)
-        return crawler.crawl()
+        crawler = WebCrawler(base_url, max_pages, max_concurrency=max_concurrency)
+        return await crawler.crawl()
         
     async def post(self, shared, prep_res, exec_res):
         shared["crawl_results"] = exec_res
@@ -1,74 +1,121 @@
-import requests
+import time
+import asyncio
+import httpx
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from typing import Dict, List, Set
+from urllib.parse import urljoin, urlparse, urldefrag
+from typing import Dict, List, Optional, Set
 
 class WebCrawler:
-    """Simple web crawler that extracts content and follows links"""
-    
-    def __init__(self, base_url: str, max_pages: int = 10):
+    """Async web crawler that extracts content and follows links within one domain
+
+    Pages are fetched by `max_concurrency` workers pulling from a shared frontier queue,
+    over one keep-alive `httpx.AsyncClient`. Politeness is enforced per host: at most
+    `per_host` requests in flight and at least `delay` seconds between request starts.
+    URLs are deduplicated with a set, so each one is fetched at most once.
+    """
+
+    def __init__(self, base_url: str, max_pages: int = 10, max_concurrency: int = 8,
+                 per_host: int = 4, delay: float = 0.0, client: Optional[httpx.AsyncClient] = None,
+                 verbose: bool = True):
         self.base_url = base_url
         self.max_pages = max_pages
-        self.visited: Set[str] = set()
-        
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.delay = delay
+        self.client = client
+        self.verbose = verbose
+        self.visited: Set[str] = set()  # pages fetched successfully
+        self.seen: Set[str] = set()  # every URL ever queued
+        self._hosts: Dict[str, list] = {}  # host -> [semaphore, time of the last request start]
+
     def is_valid_url(self, url: str) -> bool:
         """Check if URL belongs to the same domain"""
         base_domain = urlparse(self.base_url).netloc
         url_domain = urlparse(url).netloc
         return base_domain == url_domain
-        
-    def extract_page_content(self, url: str) -> Dict:
-        """Extract content from a single page"""
+
+    def parse_page(self, url: str, html: str) -> Dict:
+        """Extract title, text and same-domain links from a page's HTML"""
+        soup = BeautifulSoup(html, "html.parser")
+        content = {
+            "url": url,
+            "title": soup.title.string if soup.title else "",
+            "text": soup.get_text(separator="\n", strip=True),
+            "links": []
+        }
+        for link in soup.find_all("a"):
+            href = link.get("href")
+            if href:
+                absolute_url = urldefrag(urljoin(url, href)).url
+                if self.is_valid_url(absolute_url):
+                    content["links"].append(absolute_url)
+        return content
+
+    async def _polite(self, host: str):
+        """Wait for a request slot on `host`; returns the semaphore to release"""
+        slot = self._hosts.setdefault(host, [asyncio.Semaphore(self.per_host), 0.0])
+        await slot[0].acquire()
+        wait = slot[1] + self.delay - time.monotonic()
+        slot[1] = time.monotonic() + max(wait, 0)  # reserve our start time before sleeping
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return slot[0]
+
+    async def extract_page_content(self, client: httpx.AsyncClient, url: str) -> Optional[Dict]:
+        """Fetch and parse a single page"""
+        slot = await self._polite(urlparse(url).netloc)
         try:
-            response = requests.get(url)
+            response = await client.get(url, follow_redirects=True)
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            # Extract main content
-            content = {
-                "url": url,
-                "title": soup.title.string if soup.title else "",
-                "text": soup.get_text(separator="\n", strip=True),
-                "links": []
-            }
-            
-            # Extract links
-            for link in soup.find_all("a"):
-                href = link.get("href")
-                if href:
-                    absolute_url = urljoin(url, href)
-                    if self.is_valid_url(absolute_url):
-                        content["links"].append(absolute_url)
-            
-            return content
-            
         except Exception as e:
             print(f"Error crawling {url}: {str(e)}")
             return None
-    
-    def crawl(self) -> List[Dict]:
-        """Crawl website starting from base_url"""
-        to_visit = [self.base_url]
+        finally:
+            slot.release()
+        if "html" not in response.headers.get("content-type", "text/html"):
+            return None
+        # Parsing is CPU work: keep it off the event loop so other fetches keep flowing
+        return await asyncio.to_thread(self.parse_page, url, response.text)
+
+    def _enqueue(self, frontier: asyncio.Queue, url: str):
+        # Never queue more than max_pages URLs: each queued URL is fetched exactly once
+        if url not in self.seen and len(self.seen) < self.max_pages:
+            self.seen.add(url)
+            frontier.put_nowait(url)
+
+    async def crawl(self) -> List[Dict]:
+        """Crawl website starting from base_url, returning pages in the order they were fetched"""
+        client = self.client or httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            timeout=httpx.Timeout(30, connect=10),
+            headers={"User-Agent": "brainyflow-crawler"},
+        )
+        frontier: asyncio.Queue = asyncio.Queue()
         results = []
-        
-        while to_visit and len(self.visited) < self.max_pages:
-            url = to_visit.pop(0)
-            
-            if url in self.visited:
-                continue
-                
-            print(f"Crawling: {url}")
-            content = self.extract_page_content(url)
-            
-            if content:
-                self.visited.add(url)
-                results.append(content)
-                
-                # Add new URLs to visit
-                new_urls = [url for url in content["links"] 
-                          if url not in self.visited 
-                          and url not in to_visit]
-                to_visit.extend(new_urls)
-        
+
+        async def worker():
+            while True:
+                url = await frontier.get()
+                try:
+                    if self.verbose:
+                        print(f"Crawling: {url}")
+                    content = await self.extract_page_content(client, url)
+                    if content:
+                        self.visited.add(url)
+                        results.append(content)
+                        for link in content["links"]:
+                            self._enqueue(frontier, link)
+                finally:
+                    frontier.task_done()
+
+        self._enqueue(frontier, urldefrag(self.base_url).url)
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrency)]
+        try:
+            await frontier.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if client is not self.client:
+                await client.aclose()
         return results
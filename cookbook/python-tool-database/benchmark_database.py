@@ -0,0 +1,80 @@
+"""Queries/second of tools/database.py under parallel batch load.
+
+    python benchmark_database.py                 # 5,000 rows
+    python benchmark_database.py --rows 20000 --concurrency 64
+
+A ParallelBatchNode runs one insert (or one lookup) per item, first with the old
+approach (a new connection and a commit per query), then through the pooled
+`Database`. Bulk inserts with `executemany` are timed for comparison.
+"""
+import os
+import time
+import asyncio
+import sqlite3
+import argparse
+import tempfile
+from brainyflow import ParallelBatchNode
+from tools.database import Database
+
+SCHEMA = "CREATE TABLE tasks (id INTEGER PRIMARY KEY, title TEXT NOT NULL, status TEXT DEFAULT 'pending')"
+INSERT = "INSERT INTO tasks (id, title) VALUES (?, ?)"
+LOOKUP = "SELECT title, status FROM tasks WHERE id = ?"
+
+def connect_per_query(path, query, params):
+    """The previous execute_sql: open, run, commit and close for every query"""
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute(query, params).fetchall()
+        conn.commit()
+        return result
+    finally:
+        conn.close()
+
+class Queries(ParallelBatchNode):
+    """One query per item; `run_query(params)` is set per benchmark"""
+    def __init__(self, run_query, query, **kwargs):
+        super().__init__(**kwargs)
+        self.run_query, self.query = run_query, query
+
+    async def prep(self, shared):
+        return shared["params"]
+
+    async def exec(self, params):
+        return await self.run_query(self.query, params)
+
+async def timed(name, count, coro):
+    start = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - start
+    print(f"{name:<36} {count / elapsed:>12,.0f} queries/s")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    rows = [(i, f"task {i}") for i in range(args.rows)]
+    lookups = {"params": [(i * 7919 % args.rows,) for i in range(args.rows)]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = os.path.join(tmp, "old.db")
+        connect_per_query(old_path, SCHEMA, ())
+        async def old(query, params):
+            return await asyncio.to_thread(connect_per_query, old_path, query, params)
+        await timed("connection per query: insert", args.rows,
+                    Queries(old, INSERT, max_concurrency=args.concurrency).run({"params": rows}))
+        await timed("connection per query: lookup", args.rows,
+                    Queries(old, LOOKUP, max_concurrency=args.concurrency).run(lookups))
+
+        db = Database(os.path.join(tmp, "pooled.db"))
+        await db.execute(SCHEMA)
+        await timed("pooled: insert", args.rows,
+                    Queries(db.execute, INSERT, max_concurrency=args.concurrency).run({"params": rows}))
+        await timed("pooled: lookup", args.rows,
+                    Queries(db.execute, LOOKUP, max_concurrency=args.concurrency).run(lookups))
+        await db.execute("DELETE FROM tasks")
+        await timed("pooled: executemany insert", args.rows, db.executemany(INSERT, rows))
+        db.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,4 +1,6 @@
+import asyncio
 from flow import create_database_flow
+from tools.database import close_db
 
 async def main():
     # Create the flow
@@ -11,7 +13,10 @@ async def main():
     }
     
     # Run the flow
-    await flow.run(shared)
+    try:
+        await flow.run(shared)
+    finally:
+        close_db()
     
     # Print results
     print("Database Status:", shared.get("db_status"))
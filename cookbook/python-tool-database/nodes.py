@@ -5,7 +5,7 @@ class InitDatabaseNode(Node):
     """Node for initializing the database"""
     
     async def exec(self, _):
-        init_db()
+        await init_db()
         return "Database initialized"
         
     async def post(self, shared, prep_res, exec_res):
@@ -24,7 +24,7 @@ class CreateTaskNode(Node):
     async def exec(self, inputs):
         title, description = inputs
         query = "INSERT INTO tasks (title, description) VALUES (?, ?)"
-        execute_sql(query, (title, description))
+        await execute_sql(query, (title, description))
         return "Task created successfully"
         
     async def post(self, shared, prep_res, exec_res):
@@ -36,7 +36,7 @@ class ListTasksNode(Node):
     
     async def exec(self, _):
         query = "SELECT * FROM tasks"
-        return execute_sql(query)
+        return await execute_sql(query)
         
     async def post(self, shared, prep_res, exec_res):
         shared["tasks"] = exec_res
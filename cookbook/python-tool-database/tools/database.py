@@ -1,30 +1,169 @@
+import asyncio
 import sqlite3
-from typing import List, Tuple, Any
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
 
-def execute_sql(query: str, params: Tuple = None) -> List[Tuple[Any, ...]]:
+READ_KEYWORDS = ("SELECT", "WITH", "EXPLAIN")
+
+class Database:
+    """Async SQLite access for nodes: one writer connection plus a pool of read-only connections
+
+    The database runs in WAL mode, so readers never block the writer (or each other).
+    Writes go, one at a time, to a single connection on its own thread and are committed
+    as they complete (or together, inside `transaction()`). Reads are spread over
+    `readers` threads, each with its own read-only connection. Connections live as long
+    as the `Database`, so each one keeps its cache of prepared statements
+    (`statement_cache` per connection): a query repeated with new parameters is compiled once.
+    """
+
+    def __init__(self, path: str = "example.db", readers: int = 4, statement_cache: int = 256, timeout: float = 30):
+        if path == ":memory:":
+            raise ValueError("Database needs a file: each connection to ':memory:' is a separate database")
+        self.path, self.statement_cache, self.timeout = path, statement_cache, timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="sqlite-writer")
+        self._readers = ThreadPoolExecutor(readers, thread_name_prefix="sqlite-reader")
+        self._write_lock = _OwnedLock()  # held by the task with an open transaction()
+        # Switch to WAL before any reader opens the file
+        self._writer.submit(self._connection, False).result()
+
+    def _connection(self, readonly: bool) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                                   cached_statements=self.statement_cache)
+            if readonly:
+                conn.execute("PRAGMA query_only=ON")  # not mode=ro: that leaves the WAL files behind on close
+            else:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; safe from corruption in WAL mode
+            with self._lock:
+                self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def is_read(query: str) -> bool:
+        words = query.split(None, 1)
+        return bool(words) and words[0].upper() in READ_KEYWORDS
+
+    def _read(self, query: str, params: Sequence) -> List[Tuple[Any, ...]]:
+        return self._connection(True).execute(query, params).fetchall()
+
+    def _write(self, query: str, params: Sequence, many: bool, commit: bool) -> List[Tuple[Any, ...]]:
+        conn = self._connection(False)
+        try:
+            cursor = conn.executemany(query, params) if many else conn.execute(query, params)
+            rows = cursor.fetchall()
+            if commit and conn.in_transaction:
+                conn.commit()
+            return rows
+        except Exception:
+            if commit and conn.in_transaction:
+                conn.rollback()
+            raise
+
+    async def _run(self, pool: ThreadPoolExecutor, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+    async def execute(self, query: str, params: Sequence = (), write: Optional[bool] = None) -> List[Tuple[Any, ...]]:
+        """Run one statement and return its rows. SELECT/WITH/EXPLAIN statements go to the readers,
+        anything else to the writer; pass `write=True` for e.g. a WITH ... INSERT."""
+        if write is None:
+            write = not self.is_read(query)
+        if not write:
+            return await self._run(self._readers, self._read, query, params or ())
+        async with self._writing() as commit:
+            return await self._run(self._writer, self._write, query, params or (), False, commit)
+
+    async def executemany(self, query: str, rows: Iterable[Sequence]) -> None:
+        """Run one write statement for many parameter rows, in a single transaction"""
+        async with self._writing() as commit:
+            await self._run(self._writer, self._write, query, rows, True, commit)
+
+    @asynccontextmanager
+    async def _writing(self):
+        """Yields whether the write must commit itself: False inside this task's transaction(),
+        while other tasks wait for an open transaction to end"""
+        lock = self._write_lock
+        if lock.owner is asyncio.current_task():
+            yield False
+        elif lock.locked():
+            async with lock:
+                yield True
+        else:
+            yield True  # submitted to the writer thread before any later BEGIN
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Group writes into one transaction, committed on exit (rolled back on error).
+        Await the writes from the task that opened it: other tasks' writes wait until it ends.
+        Reads are not blocked, and see the transaction's changes once committed."""
+        async with self._write_lock:
+            await self._run(self._writer, lambda: self._connection(False).execute("BEGIN"))
+            try:
+                yield self
+            except BaseException:
+                await self._run(self._writer, lambda: self._connection(False).rollback())
+                raise
+            await self._run(self._writer, lambda: self._connection(False).commit())
+
+    def close(self):
+        """Close every connection and stop the worker threads"""
+        self._writer.shutdown()
+        self._readers.shutdown()
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+class _OwnedLock(asyncio.Lock):
+    """An asyncio.Lock that remembers which task holds it"""
+    owner = None
+
+    async def acquire(self):
+        await super().acquire()
+        self.owner = asyncio.current_task()
+        return True
+
+    def release(self):
+        self.owner = None
+        super().release()
+
+_db: Optional[Database] = None
+
+def get_db(path: str = "example.db") -> Database:
+    """Return the process-wide Database, opening it on first use"""
+    global _db
+    if _db is None:
+        _db = Database(path)
+    return _db
+
+def close_db():
+    """Close the process-wide Database (call once, when done)"""
+    global _db
+    if _db is not None:
+        _db.close()
+        _db = None
+
+async def execute_sql(query: str, params: Tuple = None) -> List[Tuple[Any, ...]]:
     """Execute a SQL query and return results
-    
+
     Args:
         query (str): SQL query to execute
         params (tuple, optional): Query parameters to prevent SQL injection
-        
+
     Returns:
         list: Query results as a list of tuples
     """
-    conn = sqlite3.connect("example.db")
-    try:
-        cursor = conn.cursor()
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        result = cursor.fetchall()
-        conn.commit()
-        return result
-    finally:
-        conn.close()
-
-def init_db():
+    return await get_db().execute(query, params or ())
+
+async def init_db():
     """Initialize database with example table"""
     create_table_sql = """
     CREATE TABLE IF NOT EXISTS tasks (
@@ -35,4 +174,4 @@ def init_db():
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     """
-    execute_sql(create_table_sql)
+    await execute_sql(create_table_sql)
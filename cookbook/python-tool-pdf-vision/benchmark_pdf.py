@@ -0,0 +1,73 @@
+"""Peak memory and throughput of PDF page rasterization: all pages at once vs streamed.
+
+    python benchmark_pdf.py                     # synthetic 200-page PDF
+    python benchmark_pdf.py --pages 500 --pdf path/to/file.pdf
+
+"list" renders every page to a PIL image, keeps them all, then encodes each to PNG
+(the previous pdf_to_images + image_to_base64). "stream" is tools.pdf.stream_pages:
+pages rendered one at a time and encoded to JPEG in a thread pool. Each mode runs
+in its own process so that peak RSS is measured separately.
+"""
+import io
+import sys
+import time
+import asyncio
+import argparse
+import resource
+import subprocess
+import tempfile
+import fitz
+from tools.pdf import pdf_to_images, stream_pages
+
+def make_pdf(path, pages):
+    """A text-heavy synthetic document"""
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {n + 1}", fontsize=24)
+        page.insert_textbox(fitz.Rect(72, 110, 540, 760), f"Line of body text on page {n + 1}. " * 120, fontsize=10)
+        page.draw_rect(fitz.Rect(400, 40, 560, 90), color=(0, 0, 1), fill=(0.8, 0.9, 1))
+    doc.save(path)
+
+def run_list(pdf, max_size):
+    total = 0
+    for image, _ in pdf_to_images(pdf, max_size):
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        total += len(buffer.getvalue())
+    return total
+
+async def run_stream(pdf, max_size):
+    return sum([len(page["image"]) async for page in stream_pages(pdf, max_size)])
+
+def child(mode, pdf, max_size):
+    start = time.perf_counter()
+    total = run_list(pdf, max_size) if mode == "list" else asyncio.run(run_stream(pdf, max_size))
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode}\t{elapsed}\t{peak_mb}\t{total}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--pdf", help="use this PDF instead of a synthetic one")
+    parser.add_argument("--max-size", type=int, default=2000)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, args.pdf, args.max_size)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = args.pdf or f"{tmp}/synthetic.pdf"
+        if not args.pdf:
+            make_pdf(pdf, args.pages)
+        pages = len(fitz.open(pdf))
+        print(f"{pages} pages, longest side {args.max_size}px")
+        print(f"{'mode':<8} {'pages/s':>8} {'peak RSS MB':>12} {'encoded MB':>11}")
+        for mode in ("list", "stream"):
+            out = subprocess.run([sys.executable, __file__, "--child", mode, "--pdf", pdf, "--max-size", str(args.max_size)],
+                                 capture_output=True, text=True, check=True).stdout.split("\t")
+            print(f"{mode:<8} {pages / float(out[1]):>8.1f} {float(out[2]):>12.0f} {int(out[3]) / 2**20:>11.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import asyncio
 from flow import create_vision_flow
 
 async def main():
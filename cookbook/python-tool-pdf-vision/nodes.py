@@ -1,5 +1,5 @@
-from brainyflow import Node, SequentialBatchNode
-from tools.pdf import pdf_to_images
+from brainyflow import Node, SequentialBatchNode, ParallelBatchNode
+from tools.pdf import stream_pages
 from tools.vision import extract_text_from_image
 from typing import List, Dict, Any
 from pathlib import Path
@@ -52,39 +52,38 @@ class ProcessPDFBatchNode(SequentialBatchNode):
         return "default"
 
 class LoadPDFNode(Node):
-    """Node for loading and converting a single PDF to images"""
+    """Node for streaming a single PDF's pages out as encoded images"""
+    stream_buffer = 4  # pages rendered ahead of the vision calls
     
     async def prep(self, shared):
         return shared.get("pdf_path", "")
         
     async def exec(self, pdf_path):
-        return pdf_to_images(pdf_path)
+        # An async generator: the next node starts on page 1 while later pages are still rendering
+        async for page in stream_pages(pdf_path):
+            yield page
         
     async def post(self, shared, prep_res, exec_res):
-        shared["page_images"] = exec_res
+        shared["pages"] = exec_res
         return "default"
 
-class ExtractTextNode(Node):
-    """Node for extracting text from images using Vision API"""
+class ExtractTextNode(ParallelBatchNode):
+    """Node for extracting text from page images using Vision API, several pages at a time"""
+    
+    def __init__(self, max_concurrency=4, **kwargs):
+        super().__init__(max_concurrency=max_concurrency, **kwargs)
     
     async def prep(self, shared):
-        return (
-            shared.get("page_images", []),
-            shared.get("extraction_prompt", None)
-        )
-        
-    async def exec(self, inputs):
-        images, prompt = inputs
-        results = []
+        prompt = shared.get("extraction_prompt", None)
+        return ((page, prompt) async for page in shared["pages"])
         
-        for img, page_num in images:
-            text = extract_text_from_image(img, prompt)
-            results.append({
-                "page": page_num,
-                "text": text
-            })
-            
-        return results
+    async def exec(self, item):
+        page, prompt = item
+        text = await extract_text_from_image(page["image"], prompt, page["mime"])
+        return {
+            "page": page["page"],
+            "text": text
+        }
         
     async def post(self, shared, prep_res, exec_res):
         shared["extracted_text"] = exec_res
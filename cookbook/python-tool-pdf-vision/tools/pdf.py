@@ -1,52 +1,100 @@
 import fitz  # PyMuPDF
 from PIL import Image
 import io
+import os
 import base64
-from typing import List, Tuple
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterator, List, Tuple
 
-def pdf_to_images(pdf_path: str, max_size: int = 2000) -> List[Tuple[Image.Image, int]]:
-    """Convert PDF pages to PIL Images with size limit
-    
-    Args:
-        pdf_path (str): Path to PDF file
-        max_size (int): Maximum dimension (width/height) for images
-        
-    Returns:
-        list: List of tuples (PIL Image, page number)
+def render_pages(pdf_path: str, max_size: int = 2000, dpi: int = 150) -> Iterator[Tuple[int, fitz.Pixmap]]:
+    """Rasterize PDF pages one at a time, directly at their final size
+
+    Each page is rendered at `dpi`, scaled down so that its longest side is at most
+    `max_size` pixels, instead of being rendered at 72 DPI and resized afterwards.
+    Only the page being rendered is held in memory.
+
+    Yields:
+        tuple: (page number, RGB pixmap)
     """
     doc = fitz.open(pdf_path)
-    images = []
-    
     try:
         for page_num in range(len(doc)):
             page = doc[page_num]
-            pix = page.get_pixmap()
-            
-            # Convert to PIL Image
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            
-            # Resize if needed while maintaining aspect ratio
-            if max(img.size) > max_size:
-                ratio = max_size / max(img.size)
-                new_size = tuple(int(dim * ratio) for dim in img.size)
-                img = img.resize(new_size, Image.Resampling.LANCZOS)
-            
-            images.append((img, page_num + 1))
-            
+            zoom = min(dpi / 72, max_size / max(page.rect.width, page.rect.height))
+            yield page_num + 1, page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
     finally:
         doc.close()
-        
-    return images
 
-def image_to_base64(image: Image.Image) -> str:
-    """Convert PIL Image to base64 string
-    
+def encode_pixmap(width: int, height: int, samples: bytes, format: str = "JPEG", quality: int = 85) -> bytes:
+    """Compress raw RGB pixels to JPEG or WebP (Pillow releases the GIL while encoding)"""
+    buffer = io.BytesIO()
+    Image.frombytes("RGB", (width, height), samples).save(buffer, format=format, quality=quality)
+    return buffer.getvalue()
+
+async def stream_pages(pdf_path: str, max_size: int = 2000, dpi: int = 150, format: str = "JPEG",
+                       quality: int = 85, workers: int = None, prefetch: int = 4) -> AsyncIterator[Dict]:
+    """Yield a PDF's pages, in order, as encoded images ready for a vision model
+
+    Pages are rasterized one by one in a background thread (a PyMuPDF document must stay
+    on one thread) and compressed in a pool of `workers` threads. At most `prefetch`
+    pages are in flight at once, so memory stays bounded however long the PDF is.
+
+    Yields:
+        dict: {"page": page number, "image": encoded bytes, "mime": e.g. "image/jpeg"}
+    """
+    loop = asyncio.get_running_loop()
+    pages = render_pages(pdf_path, max_size, dpi)
+    pool = ThreadPoolExecutor(workers or min(4, os.cpu_count() or 1), thread_name_prefix="pdf-encode")
+    renderer = ThreadPoolExecutor(1, thread_name_prefix="pdf-render")
+    in_flight = []
+
+    def render_next():
+        page = next(pages, None)
+        return page and (page[0], page[1].width, page[1].height, page[1].samples)
+
+    try:
+        while True:
+            page = await loop.run_in_executor(renderer, render_next)
+            if page is None:
+                break
+            page_num, width, height, samples = page
+            in_flight.append((page_num, loop.run_in_executor(pool, encode_pixmap, width, height, samples, format, quality)))
+            if len(in_flight) >= prefetch:
+                page_num, encoded = in_flight.pop(0)
+                yield {"page": page_num, "image": await encoded, "mime": f"image/{format.lower()}"}
+        for page_num, encoded in in_flight:
+            yield {"page": page_num, "image": await encoded, "mime": f"image/{format.lower()}"}
+    finally:
+        await loop.run_in_executor(renderer, pages.close)  # closes the document on its own thread
+        renderer.shutdown()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def pdf_to_images(pdf_path: str, max_size: int = 2000, dpi: int = 150) -> List[Tuple[Image.Image, int]]:
+    """Convert PDF pages to PIL Images with size limit (holds every page in memory; prefer `stream_pages`)
+
+    Args:
+        pdf_path (str): Path to PDF file
+        max_size (int): Maximum dimension (width/height) for images
+
+    Returns:
+        list: List of tuples (PIL Image, page number)
+    """
+    return [(Image.frombytes("RGB", (pix.width, pix.height), pix.samples), page_num)
+            for page_num, pix in render_pages(pdf_path, max_size, dpi)]
+
+def image_to_base64(image, format: str = "JPEG", quality: int = 85) -> str:
+    """Convert a PIL Image (or already encoded image bytes) to a base64 string
+
     Args:
-        image (PIL.Image): Image to convert
-        
+        image (PIL.Image or bytes): Image to convert
+        format (str): "JPEG" or "WEBP"; both are far smaller than PNG for scanned pages
+
     Returns:
         str: Base64 encoded image string
     """
-    buffer = io.BytesIO()
-    image.save(buffer, format="PNG")
-    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+    if not isinstance(image, bytes):
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format=format, quality=quality)
+        image = buffer.getvalue()
+    return base64.b64encode(image).decode('utf-8')
@@ -2,31 +2,34 @@ from PIL import Image
 from utils.call_llm import client
 from tools.pdf import image_to_base64
 
-def extract_text_from_image(image: Image.Image, prompt: str = None) -> str:
+async def extract_text_from_image(image, prompt: str = None, mime: str = "image/jpeg") -> str:
     """Extract text from image using OpenAI Vision API
     
     Args:
-        image (PIL.Image): Image to process
+        image (PIL.Image or bytes): Image to process, or an image already encoded as `mime`
         prompt (str, optional): Custom prompt for extraction. Defaults to general OCR.
+        mime (str): MIME type of the encoded image
         
     Returns:
         str: Extracted text from image
     """
-    # Convert image to base64
+    # Convert image to base64 (encoded bytes are passed through as they are)
     img_base64 = image_to_base64(image)
+    if not isinstance(image, bytes):
+        mime = "image/jpeg"
     
     # Default prompt for general OCR
     if prompt is None:
         prompt = "Please extract all text from this image."
     
     # Call Vision API
-    response = client.chat.completions.create(
+    response = await client.chat.completions.create(
         model="gpt-4o",
         messages=[{
             "role": "user",
             "content": [
                 {"type": "text", "text": prompt},
-                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{img_base64}"}}
+                {"type": "image_url", "image_url": {"url": f"data:{mime};base64,{img_base64}"}}
             ]
         }]
     )
@@ -34,7 +37,9 @@ def extract_text_from_image(image: Image.Image, prompt: str = None) -> str:
     return response.choices[0].message.content
 
 if __name__ == "__main__":
+    import asyncio
+
     # Test vision processing
     test_image = Image.open("example.png")
-    result = extract_text_from_image(test_image)
+    result = asyncio.run(extract_text_from_image(test_image))
     print("Extracted text:", result)
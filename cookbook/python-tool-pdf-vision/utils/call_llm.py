@@ -1,9 +1,9 @@
 import os
-from openai import OpenAI
+from openai import AsyncOpenAI
 from pathlib import Path
 
 # Get the project root directory (parent of utils directory)
 ROOT_DIR = Path(__file__).parent.parent
 
-# Initialize OpenAI client with API key from environment
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Initialize one async OpenAI client with API key from environment, shared by all pages
+client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
@@ -0,0 +1,89 @@
+"""Runs the benchmark suite and compares it with a saved baseline.
+
+From the `python/` directory:
+    python -m benchmarks                  # run all cases, compare with benchmarks/baseline.json
+    python -m benchmarks -k parallel      # only cases whose name contains "parallel"
+    python -m benchmarks --save           # (re)write the baseline
+
+Exits with status 1 if any case is more than --tolerance worse than the baseline. Rates are compared as multiples of
+the `reference` case (plain asyncio, no brainyflow) timed right before each run, so neither a faster or slower machine
+nor load that comes and goes during the run counts as a change. Memory cases depend on the interpreter: they are only
+compared when the baseline comes from the same Python version and platform.
+"""
+import gc, sys, json, time, asyncio, argparse, platform, pathlib, random, statistics
+from benchmarks.cases import CASES, REFERENCE
+
+BASELINE = pathlib.Path(__file__).with_name('baseline.json')
+
+async def run_once(spec):
+    random.seed(0)
+    gc.collect()
+    gc.disable()  # like timeit: keep collector pauses out of the measurement
+    try:
+        start = time.perf_counter()
+        result = await spec['fn'](spec['n'])
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.enable()
+    return result / elapsed if spec['higher_is_better'] else result
+
+async def measure(spec, repeat):
+    """Best result of `repeat` runs and, for rates, the median ratio to a `reference` run made just before each one
+    (the best ratio would favour runs whose reference happened to be slow)"""
+    values, ratios = [], []
+    for _ in range(repeat):
+        reference = await run_once(CASES[REFERENCE]) if spec['higher_is_better'] else None
+        values.append(await run_once(spec))
+        if reference:
+            ratios.append(values[-1] / reference)
+    best = max if spec['higher_is_better'] else min
+    return best(values), (statistics.median(ratios) if ratios else None)
+
+def machine():
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'system': platform.system()}
+
+def same_interpreter(a, b):
+    minor = lambda meta: meta.get('python', '').rsplit('.', 1)[0]
+    return minor(a) == minor(b) and a.get('machine') == b['machine'] and a.get('system') == b['system']
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.splitlines()[0])
+    parser.add_argument('-k', default='', help='only run cases whose name contains this string')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per case; the best one is reported')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative regression (default 0.25)')
+    parser.add_argument('--save', action='store_true', help='write results as the new baseline')
+    args = parser.parse_args()
+
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    meta, base_relative = machine(), baseline.get('relative', {})
+    comparable = same_interpreter(baseline.get('meta', {}), meta)
+    if baseline and not comparable:
+        print(f"Baseline from Python {baseline['meta']['python']} on {baseline['meta']['machine']}: memory cases not compared")
+    results, relative, regressions = {}, {}, []
+    print(f"{'case':32} {'result':>16} {'x reference':>12} {'baseline':>12} {'change':>8}")
+    for name, spec in CASES.items():
+        if args.k not in name or name == REFERENCE:
+            continue
+        value, ratio = asyncio.run(measure(spec, args.repeat))
+        results[name] = round(value, 1)
+        if ratio is not None:
+            relative[name] = round(ratio, 4)
+            now, base = ratio, base_relative.get(name)
+        else:
+            now, base = value, baseline.get('results', {}).get(name) if comparable else None
+        change = '' if base is None else f"{now / base - 1:+.0%}"
+        shown = lambda x: '' if x is None else f"{x:.3f}" if ratio is not None else f"{x:,.0f}"
+        print(f"{name:32} {value:>12,.0f} {spec['unit']:<3} {shown(ratio):>12} {shown(base):>12} {change:>8}")
+        if base is not None and (now < base * (1 - args.tolerance) if spec['higher_is_better'] else now > base * (1 + args.tolerance)):
+            regressions.append(name)
+
+    if args.save:
+        keep = lambda key, new: {**baseline.get(key, {}), **new} if comparable else new  # don't mix in another machine's results
+        BASELINE.write_text(json.dumps({'meta': meta, 'results': keep('results', results), 'relative': keep('relative', relative)}, indent=2) + '\n')
+        print(f"Baseline saved to {BASELINE}")
+    elif regressions:
+        print(f"Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Benchmark cases for the core engine. Each case is an async function taking a size `n` and returning the number of
+operations it performed; the runner turns that into a rate. Memory cases return bytes per item instead."""
+import asyncio, tracemalloc
+from brainyflow import Node, Flow, SequentialBatchFlow, ParallelBatchFlow, ParallelBatchNode, TraceRecorder, set_tracer
+from benchmarks.flow_transitions import build as build_agent_loop
+
+CASES = {}
+
+def case(n, unit="ops/s", higher_is_better=True):
+    def register(fn):
+        CASES[fn.__name__] = dict(fn=fn, n=n, unit=unit, higher_is_better=higher_is_better)
+        return fn
+    return register
+
+REFERENCE = 'reference'
+
+@case(n=100_000)
+async def reference(n):
+    """Plain asyncio, no brainyflow: awaited calls and a batch of tasks. The yardstick other rates are compared by."""
+    shared = {'runs': 0}
+
+    async def step(i):
+        shared['runs'] += 1
+        return i
+
+    for i in range(n // 2):
+        await step(i)
+    await asyncio.gather(*(step(i) for i in range(n // 2)))
+    return shared['runs']
+
+class Leaf(Node):
+    async def post(self, shared, prep_res, exec_res):
+        shared['runs'] += 1
+
+class Echo(ParallelBatchNode):
+    async def exec(self, item):
+        return item
+
+@case(n=50_000)
+async def flow_transitions(n):
+    shared = {'steps': 0, 'limit': n}
+    await build_agent_loop(compiled=False).run(shared)
+    return shared['steps']
+
+@case(n=50_000)
+async def flow_transitions_compiled(n):
+    shared = {'steps': 0, 'limit': n}
+    await build_agent_loop(compiled=True).run(shared)
+    return shared['steps']
+
+@case(n=20_000)
+async def flow_transitions_traced(n):
+    """With a tracer set: spans for every node and phase (flow_transitions is the cost with tracing off)."""
+    shared = {'steps': 0, 'limit': n}
+    set_tracer(TraceRecorder())
+    try:
+        await build_agent_loop(compiled=False).run(shared)
+    finally:
+        set_tracer(None)
+    return shared['steps']
+
+@case(n=20)
+async def nested_sequential_batch_flow(n):
+    """Three levels of SequentialBatchFlow, `n` param sets per level (n**3 leaf runs)."""
+    class Level(SequentialBatchFlow):
+        async def prep(self, shared):
+            return [{self.key: i} for i in range(n)]
+
+    flow = Leaf()
+    for key in ('a', 'b', 'c'):
+        flow = Level(start=flow)
+        flow.key = key
+    shared = {'runs': 0}
+    await flow.run(shared)
+    return shared['runs']
+
+@case(n=10_000)
+async def wide_parallel_batch_flow(n):
+    class Wide(ParallelBatchFlow):
+        async def prep(self, shared):
+            return [{'i': i} for i in range(n)]
+
+    shared = {'runs': 0}
+    await Wide(start=Flow(start=Leaf())).run(shared)
+    return shared['runs']
+
+@case(n=50_000)
+async def parallel_batch_node(n):
+    return len(await Echo()._exec(range(n)))
+
+@case(n=50_000)
+async def parallel_batch_node_bounded(n):
+    return len(await Echo(max_concurrency=64)._exec(range(n)))
+
+@case(n=10_000)
+async def retries_then_fallback(n):
+    class AlwaysFails(ParallelBatchNode):
+        async def exec(self, item):
+            raise ValueError(item)
+
+        async def exec_fallback(self, item, exc):
+            return None
+
+    await AlwaysFails(max_retries=3)._exec(range(n))
+    return n
+
+async def _bytes_per_in_flight_item(node, n):
+    release = asyncio.Event()
+
+    class Waiting(type(node)):
+        async def exec(self, item):
+            await release.wait()
+            return item
+
+    node.__class__ = Waiting
+    tracemalloc.start()
+    try:
+        task = asyncio.ensure_future(node._exec(range(n)))
+        await asyncio.sleep(0.05)  # let the window fill up
+        in_flight, _ = tracemalloc.get_traced_memory()
+        release.set()
+        await task
+    finally:
+        tracemalloc.stop()
+    return in_flight / n
+
+@case(n=20_000, unit="bytes/item", higher_is_better=False)
+async def memory_per_item_unbounded(n):
+    return await _bytes_per_in_flight_item(ParallelBatchNode(), n)
+
+@case(n=20_000, unit="bytes/item", higher_is_better=False)
+async def memory_per_item_bounded(n):
+    return await _bytes_per_in_flight_item(ParallelBatchNode(max_concurrency=64), n)
@@ -0,0 +1,40 @@
+"""Steps/second of a looping agent-style flow, with per-step node copies (default) vs a compiled flow.
+
+Run from the `python/` directory:  python benchmarks/flow_transitions.py [steps]
+"""
+import sys, time, asyncio, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+from brainyflow import Node, Flow
+
+class Decide(Node):
+    async def post(self, shared, prep_res, exec_res):
+        shared['steps'] += 1
+        return 'act' if shared['steps'] < shared['limit'] else 'finish'
+
+class Act(Node):
+    async def post(self, shared, prep_res, exec_res):
+        shared['steps'] += 1
+
+def build(compiled):
+    decide, act = Decide(), Act()
+    decide - 'act' >> act
+    decide - 'finish' >> Node()
+    act >> decide
+    flow = Flow(start=decide)
+    return flow.compile() if compiled else flow
+
+async def steps_per_second(compiled, steps):
+    flow, shared = build(compiled), {'steps': 0, 'limit': steps}
+    start = time.perf_counter()
+    await flow.run(shared)
+    return shared['steps'] / (time.perf_counter() - start)
+
+async def main(steps):
+    await steps_per_second(False, 1000)  # warm up
+    copying = await steps_per_second(False, steps)
+    compiled = await steps_per_second(True, steps)
+    print(f"per-step copies: {copying:>12,.0f} steps/s")
+    print(f"compiled:        {compiled:>12,.0f} steps/s  ({compiled / copying:.2f}x)")
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000))
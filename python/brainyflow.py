@@ -1,7 +1,77 @@
-import asyncio, warnings, copy, time
+import asyncio, warnings, copy, time, os, random, pickle, inspect, multiprocessing, contextvars, contextlib, types, collections, collections.abc, hashlib, io, sqlite3, heapq, ast, textwrap, functools
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+
+_run=contextvars.ContextVar("brainyflow_run",default=None) # (dispatch table, params) of the compiled flow run in progress
+_tracer,_span=contextvars.ContextVar("brainyflow_tracer",default=None),contextvars.ContextVar("brainyflow_span",default=None)
+_streams=contextvars.ContextVar("brainyflow_streams",default=None) # streams opened during the top-level flow run in progress
+_pipeline=contextvars.ContextVar("brainyflow_pipeline",default=None) # streams pipelined by the flow in progress, None if it doesn't pipeline
+_deadline=contextvars.ContextVar("brainyflow_deadline",default=None) # time.monotonic() by which the run in progress must end
+_attempt=contextvars.ContextVar("brainyflow_attempt",default=None) # (node, retry number) of the exec attempt in progress
+_slot=contextvars.ContextVar("brainyflow_slot",default=None) # [scheduler, depth, holds a slot] of the scheduled batch run in progress
+
+def time_remaining():
+    """Seconds left until the deadline of the run in progress (`run(shared,timeout=...)`), or None without one.
+    Hand it to clients (e.g. an LLM call's `timeout=`) so their calls give up no later than the run does."""
+    d=_deadline.get()
+    return None if d is None else max(0.0,d-time.monotonic())
+
+async def _within(timeout,aw):
+    """Awaits `aw` in a task cancelled after `timeout` seconds (or at the enclosing deadline, if sooner), raising TimeoutError."""
+    d=time.monotonic()+timeout
+    if (outer:=_deadline.get()) is not None: d=min(d,outer)
+    token=_deadline.set(d)
+    try: return await asyncio.wait_for(aw,d-time.monotonic())
+    finally: _deadline.reset(token)
+
+def set_tracer(tracer):
+    """Traces runs started from the current context with `tracer`, any object with OpenTelemetry's
+    `start_as_current_span(name, attributes=...)` (e.g. `opentelemetry.trace.get_tracer(...)` or `TraceRecorder()`); None disables."""
+    _tracer.set(tracer)
+
+class RecordedSpan:
+    def __init__(self,name,attributes,parent): self.name,self.attributes,self.parent,self.start,self.end,self.error=name,dict(attributes or {}),parent,time.perf_counter(),None,None
+    def set_attribute(self,key,value): self.attributes[key]=value
+    @property
+    def duration(self): return (self.end or time.perf_counter())-self.start
+
+class TraceRecorder:
+    """Minimal in-process tracer: finished spans go to `on_end`, which appends them to `spans` (override it to forward them)."""
+    def __init__(self): self.spans=[]
+    @contextlib.contextmanager
+    def start_as_current_span(self,name,attributes=None,**kwargs):
+        s=RecordedSpan(name,attributes,_span.get())
+        try: yield s
+        except BaseException as e: s.error=e;raise
+        finally: s.end=time.perf_counter();self.on_end(s)
+    def on_end(self,span): self.spans.append(span)
+
+async def _traced(name,attrs,aw):
+    with _tracer.get().start_as_current_span(name,attributes=attrs) as s:
+        token=_span.set(s)
+        try:
+            r=await aw
+            if attrs.get("brainyflow.phase")=="run" and isinstance(r,str): s.set_attribute("brainyflow.action",r)
+            return r
+        finally: _span.reset(token)
+
+def _trace(node,phase,aw):
+    """Returns `aw` untouched unless a tracer is set; then wraps it in a node (`phase=None`) or phase span."""
+    if _tracer.get() is None: return aw
+    n=type(node).__name__
+    return _traced(phase or n,{"brainyflow.node":n,"brainyflow.phase":phase or "run"},aw)
+
+def _trace_item(index,queued,aw):
+    if _tracer.get() is None: return aw
+    return _traced("item",{"brainyflow.index":index,"brainyflow.queue_wait":time.perf_counter()-queued},aw)
 
 class BaseNode:
     def __init__(self): self.params,self.successors={},{}
+    @property
+    def params(self):
+        r=_run.get()
+        return r[1] if r and id(self) in r[0] else self._params
+    @params.setter
+    def params(self,params): self._params=params
     def set_params(self,params): self.params=params
     def add_successor(self,node,action="default"):
         if action in self.successors: warnings.warn(f"Overwriting successor for action '{action}'")
@@ -10,56 +80,738 @@ class BaseNode:
     async def exec(self,prep_res): pass
     async def post(self,shared,prep_res,exec_res): pass
     async def _exec(self,prep_res): return await self.exec(prep_res)
-    async def _run(self,shared): p=await self.prep(shared);e=await self._exec(p);return await self.post(shared,p,e)
-    async def run(self,shared): 
+    async def _run(self,shared):
+        if _tracer.get() is None: p=await self.prep(shared);e=await self._exec(p);return await self.post(shared,p,e) # untraced: no wrappers
+        p=await _trace(self,"prep",self.prep(shared));e=await _trace(self,"exec",self._exec(p));return await _trace(self,"post",self.post(shared,p,e))
+    async def run(self,shared,timeout=None):
         if self.successors: warnings.warn("Node won't run successors. Use Flow!")  
-        return await self._run(shared)
+        r=_trace(self,None,self._run(shared))
+        return await (r if timeout is None else _within(timeout,r))
     def __rshift__(self,other): return self.add_successor(other)
     def __sub__(self,action):
         if isinstance(action,str): return _ConditionalTransition(self,action)
         raise TypeError("Action must be a string")
 
+class _TokenBucket:
+    def __init__(self,rate): self.rate,self.cap=rate,max(rate,1);self.tokens,self.last=self.cap,time.monotonic()
+    async def acquire(self):
+        while True:
+            now=time.monotonic();self.tokens=min(self.cap,self.tokens+(now-self.last)*self.rate);self.last=now
+            if self.tokens>=1: self.tokens-=1;return
+            await asyncio.sleep((1-self.tokens)/self.rate)
+
+async def _aiter(items):
+    if hasattr(items,'__aiter__'):
+        async for i in items: yield i
+    else:
+        for i in items or []: yield i
+
+def _take(done):
+    errs=[e for e in (d.exception() for d in done) if e]
+    if errs: raise errs[0]
+    return [d.result() for d in done]
+
+_FAILED,_LOOKUP=object(),object()
+
+async def _window(items,fn,limit=None,rate=None,on_item=None,hit=None,on_error=None,ordered=False):
+    """Runs `fn` over a (sync or async) iterable keeping at most `limit` calls in flight and starting at most `rate`
+    per second. Results keep input order; with `on_item`, each (item,result) is handed over as soon as its call completes
+    (in input order with `ordered`, holding early results back, within `limit`), while further items are still read.
+    Items for which `hit(item)` returns `(True,value)` are answered with `value` without being dispatched; on `(False,arg)`
+    the call is `fn(item,arg)`.
+    With `on_error(index,item,exc)`, a failed call leaves None in its slot (and skips `on_item`) unless `on_error` raises."""
+    bucket,out,pending,held,nxt,handing,finished,wake=(_TokenBucket(rate) if rate else None),[],set(),{},0,asyncio.Lock(),[],None
+    async def one(i,item,queued,*args):
+        if bucket: await bucket.acquire()
+        try: r=await _trace_item(i,queued,fn(item,*args))
+        except Exception as e:
+            if not on_error: raise
+            on_error(i,item,e);r=_FAILED
+        if on_item: await emit(i,item,r)
+        else: out.append((i,None if r is _FAILED else r))
+    async def emit(i,item,r):
+        nonlocal nxt
+        async with handing: # one hand-over at a time, so `on_item` sees results in order
+            held[i]=(item,r)
+            while (nxt if ordered else i) in held:
+                item,r=held.pop(nxt if ordered else i);nxt+=1
+                r is _FAILED or await on_item(item,r)
+    def landed(t):
+        finished.append(t)
+        if wake and not wake.done(): wake.set_result(None)
+    def reap(): # drops finished calls, raising the first error
+        done,finished[:]=finished[:],[]
+        pending.difference_update(done);_take(done)
+    async def settle(): # waits for some call to finish (without a callback on every pending one, as asyncio.wait adds), then reaps
+        nonlocal wake
+        if not finished: wake=asyncio.get_running_loop().create_future();await wake
+        reap()
+    try:
+        i=0
+        async for item in _aiter(items):
+            if finished: reap()
+            args=()
+            if hit:
+                found,v=hit(item)
+                if not found: args=(v,)
+                else:
+                    if on_item: await emit(i,item,v)
+                    else: out.append((i,v))
+                    i+=1;continue
+            queued=time.perf_counter()
+            if limit and len(pending)+len(held)>=limit: await settle()
+            t=asyncio.ensure_future(one(i,item,queued,*args));t.add_done_callback(landed);pending.add(t);i+=1
+        while pending: await settle()
+    finally: # like a TaskGroup: siblings of a failed (or cancelled) call are cancelled and awaited before returning
+        for t in pending: t.cancel()
+        if pending: await asyncio.wait(pending)
+        for t in pending: t.cancelled() or t.exception() # marks errors raised while cancelling as retrieved
+    return None if on_item else [r for _,r in sorted(out,key=lambda x:x[0])]
+
+async def _todo(items,done):
+    n=0
+    async for i in _aiter(items):
+        if n not in done: yield n,i
+        n+=1
+
 class _ConditionalTransition:
     def __init__(self,src,action): self.src,self.action=src,action
     def __rshift__(self,tgt): return self.src.add_successor(tgt,self.action)
 
+def _exec_sync(node,prep_res,run=True):
+    r=node.exec(prep_res)
+    return asyncio.run(r) if run and asyncio.iscoroutine(r) else r
+
+def _exec_pickled(payload): return _exec_sync(*pickle.loads(payload))
+
+_pools={}
+def _pool(executor):
+    if isinstance(executor,Executor): return executor
+    if executor not in _pools:
+        _pools[executor]=ThreadPoolExecutor() if executor=="thread" else ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+    return _pools[executor]
+
+@functools.lru_cache(maxsize=1024)
+def _kind(fn):
+    """How an `exec` runs: "stream" (an async generator), "async" (a coroutine function, decorated or not) or "sync"."""
+    return "stream" if inspect.isasyncgenfunction(fn) else "async" if inspect.iscoroutinefunction(inspect.unwrap(fn)) else "sync"
+
+def _exec_kind(node):
+    """`_kind` of `node.exec`, looked up once per function rather than on every call"""
+    m=node.exec;f=getattr(m,"__func__",m)
+    try: return _kind(f)
+    except TypeError: return _kind.__wrapped__(f) # unhashable callable
+
+async def _exec_thread(node,prep_res):
+    """Runs a plain `def exec` in the thread pool. An awaitable it returns is awaited here, on the caller's loop."""
+    r=await asyncio.get_running_loop().run_in_executor(_pool("thread"),contextvars.copy_context().run,_exec_sync,node,prep_res,False)
+    return await r if inspect.isawaitable(r) else r
+
+async def _offload(node,prep_res):
+    """Runs `node.exec` on its executor. Process pools get the node (without its successors) and `prep_res` pickled up front."""
+    pool,loop=_pool(node.executor or "thread"),asyncio.get_running_loop()
+    if isinstance(pool,ThreadPoolExecutor): return await loop.run_in_executor(pool,contextvars.copy_context().run,_exec_sync,node,prep_res)
+    shipped=copy.copy(node);shipped.successors,shipped.executor,shipped.retry,shipped.cache,shipped.params,shipped.cur_retry={},None,None,None,node.params,node.cur_retry
+    try: payload=pickle.dumps((shipped,prep_res))
+    except Exception as e: raise TypeError(f"{type(node).__name__} and its prep_res must be picklable to run in a process pool: {e}") from e
+    return await loop.run_in_executor(pool,_exec_pickled,payload)
+
+class RetryPolicy:
+    """Exponential backoff (`wait * backoff**attempt`, capped at `max_wait`) with optional full jitter. Only exceptions
+    matching `retry_on` (exception type(s) or predicate) are retried, within `max_elapsed` seconds if set. A `retry_after`
+    attribute or `Retry-After` response header on the exception raises the delay to at least that many seconds."""
+    def __init__(self,max_retries=3,wait=1,backoff=2,max_wait=60,jitter=True,max_elapsed=None,retry_on=Exception):
+        self.max_retries,self.wait,self.backoff,self.max_wait,self.jitter,self.max_elapsed,self.retry_on=max_retries,wait,backoff,max_wait,jitter,max_elapsed,retry_on
+    def should_retry(self,exc): return isinstance(exc,self.retry_on) if isinstance(self.retry_on,(type,tuple)) else bool(self.retry_on(exc))
+    def delay(self,attempt,exc,elapsed):
+        if not self.should_retry(exc): return None
+        d=min(self.max_wait,self.wait*self.backoff**attempt)
+        if self.jitter: d=random.uniform(0,d)
+        if (hint:=_retry_after(exc)) is not None: d=max(d,hint)
+        return None if self.max_elapsed is not None and elapsed+d>self.max_elapsed else d
+
+def _retry_after(exc):
+    hint=getattr(exc,'retry_after',None)
+    if hint is None: hint=(getattr(getattr(exc,'response',None),'headers',None) or {}).get('retry-after')
+    try: return None if hint is None else float(hint)
+    except (TypeError,ValueError): return None
+
+class MemoryCache:
+    """In-memory LRU cache of exec results, holding at most `max_size` entries, each for at most `ttl` seconds if set."""
+    def __init__(self,max_size=1024,ttl=None): self.max_size,self.ttl,self.data=max_size,ttl,collections.OrderedDict()
+    def get(self,key):
+        e=self.data.get(key)
+        if e is None: return False,None
+        if self.ttl is not None and time.time()-e[0]>self.ttl: del self.data[key];return False,None
+        self.data.move_to_end(key);return True,e[1]
+    def set(self,key,value):
+        self.data[key]=(time.time(),value);self.data.move_to_end(key)
+        while self.max_size and len(self.data)>self.max_size: self.data.popitem(last=False)
+
+class SQLiteCache:
+    """On-disk cache of (pickled) exec results in a SQLite file, shared across runs. Same eviction rules as `MemoryCache`."""
+    def __init__(self,path,max_size=None,ttl=None):
+        self.max_size,self.ttl,self.db=max_size,ttl,sqlite3.connect(path,isolation_level=None,check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, created REAL, used REAL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS cache_used ON cache (used)")
+        self.size=self.db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+    def get(self,key):
+        row,now=self.db.execute("SELECT value,created FROM cache WHERE key=?",(key,)).fetchone(),time.time()
+        if row is None: return False,None
+        if self.ttl is not None and now-row[1]>self.ttl: self.db.execute("DELETE FROM cache WHERE key=?",(key,));self.size-=1;return False,None
+        self.db.execute("UPDATE cache SET used=? WHERE key=?",(now,key));return True,pickle.loads(row[0])
+    def set(self,key,value):
+        now,new=time.time(),self.db.execute("SELECT 1 FROM cache WHERE key=?",(key,)).fetchone() is None
+        self.db.execute("INSERT OR REPLACE INTO cache VALUES (?,?,?,?)",(key,pickle.dumps(value),now,now));self.size+=new
+        if self.max_size and self.size>self.max_size:
+            self.db.execute("DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY used LIMIT ?)",(self.size-self.max_size,));self.size=self.max_size
+    def close(self): self.db.close()
+
+class FileCheckpoint:
+    """Persists a flow's progress to `path` (pickled, replaced atomically) so a crashed run can resume. `dump_shared` and
+    `load_shared` convert the shared store to and from something picklable; saves closer than `min_interval` seconds are skipped."""
+    def __init__(self,path,dump_shared=None,load_shared=None,min_interval=0):
+        self.path,self.dump_shared,self.load_shared,self.min_interval,self.last=str(path),dump_shared,load_shared,min_interval,None
+    def load(self):
+        try:
+            with open(self.path,"rb") as f: st=pickle.load(f)
+        except FileNotFoundError: return None
+        if self.load_shared: st["shared"]=self.load_shared(st["shared"])
+        return st
+    def save(self,shared,state):
+        if self.last is not None and time.monotonic()-self.last<self.min_interval: return
+        with open(self.path+".tmp","wb") as f: pickle.dump({**state,"shared":self.dump_shared(shared) if self.dump_shared else shared},f)
+        os.replace(self.path+".tmp",self.path);self.last=time.monotonic()
+    def clear(self):
+        with contextlib.suppress(FileNotFoundError): os.remove(self.path)
+
+def _canon(o):
+    """Bytes identifying `o` by value, for cache keys: dicts and sets regardless of order, anything else pickled without
+    a memo (so object identity never counts). Raises for values that can't be pickled."""
+    if isinstance(o,dict): parts=sorted(_canon(k)+_canon(v) for k,v in o.items())
+    elif isinstance(o,(set,frozenset)): parts=sorted(map(_canon,o))
+    elif type(o) in (list,tuple) and any(isinstance(x,(dict,set,frozenset,list,tuple)) for x in o): parts=[_canon(x) for x in o]
+    else:
+        buf=io.BytesIO();p=pickle.Pickler(buf,4);p.fast=True;p.dump(o)
+        return b"%d:"%buf.tell()+buf.getvalue()
+    t=type(o);return f"{t.__module__}.{t.__qualname__}/{len(parts)}:".encode()+b"".join(parts)
+
+class _Watch:
+    """Awaits `coro`, warning whenever one of its steps holds the event loop longer than `node.blocking_threshold`."""
+    def __init__(self,node,coro): self.node,self.coro=node,coro
+    def __await__(self):
+        it,val,exc=self.coro.__await__(),None,None
+        while True:
+            t=time.perf_counter()
+            try: y=it.throw(exc) if exc else it.send(val)
+            except StopIteration as e: self._check(t);return e.value
+            self._check(t)
+            try: val,exc=(yield y),None
+            except BaseException as e: val,exc=None,e
+    def _check(self,t):
+        if (d:=time.perf_counter()-t)>self.node.blocking_threshold:
+            warnings.warn(f"{type(self.node).__name__}.exec blocked the event loop for {d:.3f}s; use an async client or blocking=True",RuntimeWarning)
+
+_END=object()
+
+class Stream:
+    """Partial outputs of a node whose `exec` is an async generator, consumed with `async for` (by a single reader) as they
+    arrive. The producer pauses while `node.stream_buffer` items are unread; `aclose()` cancels it, as does the end of the
+    flow run that opened the stream. A failure is retried like any exec until the first item is out, then raised to the reader.
+    Batch nodes in a pipelined flow hand out their results the same way, `produce(stream)` putting them in; items their
+    `failure_mode` let fail are left out and listed in `errors`. The flow drains those before it ends, so no batch work is lost."""
+    errors=()
+    def __init__(self,node,prep_res,produce=None):
+        self._q,self._room,self.emitted,self.error,self._seen=asyncio.Queue(),(asyncio.Semaphore(node.stream_buffer) if node.stream_buffer else None),0,None,False
+        self._task=asyncio.ensure_future(self._produce(node,prep_res,produce))
+        if (scope:=_streams.get()) is not None: scope.append(self)
+    async def _produce(self,node,prep_res,produce):
+        try:
+            if produce: await produce(self)
+            elif (r:=await Node._exec(node,prep_res,self)) is not None: await self._put(r) # exec_fallback's result
+        except Exception as e: self.error=e
+        finally: self._q.put_nowait(_END)
+    async def _put(self,item):
+        if self._room: await self._room.acquire()
+        self._q.put_nowait(item);self.emitted+=1
+    async def _pump(self,gen):
+        async for item in gen: await self._put(item)
+    def __aiter__(self): return self
+    async def __anext__(self):
+        item=await self._q.get()
+        if item is _END:
+            self._q.put_nowait(_END)
+            if self.error and not self._seen: self._seen=True;raise self.error
+            raise StopAsyncIteration
+        if self._room: self._room.release()
+        return item
+    async def collect(self): return [item async for item in self]
+    @property
+    def done(self): return self._task.done()
+    async def aclose(self):
+        if not self._task.done(): self._task.cancel();await asyncio.wait([self._task])
+
 class Node(BaseNode):
-    def __init__(self,max_retries=1,wait=0): super().__init__();self.max_retries,self.wait=max_retries,wait
+    blocking_threshold=None # seconds; set (per node or on Node) to warn when exec stalls the event loop
+    stream_buffer=16 # max unread items a streaming exec (an async generator) may run ahead of its reader; 0 for unbounded
+    _cur_retry=0
+    @property
+    def cur_retry(self):
+        """0-based retry number of the exec attempt in progress. Kept per run, like `params`, so concurrent runs of a
+        compiled flow (or items of a batch) don't see each other's."""
+        a=_attempt.get()
+        return a[1] if a is not None and a[0] is self else self._cur_retry
+    @cur_retry.setter
+    def cur_retry(self,n): self._cur_retry=n
+    def __init__(self,max_retries=1,wait=0,executor=None,blocking=False,retry=None,cache=None,timeout=None):
+        if executor not in (None,"thread","process") and not isinstance(executor,Executor): raise ValueError(f"Unknown executor {executor!r}")
+        super().__init__();self.max_retries,self.wait,self.retry,self.cache,self.timeout=(retry.max_retries if retry else max_retries),wait,retry,cache,timeout
+        self.executor=executor or ("thread" if blocking else None)
     async def exec_fallback(self,prep_res,exc): raise exc
-    async def _exec(self,prep_res):
-        for self.cur_retry in range(self.max_retries):
-            try: return await self.exec(prep_res)
+    def cache_key(self,prep_res):
+        """Stable key for caching `exec(prep_res)`, or None to skip the cache; override to ignore volatile fields or to add
+        params that exec reads."""
+        cls=type(self)
+        try: blob=_canon(prep_res)
+        except Exception as e:
+            warnings.warn(f"{cls.__name__}.exec not cached: prep_res can't be pickled for a cache key ({e}); override cache_key",RuntimeWarning)
+            return None
+        return hashlib.sha256(f"{cls.__module__}.{cls.__qualname__}:".encode()+blob).hexdigest()
+    def _cached(self,prep_res):
+        """(True,value) on a cache hit, else (False,key): the key to store the result under (None when not cached)"""
+        key=self.cache_key(prep_res);hit,value=(False,None) if key is None else self.cache.get(key)
+        return (True,value) if hit else (False,key)
+    def _call_exec(self,prep_res,kind):
+        if self.executor: return _offload(self,prep_res)
+        if kind=="sync": return _exec_thread(self,prep_res)
+        return _Watch(self,self.exec(prep_res)) if self.blocking_threshold else self.exec(prep_res)
+    async def _exec(self,prep_res,stream=None,key=_LOOKUP,bucket=None):
+        """`key`: the cache key of a miss `_cached` already looked up (None: don't cache), so it isn't looked up again.
+        `bucket`: a `_TokenBucket` each attempt (retries included) takes a token from before calling exec."""
+        if (kind:=_exec_kind(self))=="stream" and stream is None: return Stream(self,prep_res)
+        if key is _LOOKUP:
+            key=None
+            if self.cache is not None and stream is None:
+                hit,key=self._cached(prep_res)
+                if hit: return key # the cached value
+        start=time.monotonic()
+        for attempt in range(self.max_retries):
+            _attempt.set((self,attempt))
+            if bucket: await bucket.acquire()
+            try:
+                call=stream._pump(self.exec(prep_res)) if stream else self._call_exec(prep_res,kind)
+                r=await (call if self.timeout is None else asyncio.wait_for(call,self.timeout)) # each attempt gets `timeout` seconds
+                if key is not None: self.cache.set(key,r)
+                return r
             except Exception as e:
-                if self.cur_retry==self.max_retries-1: return await self.exec_fallback(prep_res,e)
-                if self.wait>0: await asyncio.sleep(self.wait)
+                if stream and stream.emitted: raise # items were handed out: a retry would repeat them
+                d=None if attempt==self.max_retries-1 else self.retry.delay(attempt,e,time.monotonic()-start) if self.retry else self.wait
+                if d is not None and (left:=time_remaining()) is not None and d>=left: d=None # can't retry before the deadline
+                if (s:=_span.get()) is not None:
+                    s.set_attribute("brainyflow.retries",attempt+(d is not None))
+                    if d is None: s.set_attribute("brainyflow.fallback",True)
+                if d is None: return await self.exec_fallback(prep_res,e)
+                if d>0: await asyncio.sleep(d)
+
+class _BatchNode(Node):
+    post_item=None # optional `async def post_item(self,shared,item,exec_res)`: streams results instead of collecting them
+    async def _run(self,shared):
+        piped=_pipeline.get() # pipelined only when every successor is a batch stage that can read the results as they come
+        if piped is not None and not (self.successors and all(isinstance(s,_BatchNode) for s in self.successors.values())): piped=None
+        if not self.post_item and piped is None: return await super()._run(shared)
+        p=await _trace(self,"prep",self.prep(shared))
+        if self.post_item: e=await _trace(self,"exec",self._exec(p,lambda i,r: self.post_item(shared,i,r)))
+        else: e=Stream(self,p,functools.partial(self._produce,p));piped.append(e) # pipelined: post gets results as they come
+        return await _trace(self,"post",self.post(shared,p,e))
+
+    async def _produce(self,items,st):
+        r=await self._exec(items,lambda i,r: st._put(r),True)
+        if isinstance(r,BatchResult): st.errors=r.errors
+
+class SequentialBatchNode(_BatchNode):
+    async def _exec(self,items,on_item=None,ordered=True):
+        out,n=[],0
+        async for i in _aiter(items):
+            r=await _trace_item(n,time.perf_counter(),Node._exec(self,i));n+=1
+            if on_item: await on_item(i,r)
+            else: out.append(r)
+        return None if on_item else out
+
+class _MicroBatcher:
+    """Coalesces single-item calls into calls of `fn(items)->results`, flushing at `size` items or `wait` seconds after the first."""
+    def __init__(self,fn,size,wait): self.fn,self.size,self.wait,self.pending,self.timer,self.loop,self.tasks=fn,size,wait,[],None,asyncio.get_running_loop(),set()
+    def submit(self,item):
+        fut=self.loop.create_future();self.pending.append((item,fut))
+        if len(self.pending)>=self.size: self.flush()
+        elif self.timer is None: self.timer=self.loop.call_later(self.wait,self.flush)
+        return fut
+    def flush(self):
+        if self.timer: self.timer.cancel();self.timer=None
+        batch,self.pending=[(i,f) for i,f in self.pending if not f.cancelled()],[]
+        if not batch: return
+        task=asyncio.ensure_future(self._run(batch));self.tasks.add(task);task.add_done_callback(self.tasks.discard)
+        def abandoned(_): # every caller gave up (cancelled, e.g. by fail_fast or a timeout): stop the call
+            if all(f.cancelled() for _,f in batch): task.cancel()
+        for _,f in batch: f.add_done_callback(abandoned)
+    async def _run(self,batch):
+        try:
+            items=[i for i,_ in batch]
+            res=await self.fn(items) if inspect.iscoroutinefunction(self.fn) else await asyncio.to_thread(self.fn,items)
+            if len(res)!=len(batch): raise ValueError(f"exec_batch returned {len(res)} results for {len(batch)} items")
+            for (_,f),r in zip(batch,res): f.done() or f.set_result(r)
+        except Exception as e:
+            for _,f in batch: f.done() or f.set_exception(e)
+
+ItemError=collections.namedtuple("ItemError","index item error")
+
+class BatchResult(list):
+    """Per-item results of a batch run with a `failure_mode` other than "fail_fast": failed items leave None in their
+    slot and are listed, as `ItemError(index, item, error)`, in `errors`."""
+    def __init__(self,results=(),errors=()): super().__init__(results);self.errors=list(errors)
+
+class BatchError(Exception):
+    """Raised when a batch's failures exceed its `failure_mode` threshold; `errors` lists the `ItemError`s so far."""
+    def __init__(self,errors,total=None):
+        super().__init__(f"{len(errors)} of {'?' if total is None else total} items failed; first: {errors[0].error!r}");self.errors=errors
 
-class SequentialBatchNode(Node):
-    async def _exec(self,items): return [await super()._exec(i) for i in (items or [])]
+class ParallelBatchNode(_BatchNode):
+    exec_batch=None # optional `async def exec_batch(self,items)->list`: items are coalesced into calls of up to `batch_size`
+    def __init__(self,max_retries=1,wait=0,max_concurrency=None,rate_limit=None,batch_size=32,batch_wait=0.01,failure_mode="fail_fast",**kwargs):
+        """`failure_mode`: "fail_fast" raises an item's error (after retries and fallback) and cancels the rest, "collect"
+        runs every item and returns a `BatchResult`, and a number does the same until more than that many items
+        (an int) or that fraction of items (a float below 1) have failed, then raises `BatchError`."""
+        if failure_mode not in ("fail_fast","collect") and not (isinstance(failure_mode,(int,float)) and not isinstance(failure_mode,bool) and failure_mode>=0):
+            raise ValueError(f"Unknown failure_mode {failure_mode!r}")
+        super().__init__(max_retries,wait,**kwargs);self.max_concurrency,self.rate_limit,self.failure_mode=max_concurrency,rate_limit,failure_mode
+        self.batch_size,self.batch_wait,self._batcher=batch_size,batch_wait,None
+    def _call_exec(self,item,kind):
+        if not self.exec_batch: return super()._call_exec(item,kind)
+        if self._batcher is None or self._batcher.loop is not asyncio.get_running_loop(): self._batcher=_MicroBatcher(self.exec_batch,self.batch_size,self.batch_wait)
+        return self._batcher.submit(item)
+    async def _exec(self,items,on_item=None,ordered=False):
+        mode,errors,sup,bucket=self.failure_mode,[],super()._exec,(_TokenBucket(self.rate_limit) if self.rate_limit else None)
+        one,hit=(lambda item,key=_LOOKUP: sup(item,None,key,bucket)),(self._cached if self.cache is not None else None) # retries take tokens too
+        if mode=="fail_fast": return await _window(items,one,self.max_concurrency,None,on_item,hit,None,ordered)
+        total=len(items) if hasattr(items,'__len__') else None
+        if isinstance(mode,float) and mode<1:
+            if total is None: raise TypeError("failure_mode as a fraction needs a batch with a len()")
+            mode=mode*total
+        def failed(i,item,exc):
+            errors.append(ItemError(i,item,exc))
+            if mode!="collect" and len(errors)>mode: raise BatchError(sorted(errors),total) from exc
+        r=await _window(items,one,self.max_concurrency,None,on_item,hit,failed,ordered)
+        return BatchResult(r or (),sorted(errors))
 
-class ParallelBatchNode(Node):
-    async def _exec(self,items):
-        return await asyncio.gather(*[super()._exec(item) for item in items])
+def _falls(body):
+    """Whether a block of statements can finish without returning or raising; None when that can't be told"""
+    for st in body:
+        if isinstance(st,(ast.Return,ast.Raise)): return False
+        if isinstance(st,ast.If): f=_either(_falls(st.body),_falls(st.orelse or [ast.Pass()]))
+        elif isinstance(st,(ast.With,ast.AsyncWith)): f=_falls(st.body)
+        elif isinstance(st,(ast.Try,getattr(ast,"TryStar",ast.Try))):
+            f=_falls(st.finalbody or [ast.Pass()]);f=f and _either(_falls(st.body+st.orelse),*[_falls(h.body) for h in st.handlers])
+        elif isinstance(st,(ast.While,ast.For,ast.AsyncFor,getattr(ast,"Match",ast.For))):
+            if isinstance(st,ast.While) and isinstance(st.test,ast.Constant) and st.test.value: return None # `while True`: ends by break or return
+            if any(isinstance(n,ast.Return) for n in _own(st)): return None # returns in loops and match cases aren't followed
+            continue
+        else: continue
+        if f is not True: return f
+    return True
+
+def _either(*falls): return True if True in falls else None if None in falls else False
+
+@functools.lru_cache(maxsize=None)
+def _post_actions(post):
+    """Actions a `post` method can return, read from the string literals it returns; None when they can't be known"""
+    if post is BaseNode.post: return frozenset({"default"})
+    try: fn=ast.parse(textwrap.dedent(inspect.getsource(post))).body[0]
+    except (OSError,TypeError,SyntaxError,IndexError): return None
+    if not isinstance(fn,(ast.FunctionDef,ast.AsyncFunctionDef)): return None # e.g. `post=lambda ...` or `post=other.post`
+    found,todo,falls=set(),[n.value for n in _own(fn) if isinstance(n,ast.Return)],_falls(fn.body)
+    if falls is None: return None
+    if falls: found.add("default")
+    while todo:
+        v=todo.pop()
+        if v is None or isinstance(v,ast.Constant) and v.value is None: found.add("default")
+        elif isinstance(v,ast.Constant) and isinstance(v.value,str): found.add(v.value)
+        elif isinstance(v,ast.IfExp): todo+=[v.body,v.orelse]
+        else: return None
+    return frozenset(found)
+
+def _own(fn):
+    """Nodes of a function's body, excluding nested functions, lambdas and classes"""
+    own,todo=set(),list(ast.iter_child_nodes(fn))
+    while todo:
+        n=todo.pop()
+        if not isinstance(n,(ast.FunctionDef,ast.AsyncFunctionDef,ast.Lambda,ast.ClassDef)): own.add(n);todo+=ast.iter_child_nodes(n)
+    return own
+
+def _actions(node):
+    """Actions `node` may return: its `actions` attribute if set, else those found in `post`; None when unknown"""
+    declared=getattr(node,"actions",None)
+    if declared is not None: return frozenset(a or "default" for a in declared)
+    return _post_actions(type(node).post)
+
+def _check(start):
+    """Static problems in the graph reachable from `start` (and in the graphs of nested flows)"""
+    problems,seen,todo,name=[],{},[start],lambda n: f"{type(n).__name__}#{seen[id(n)][0]}"
+    while todo:
+        n=todo.pop()
+        if id(n) in seen: continue
+        seen[id(n)]=(len(seen),n,_actions(n));todo+=reversed(n.successors.values())
+        if isinstance(n,Flow): problems+=_check(n.start)
+    taken={i:[s for a,s in n.successors.items() if acts is None or a in acts] for i,(_,n,acts) in seen.items()}
+    for i,(_,n,acts) in seen.items():
+        if acts is not None and n.successors:
+            problems+=[f"{name(n)} may return '{a}' but has no successor for it" for a in sorted(acts-n.successors.keys())]
+            problems+=[f"{name(n)} never returns '{a}', so its successor for it is never taken" for a in n.successors.keys()-acts]
+    reached,todo=set(),[start]
+    while todo:
+        n=todo.pop()
+        if id(n) not in reached: reached.add(id(n));todo+=taken[id(n)]
+    problems+=[f"{name(n)} is unreachable" for i,(_,n,_a) in seen.items() if i not in reached]
+    ends={i for i,(_,n,acts) in seen.items() if acts is None or not n.successors or not acts<=n.successors.keys()} # may end the flow
+    grew=True
+    while grew:
+        more={i for i in reached-ends if any(id(s) in ends for s in taken[i])};grew=bool(more);ends|=more
+    problems+=[f"{name(seen[i][1])} never reaches an end of the flow (cycle with no exit)" for i in sorted(reached-ends,key=lambda i: seen[i][0])]
+    return problems
 
 class Flow(BaseNode):
-    def __init__(self,start): super().__init__();self.start=start
+    def __init__(self,start,checkpoint=None,pipeline=False):
+        """With `pipeline`, a batch node that has successors hands its `post` a `Stream` of its results (in input order) and
+        the flow moves on at once, so a following batch node can consume them while they are produced."""
+        super().__init__();self.start,self._table,self.checkpoint,self.pipeline=start,None,checkpoint,pipeline
     def get_next_node(self,curr,action):
         nxt=curr.successors.get(action or "default")
         if not nxt and curr.successors: warnings.warn(f"Flow ends: '{action}' not found in {list(curr.successors)}")
         return nxt
-    async def _orch(self,shared,params=None):
-        curr,p=copy.copy(self.start),(params or {**self.params})
-        while curr: curr.set_params(p);c=await curr._run(shared);curr=copy.copy(self.get_next_node(curr,c))
-    async def _run(self,shared):pr=await self.prep(shared);await self._orch(shared);return await self.post(shared,pr,None)
+    def compile(self,strict=False):
+        """Snapshots the graph reachable from `start` into an immutable dispatch table. Compiled runs execute nodes in place
+        (no per-step copies); `params` are scoped to each run, so nodes must not keep other per-run state on `self`.
+        The graph is checked first (missing or never-taken actions, unreachable nodes, cycles with no exit): problems are
+        warnings, or a `ValueError` with `strict`. Actions come from each node's `actions`, else from the literals `post` returns."""
+        if problems:=_check(self.start):
+            if strict: raise ValueError("Invalid flow:\n"+"\n".join(f"- {p}" for p in problems))
+            for p in problems: warnings.warn(p,stacklevel=2)
+        table,todo={},[self.start]
+        while todo:
+            n=todo.pop()
+            if id(n) not in table: table[id(n)]=types.MappingProxyType(dict(n.successors));todo+=n.successors.values()
+        self._table=types.MappingProxyType(table);return self
+    async def _orch(self,shared,params=None,start=None,on_step=None):
+        token=_pipeline.set([] if self.pipeline else None)
+        try:
+            await self._steps(shared,params,start,on_step)
+            for st in reversed(_pipeline.get() or ()): # finish pipelined stages nobody read, downstream first so no stream gets a second reader
+                async for _ in st: pass
+        finally: _pipeline.reset(token)
+    async def _steps(self,shared,params,start,on_step):
+        p=params or {**self.params}
+        if self._table is None:
+            curr=copy.copy(start or self.start)
+            while curr:
+                curr.set_params(p);c=await _trace(curr,None,curr._run(shared));nxt=self.get_next_node(curr,c)
+                if on_step: on_step(nxt)
+                curr=copy.copy(nxt)
+            return
+        table,curr=self._table,start or self.start;token=_run.set((table,p))
+        try:
+            while curr:
+                c,succ=await _trace(curr,None,curr._run(shared)),table[id(curr)];curr=succ.get(c or "default")
+                if curr is None and succ: warnings.warn(f"Flow ends: '{c}' not found in {list(succ)}")
+                if on_step: on_step(curr)
+        finally: _run.reset(token)
+    def _resume(self,shared):
+        st=self.checkpoint.load() if self.checkpoint else None
+        if st: shared.clear();shared.update(st["shared"])
+        return st or {}
+    def _done(self,shared,done,n):
+        if self.checkpoint: done.add(n);self.checkpoint.save(shared,{"done":done})
+    async def _finish(self,shared,pr):
+        r=await _trace(self,"post",self.post(shared,pr,None))
+        if self.checkpoint: self.checkpoint.clear()
+        return r
+    async def _run(self,shared):
+        pr=await _trace(self,"prep",self.prep(shared))
+        if not self.checkpoint: await self._orch(shared);return await self._finish(shared,pr)
+        order,todo,st={},[self.start],self._resume(shared)
+        while todo: # nodes are saved by their position in a depth-first walk of the graph
+            n=todo.pop()
+            if id(n) not in order: order[id(n)]=(len(order),type(n).__name__,n);todo+=reversed(n.successors.values())
+        nodes={i:(name,n) for i,name,n in order.values()}
+        if (at:=st.get("node",(0,type(self.start).__name__))) is not None:
+            if nodes.get(at[0],(None,))[0]!=at[1]: raise ValueError(f"Checkpoint {self.checkpoint.path} doesn't match this flow's graph")
+            p=st.get("params") or {**self.params}
+            await self._orch(shared,p,nodes[at[0]][1],lambda n: self.checkpoint.save(shared,{"node":n and order[id(n)][:2],"params":p}))
+        return await self._finish(shared,pr)
     async def exec(self,prep_res): raise RuntimeError("Flow can't exec.")
+    async def run(self,shared,timeout=None):
+        streams=[];token=_streams.set(streams)
+        try: r=await super().run(shared,timeout)
+        finally:
+            _streams.reset(token)
+            for st in streams: await st.aclose()
+        for st in streams:
+            if st.error and not st._seen: raise st.error
+        return r
 
 class SequentialBatchFlow(Flow):
     async def _run(self,shared):
-        pr=(await self.prep(shared)) or []
-        results = [await self._orch(shared,{**self.params,**bp}) for bp in pr] 
-        return await self.post(shared,pr,None)
+        pr=(await _trace(self,"prep",self.prep(shared))) or [];done=set(self._resume(shared).get("done",()))
+        async for n,bp in _todo(pr,done): await _trace_item(n,time.perf_counter(),self._orch(shared,{**self.params,**bp}));self._done(shared,done,n)
+        return await self._finish(shared,pr)
+
+class _Snapshot(pickle.Pickler):
+    """Pickles classes and functions by identity, so values of local (non-importable) classes can be snapshotted too"""
+    def reducer_override(self,o): return (id,(id(o),)) if isinstance(o,(type,types.FunctionType)) else NotImplemented
+
+def _same(a,b):
+    """Whether `b`, a copy of `a` a branch may have changed in place, still holds the same contents. Compared pickled
+    rather than with ==, which can't tell for objects without __eq__ (identity) or arrays (not a bool)."""
+    if a is b: return True
+    try:
+        snaps=[]
+        for o in (a,b): buf=io.BytesIO();_Snapshot(buf,4).dump(o);snaps.append(buf.getvalue())
+        return snaps[0]==snaps[1]
+    except Exception: pass
+    try: return type(a) is type(b) and bool(a==b)
+    except Exception: return False
+
+def _merge(base,old,new):
+    """3-way merge of a branch's `new` value (changed from `old`) into `base`, the store's current value. Dicts merge per
+    key, lists keep both sides' appends, sets both sides' adds and removes; otherwise (numbers too) `new` wins."""
+    if isinstance(new,dict):
+        out,old=(dict(base) if isinstance(base,dict) else {}),(old if isinstance(old,dict) else {})
+        for k in old.keys()-new.keys(): out.pop(k,None)
+        for k,v in new.items():
+            if not (k in old and _same(v,old[k])): out[k]=_merge(out.get(k),old.get(k),v)
+        return out
+    if isinstance(new,list):
+        old=old if isinstance(old,list) else []
+        return (list(base) if isinstance(base,list) else [])+new[len(old):] if _same(new[:len(old)],old) else new
+    if isinstance(new,set):
+        old=old if isinstance(old,(set,frozenset)) else set()
+        return ((set(base) if isinstance(base,(set,frozenset)) else set())-(old-new))|(new-old)
+    return new
+
+_DELETED=object()
+
+class SharedView(collections.abc.MutableMapping):
+    """What a branch of `ParallelBatchFlow(isolate=True)` sees as `shared`: values are copied on first access and the
+    branch's changes are merged into the store when it finishes (or dropped, if it fails), against a snapshot of what it
+    first saw (live values can change in place under a lock meanwhile). Keys the branch assigned are merged; keys it
+    only read are merged only if their contents changed in place. Inside `async with shared.lock(key)`, `key` is read and
+    written in the store itself, one branch at a time."""
+    def __init__(self,store,locks,merge): self.store,self.locks,self.merge,self.local,self.old,self.live,self.written=store,locks,merge,{},{},set(),set()
+    def __getitem__(self,k):
+        if k in self.live: return self.store[k]
+        if k not in self.local: v=self.store[k];self.old[k],self.local[k]=copy.deepcopy(v),copy.deepcopy(v)
+        if (v:=self.local[k]) is _DELETED: raise KeyError(k)
+        return v
+    def __setitem__(self,k,v):
+        if k in self.live: self.store[k]=v;return
+        if k not in self.local: self.old[k]=copy.deepcopy(self.store.get(k))
+        self.local[k]=v;self.written.add(k)
+    def __delitem__(self,k):
+        if k in self.live: del self.store[k];return
+        self[k];self.local[k]=_DELETED
+    def __contains__(self,k): return self.local[k] is not _DELETED if k in self.local and k not in self.live else k in self.store
+    def __iter__(self):
+        yield from (k for k in self.store if k in self)
+        yield from (k for k,v in list(self.local.items()) if v is not _DELETED and k not in self.store)
+    def __len__(self): return sum(1 for _ in self)
+    def __repr__(self): return f"SharedView({dict(self)!r})"
+    @contextlib.asynccontextmanager
+    async def lock(self,key):
+        if self.locks is None: raise RuntimeError(f"shared.lock({key!r}) can't coordinate runs on an executor: each works on its own snapshot of the store; merge their changes with merge() instead")
+        async with self.locks[key]:
+            self._commit(key);self.live.add(key)
+            try: yield
+            finally: self.live.discard(key)
+    def _changed(self,k): return k in self.written or not _same(self.old[k],self.local[k])
+    def _commit(self,k):
+        if k not in self.local: return
+        changed=self.local[k] is not _DELETED and self._changed(k)
+        new,old=self.local.pop(k),self.old.pop(k);self.written.discard(k)
+        if new is _DELETED: self.store.pop(k,None)
+        elif changed: self.store[k]=self.merge(k,self.store.get(k),old,new)
+    def commit(self):
+        for k in list(self.local): self._commit(k)
+
+class Scheduler:
+    """A concurrency budget shared by nested `ParallelBatchFlow`s: at most `max_concurrency` batch runs, across all levels,
+    execute at once. A run waiting on its own nested batch hands its slot to it meanwhile, and freed slots go to the
+    deepest waiting run first (finishing subtrees already started), then in arrival order."""
+    def __init__(self,max_concurrency): self.max_concurrency,self.free,self.waiting,self.seq=max_concurrency,max_concurrency,[],0
+    async def acquire(self,depth=0):
+        if self.free and not self.waiting: self.free-=1;return
+        fut=asyncio.get_running_loop().create_future();heapq.heappush(self.waiting,(-depth,self.seq,fut));self.seq+=1
+        try: await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled(): self.release() # granted just as we were cancelled
+            raise
+    def release(self):
+        while self.waiting:
+            fut=heapq.heappop(self.waiting)[2]
+            if not fut.done(): fut.set_result(None);return
+        self.free+=1
+
+def _orch_pickled(flow_blob,shared_blob,params):
+    """Runs one batch run of a flow in a worker, on a snapshot of the shared store; returns its (changed, deleted) keys."""
+    flow,compiled=pickle.loads(flow_blob)
+    view=SharedView(pickle.loads(shared_blob),None,flow.merge) # no locks: they couldn't span workers
+    asyncio.run((flow.compile() if compiled else flow)._orch(view,params))
+    return {k:v for k,v in view.local.items() if v is not _DELETED and view._changed(k)},[k for k,v in view.local.items() if v is _DELETED]
 
 class ParallelBatchFlow(Flow):
+    def __init__(self,start,max_concurrency=None,rate_limit=None,checkpoint=None,isolate=False,executor=None,scheduler=None):
+        """With `isolate`, each batch run gets a copy-on-write `SharedView` of the shared store, merged back by `merge()`.
+        With `executor` ("process" or any `concurrent.futures.Executor`), runs are pickled and executed there instead,
+        isolated the same way, on a snapshot of the store taken when the batch starts. Nested batch flows given the
+        same `scheduler` draw their runs from its single concurrency budget."""
+        if executor is not None and executor!="process" and not isinstance(executor,Executor): raise ValueError(f"Unknown executor {executor!r}")
+        super().__init__(start,checkpoint);self.max_concurrency,self.rate_limit,self.isolate,self.executor,self.scheduler=max_concurrency,rate_limit,isolate,executor,scheduler
+    def merge(self,key,base,old,new):
+        """Combines an isolated run's `new` value for `key` (it read `old`; None if absent) with the store's current `base`.
+        Numbers are replaced like any other value: override this to add up a counter's deltas (`base+new-old`)."""
+        return _merge(base,old,new)
+    def _ship(self,shared):
+        shipped=copy.copy(self);shipped.successors,shipped.executor,shipped.checkpoint,shipped._table={},None,None,None
+        try: return pickle.dumps((shipped,self._table is not None)),pickle.dumps(shared)
+        except Exception as e: raise TypeError(f"{type(self).__name__}, its nodes and the shared store must be picklable to run on an executor: {e}") from e
     async def _run(self,shared):
-        pr=(await self.prep(shared)) or []
-        results = await asyncio.gather(*(self._orch(shared,{**self.params,**bp}) for bp in pr))
-        return await self.post(shared,pr,None)
+        pr=(await _trace(self,"prep",self.prep(shared))) or [];done=set(self._resume(shared).get("done",()))
+        locks,limit=collections.defaultdict(asyncio.Lock),self.max_concurrency
+        if self.executor:
+            pool,(flow_blob,shared_blob)=_pool(self.executor),self._ship(shared);snapshot=pickle.loads(shared_blob)
+            limit=limit or 2*(getattr(pool,"_max_workers",None) or os.cpu_count() or 1) # don't queue the whole batch at once
+        sched=self.scheduler;outer=_slot.get() if sched else None
+        if outer and outer[0] is not sched: outer=None
+        depth,lend=(outer[1]+1 if outer else 0),([outer] if outer and outer[2] else []) # our own slot goes to our first run
+        if sched: limit=limit or 2*sched.max_concurrency
+        async def one(nbp):
+            if sched:
+                if lend: lend.pop()[2]=False
+                else: await sched.acquire(depth)
+                slot=[sched,depth,True];token=_slot.set(slot)
+            try:
+                p={**self.params,**nbp[1]}
+                if self.executor:
+                    changed,deleted=await asyncio.get_running_loop().run_in_executor(pool,_orch_pickled,flow_blob,shared_blob,p)
+                    for k,v in changed.items(): shared[k]=self.merge(k,shared.get(k),snapshot.get(k),v)
+                    for k in deleted: shared.pop(k,None)
+                else:
+                    view=SharedView(shared,locks,self.merge) if self.isolate else shared
+                    await self._orch(view,p)
+                    if self.isolate: view.commit()
+                self._done(shared,done,nbp[0])
+            finally:
+                if sched:
+                    _slot.reset(token)
+                    if slot[2]: sched.release()
+        try: await _window(_todo(pr,done),one,limit,self.rate_limit)
+        finally:
+            if outer and not outer[2]: await sched.acquire(outer[1]);outer[2]=True # back to our own post()
+        return await self._finish(shared,pr)
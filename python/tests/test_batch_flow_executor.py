@@ -0,0 +1,78 @@
+import os
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from brainyflow import Node, ParallelBatchFlow
+
+# Nodes and flows must live at module level to be picklable for process pools
+class CountWords(Node):
+    async def prep(self, shared):
+        return shared["docs"][self.params["doc"]]
+
+    async def exec(self, text):
+        if text == "boom":
+            raise ValueError("bad document")
+        return len(text.split())
+
+    async def post(self, shared, prep_res, exec_res):
+        shared["words"][self.params["doc"]] = exec_res
+        shared["total"] += exec_res
+        shared["pids"].append(os.getpid())
+
+class CountAll(ParallelBatchFlow):
+    async def prep(self, shared):
+        return [{"doc": d} for d in shared["docs"]]
+
+    def merge(self, key, base, old, new):
+        return base + new - old if key == "total" else super().merge(key, base, old, new)
+
+class LockedCount(CountWords):
+    async def post(self, shared, prep_res, exec_res):
+        async with shared.lock("total"):
+            shared["total"] += exec_res
+
+def make_shared(docs):
+    return {"docs": docs, "words": {}, "total": 0, "pids": []}
+
+@pytest.mark.asyncio
+async def test_process_executor_runs_flow_in_workers():
+    docs = {f"d{i}": "word " * i for i in range(12)}
+    shared = make_shared(docs)
+    await CountAll(start=CountWords(), executor="process").run(shared)
+
+    assert shared["words"] == {f"d{i}": i for i in range(12)}
+    assert shared["total"] == sum(range(12))
+    assert len(shared["pids"]) == 12 and os.getpid() not in shared["pids"]
+
+@pytest.mark.asyncio
+async def test_any_executor_and_compiled_flows():
+    docs = {"a": "one two", "b": "three"}
+    shared = make_shared(docs)
+    with ThreadPoolExecutor(2) as pool:
+        await CountAll(start=CountWords(), executor=pool).compile().run(shared)
+    assert shared["words"] == {"a": 2, "b": 1} and shared["total"] == 3
+
+@pytest.mark.asyncio
+async def test_worker_error_propagates_without_partial_writes():
+    shared = make_shared({"a": "boom"})
+    with pytest.raises(ValueError, match="bad document"):
+        await CountAll(start=CountWords(), executor="process").run(shared)
+    assert shared == make_shared({"a": "boom"})
+
+@pytest.mark.asyncio
+async def test_unpicklable_shared_store_rejected():
+    shared = make_shared({"a": "x"})
+    shared["lock"] = threading.Lock()
+    with pytest.raises(TypeError, match="picklable"):
+        await CountAll(start=CountWords(), executor="process").run(shared)
+
+@pytest.mark.asyncio
+async def test_lock_is_rejected_on_workers():
+    shared = make_shared({"a": "one two", "b": "three"})
+    with ThreadPoolExecutor(2) as pool, pytest.raises(RuntimeError, match="lock"):
+        await CountAll(start=LockedCount(), executor=pool).run(shared)
+    assert shared["total"] == 0
+
+def test_unknown_executor_rejected():
+    with pytest.raises(ValueError):
+        CountAll(start=CountWords(), executor="cluster")
@@ -0,0 +1,96 @@
+import time
+import pytest
+import asyncio
+import functools
+import warnings
+import threading
+from brainyflow import Node, ParallelBatchNode
+
+class SyncSleepBatchNode(ParallelBatchNode):
+    def exec(self, item):
+        time.sleep(0.05)  # blocking call, e.g. a synchronous LLM client
+        return item
+
+class BlockingAsyncBatchNode(ParallelBatchNode):
+    async def exec(self, item):
+        time.sleep(0.05)  # blocking call inside an async def
+        return threading.get_ident()
+
+@pytest.mark.asyncio
+async def test_sync_exec_runs_off_the_event_loop():
+    node = SyncSleepBatchNode()
+    start = time.monotonic()
+    results = await node._exec(list(range(5)))
+    duration = time.monotonic() - start
+
+    assert results == list(range(5))
+    assert duration < 0.2, "Sync exec bodies should run concurrently in threads"
+
+@pytest.mark.asyncio
+async def test_blocking_flag_offloads_async_exec():
+    node = BlockingAsyncBatchNode(blocking=True)
+    start = time.monotonic()
+    results = await node._exec(list(range(5)))
+    duration = time.monotonic() - start
+
+    assert threading.get_ident() not in results
+    assert duration < 0.2, "blocking=True should run exec bodies concurrently in threads"
+
+def passthrough(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return fn(*args, **kwargs)
+    return wrapper
+
+def untyped_passthrough(fn):
+    return lambda *args, **kwargs: fn(*args, **kwargs)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("decorator", [passthrough, untyped_passthrough])
+async def test_decorated_async_exec_runs_on_the_callers_loop(decorator):
+    lock = asyncio.Lock()  # bound to this loop, like a shared async client
+
+    class Decorated(ParallelBatchNode):
+        @decorator
+        async def exec(self, item):
+            async with lock:
+                await asyncio.sleep(0.001)
+            return asyncio.get_running_loop()
+
+    assert await asyncio.wait_for(Decorated()._exec([1, 2, 3]), 5) == [asyncio.get_running_loop()] * 3
+
+@pytest.mark.asyncio
+async def test_sync_exec_keeps_retries_and_fallback():
+    attempts = 0
+
+    class FailingSyncNode(Node):
+        def exec(self, prep_res):
+            nonlocal attempts
+            attempts += 1
+            raise ValueError("fail")
+
+        async def exec_fallback(self, prep_res, exc):
+            return f"fallback: {exc}"
+
+    assert await FailingSyncNode(max_retries=2)._exec(None) == "fallback: fail"
+    assert attempts == 2
+
+@pytest.mark.asyncio
+async def test_warns_when_exec_blocks_the_loop():
+    node = BlockingAsyncBatchNode()
+    node.blocking_threshold = 0.02
+    with pytest.warns(RuntimeWarning, match="blocked the event loop"):
+        await node._exec([1])
+
+@pytest.mark.asyncio
+async def test_no_warning_for_cooperative_exec():
+    class CooperativeNode(Node):
+        async def exec(self, prep_res):
+            await asyncio.sleep(0.05)
+            return prep_res
+
+    node = CooperativeNode()
+    node.blocking_threshold = 0.02
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert await node._exec("ok") == "ok"
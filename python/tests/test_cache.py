@@ -0,0 +1,176 @@
+import time
+import pytest
+import asyncio
+from brainyflow import Node, SequentialBatchNode, ParallelBatchNode, MemoryCache, SQLiteCache
+
+class CountingNode(Node):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+
+    async def exec(self, prep_res):
+        self.calls.append(prep_res)
+        return {'echo': prep_res}
+
+class CountingBatchNode(ParallelBatchNode):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+
+    async def exec(self, item):
+        self.calls.append(item)
+        await asyncio.sleep(0.001)
+        return item * 10
+
+@pytest.mark.asyncio
+async def test_memory_cache_skips_repeated_exec():
+    node = CountingNode(cache=MemoryCache())
+    assert await node._exec({'b': 1, 'a': [1, 2]}) == {'echo': {'b': 1, 'a': [1, 2]}}
+    # Same content, different key order: still a hit
+    assert await node._exec({'a': [1, 2], 'b': 1}) == {'echo': {'b': 1, 'a': [1, 2]}}
+    assert len(node.calls) == 1
+
+@pytest.mark.asyncio
+async def test_cache_keys_include_node_class():
+    cache = MemoryCache()
+
+    class OtherNode(CountingNode):
+        pass
+
+    first, second = CountingNode(cache=cache), OtherNode(cache=cache)
+    await first._exec('text')
+    await second._exec('text')
+    assert first.calls == ['text'] and second.calls == ['text']
+
+class Doc:
+    """Default repr (`<Doc object at 0x...>`): only its contents may count in the key."""
+    def __init__(self, text):
+        self.text = text
+
+class Summary:
+    def __init__(self, values):
+        self.values = values
+
+    def __repr__(self):
+        return "Summary(...)"  # lossy, like a large array's repr
+
+def test_cache_keys_compare_values_not_reprs():
+    node = CountingNode()
+    first = node.cache_key(Doc("a"))  # freed at once: the next Doc may get its address
+    assert node.cache_key(Doc("b")) != first and node.cache_key(Doc("a")) == first
+    assert node.cache_key(Summary([1, 2])) != node.cache_key(Summary([1, 3]))
+    assert node.cache_key([1, 2]) != node.cache_key((1, 2)) != node.cache_key("(1, 2)")
+
+@pytest.mark.asyncio
+async def test_cache_keys_for_any_dict_keys():
+    node = CountingNode(cache=MemoryCache())
+    await node._exec({(1, 2): 3, 1: {"a", "b"}, "a": None})
+    await node._exec({"a": None, 1: {"b", "a"}, (1, 2): 3})
+    assert len(node.calls) == 1
+
+@pytest.mark.asyncio
+async def test_unpicklable_prep_res_skips_the_cache():
+    node = CountingNode(cache=MemoryCache())
+    with pytest.warns(RuntimeWarning, match="not cached"):
+        await node._exec({"callback": lambda: None})
+        await node._exec({"callback": lambda: None})
+    assert len(node.calls) == 2 and not node.cache.data
+
+@pytest.mark.asyncio
+async def test_fallback_results_are_not_cached():
+    class Failing(Node):
+        attempts = 0
+
+        async def exec(self, prep_res):
+            Failing.attempts += 1
+            raise ValueError("fail")
+
+        async def exec_fallback(self, prep_res, exc):
+            return 'fallback'
+
+    node = Failing(cache=MemoryCache())
+    assert await node._exec('x') == 'fallback'
+    assert await node._exec('x') == 'fallback'
+    assert Failing.attempts == 2
+
+def test_memory_cache_lru_and_ttl():
+    cache = MemoryCache(max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')  # 'a' is now most recently used
+    cache.set('c', 3)
+    assert cache.get('a') == (True, 1)
+    assert cache.get('b') == (False, None)
+
+    cache = MemoryCache(ttl=0.01)
+    cache.set('a', 1)
+    time.sleep(0.02)
+    assert cache.get('a') == (False, None)
+
+def test_sqlite_cache_persists_and_evicts(tmp_path):
+    path = tmp_path / 'cache.db'
+    cache = SQLiteCache(path, max_size=2)
+    cache.set('a', {'value': 1})
+    cache.set('b', [2])
+    cache.get('a')
+    cache.set('c', 3)
+    cache.close()
+
+    reopened = SQLiteCache(path, max_size=2)
+    assert reopened.get('a') == (True, {'value': 1})
+    assert reopened.get('b') == (False, None)
+    assert reopened.get('c') == (True, 3)
+    assert reopened.size == 2
+
+def test_sqlite_cache_ttl(tmp_path):
+    cache = SQLiteCache(tmp_path / 'cache.db', ttl=0.01)
+    cache.set('a', 1)
+    time.sleep(0.02)
+    assert cache.get('a') == (False, None)
+
+@pytest.mark.asyncio
+async def test_parallel_batch_dispatches_only_misses(tmp_path):
+    cache = SQLiteCache(tmp_path / 'cache.db')
+    first = CountingBatchNode(cache=cache)
+    assert await first._exec([1, 2, 3]) == [10, 20, 30]
+
+    # One token per second: if hits consumed tokens, the single miss would wait ~3s
+    second = CountingBatchNode(cache=cache, rate_limit=1)
+    start = time.monotonic()
+    assert await second._exec([1, 2, 3, 4]) == [10, 20, 30, 40]
+    assert second.calls == [4]
+    assert time.monotonic() - start < 0.5, "Cache hits must not consume rate-limit tokens"
+
+class CountingCache(MemoryCache):
+    gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        return super().get(key)
+
+@pytest.mark.asyncio
+async def test_batch_misses_are_looked_up_once():
+    node = CountingBatchNode(cache=CountingCache())
+    assert await node._exec(range(10)) == [i * 10 for i in range(10)]
+    assert node.cache.gets == 10
+
+    class Echo(ParallelBatchNode):
+        async def exec(self, item):
+            return item
+
+    with pytest.warns(RuntimeWarning, match="not cached") as caught:
+        await Echo(cache=MemoryCache())._exec([lambda: None])
+    assert len(caught) == 1
+
+@pytest.mark.asyncio
+async def test_sequential_batch_uses_cache():
+    class Doubler(SequentialBatchNode):
+        calls = 0
+
+        async def exec(self, item):
+            Doubler.calls += 1
+            return item * 2
+
+    node = Doubler(cache=MemoryCache())
+    assert await node._exec([1, 2, 1, 2]) == [2, 4, 2, 4]
+    assert Doubler.calls == 2
@@ -0,0 +1,125 @@
+import pytest
+import asyncio
+from brainyflow import Node, Flow, SequentialBatchFlow, ParallelBatchFlow, FileCheckpoint
+
+class Crash(Exception):
+    pass
+
+# Simulated crashes live outside `shared`, which is what the checkpoint restores
+CRASH_AT = set()
+
+class StepNode(Node):
+    """Appends its name to shared['log']; raises once when its name is in CRASH_AT."""
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+
+    async def post(self, shared, prep_res, exec_res):
+        if self.name in CRASH_AT:
+            CRASH_AT.remove(self.name)
+            raise Crash(self.name)
+        shared.setdefault('log', []).append(self.name)
+
+class ItemNode(Node):
+    async def exec(self, prep_res):
+        await asyncio.sleep(0.001 * (self.params['i'] % 3))
+        return self.params['i']
+
+    async def post(self, shared, prep_res, exec_res):
+        if exec_res in CRASH_AT:
+            CRASH_AT.remove(exec_res)
+            raise Crash(exec_res)
+        shared['runs'].append(exec_res)
+        shared['squares'][exec_res] = exec_res ** 2
+
+class Items(SequentialBatchFlow):
+    async def prep(self, shared):
+        return [{'i': i} for i in range(10)]
+
+class ParallelItems(ParallelBatchFlow):
+    async def prep(self, shared):
+        return [{'i': i} for i in range(10)]
+
+def linear_flow(checkpoint):
+    a, b, c = StepNode('a'), StepNode('b'), StepNode('c')
+    a >> b >> c
+    return Flow(start=a, checkpoint=checkpoint)
+
+@pytest.mark.asyncio
+async def test_flow_resumes_from_the_failed_node(tmp_path):
+    checkpoint = FileCheckpoint(tmp_path / 'run.ckpt')
+    CRASH_AT.add('c')
+    shared = {}
+    with pytest.raises(Crash):
+        await linear_flow(checkpoint).run(shared)
+    assert shared['log'] == ['a', 'b']
+
+    # A new process would start from scratch; the checkpoint restores shared and skips a and b
+    resumed = {}
+    await linear_flow(FileCheckpoint(tmp_path / 'run.ckpt')).run(resumed)
+    assert resumed['log'] == ['a', 'b', 'c']
+    assert not (tmp_path / 'run.ckpt').exists(), "Checkpoint is removed once the flow completes"
+
+@pytest.mark.asyncio
+async def test_compiled_flow_resumes(tmp_path):
+    CRASH_AT.add('b')
+    shared = {}
+    with pytest.raises(Crash):
+        await linear_flow(FileCheckpoint(tmp_path / 'run.ckpt')).compile().run(shared)
+    resumed = {}
+    await linear_flow(FileCheckpoint(tmp_path / 'run.ckpt')).compile().run(resumed)
+    assert resumed['log'] == ['a', 'b', 'c']
+
+@pytest.mark.asyncio
+async def test_checkpoint_rejects_a_different_graph(tmp_path):
+    CRASH_AT.add('c')
+    with pytest.raises(Crash):
+        await linear_flow(FileCheckpoint(tmp_path / 'run.ckpt')).run({})
+
+    class Other(Node):
+        pass
+
+    other = Other()
+    other >> Other() >> Other()
+    with pytest.raises(ValueError, match="doesn't match"):
+        await Flow(start=other, checkpoint=FileCheckpoint(tmp_path / 'run.ckpt')).run({})
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('batch_flow', [Items, ParallelItems])
+async def test_batch_flow_skips_completed_items(tmp_path, batch_flow):
+    def fresh():
+        return {'runs': [], 'squares': {}}
+
+    CRASH_AT.add(6)
+    shared = fresh()
+    with pytest.raises(Crash):
+        await batch_flow(start=ItemNode(), checkpoint=FileCheckpoint(tmp_path / 'batch.ckpt')).run(shared)
+    completed = list(shared['runs'])
+
+    resumed = fresh()
+    await batch_flow(start=ItemNode(), checkpoint=FileCheckpoint(tmp_path / 'batch.ckpt')).run(resumed)
+    assert resumed['squares'] == {i: i * i for i in range(10)}
+    assert sorted(resumed['runs']) == list(range(10)), "Completed items must not run again"
+    assert resumed['runs'][:len(completed)] == completed
+
+@pytest.mark.asyncio
+async def test_custom_shared_serializer(tmp_path):
+    class Client:
+        """Stands in for something that can't be pickled, like an API client."""
+        def __reduce__(self):
+            raise TypeError("cannot pickle Client")
+
+    checkpoint = FileCheckpoint(
+        tmp_path / 'run.ckpt',
+        dump_shared=lambda shared: {k: v for k, v in shared.items() if k != 'client'},
+        load_shared=lambda data: {**data, 'client': Client()},
+    )
+    CRASH_AT.add('c')
+    shared = {'client': Client()}
+    with pytest.raises(Crash):
+        await linear_flow(checkpoint).run(shared)
+
+    resumed = {}
+    await linear_flow(checkpoint).run(resumed)
+    assert isinstance(resumed['client'], Client)
+    assert resumed['log'] == ['a', 'b', 'c']
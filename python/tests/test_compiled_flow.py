@@ -0,0 +1,242 @@
+import pytest
+import asyncio
+import warnings
+from brainyflow import Node, Flow, SequentialBatchFlow, ParallelBatchFlow
+
+class RecordNode(Node):
+    """Records which node object ran and the params it saw."""
+    def __init__(self, name, **kwargs):
+        super().__init__(**kwargs)
+        self.name = name
+
+    async def prep(self, shared):
+        return self.params.get('value')
+
+    async def exec(self, value):
+        await asyncio.sleep(0.001)
+        return value
+
+    async def post(self, shared, prep_res, exec_res):
+        shared.setdefault('seen', []).append((self.name, id(self), exec_res, self.params.get('value')))
+
+class CounterNode(Node):
+    async def post(self, shared, prep_res, exec_res):
+        shared['count'] = shared.get('count', 0) + 1
+        return 'loop' if shared['count'] < 5 else 'done'
+
+@pytest.mark.asyncio
+async def test_compiled_flow_runs_nodes_without_copying():
+    a, b = RecordNode('a'), RecordNode('b')
+    a >> b
+    flow = Flow(start=a).compile()
+    flow.set_params({'value': 7})
+    shared = {}
+    await flow.run(shared)
+
+    assert shared['seen'] == [('a', id(a), 7, 7), ('b', id(b), 7, 7)]
+    assert a.params == {}, "Run params must not leak onto the node"
+
+@pytest.mark.asyncio
+async def test_compiled_flow_follows_actions_and_loops():
+    counter, end = CounterNode(), RecordNode('end')
+    counter - 'loop' >> counter
+    counter - 'done' >> end
+    shared = {}
+    await Flow(start=counter).compile().run(shared)
+
+    assert shared['count'] == 5
+    assert [s[0] for s in shared['seen']] == ['end']
+
+@pytest.mark.asyncio
+async def test_compiled_flow_isolates_params_between_parallel_runs():
+    node = RecordNode('n')
+
+    class Batch(ParallelBatchFlow):
+        async def prep(self, shared):
+            return [{'value': i} for i in range(10)]
+
+    shared = {}
+    await Batch(start=Flow(start=node).compile()).run(shared)
+
+    assert sorted(s[2] for s in shared['seen']) == list(range(10))
+    assert all(s[2] == s[3] for s in shared['seen']), "Each run must see its own params"
+    assert {s[1] for s in shared['seen']} == {id(node)}
+
+@pytest.mark.asyncio
+async def test_compiled_flow_keeps_retry_count_per_run():
+    class Flaky(Node):
+        async def exec(self, prep_res):
+            attempt = self.cur_retry
+            await asyncio.sleep(0.001 * (10 - self.params['fails']))
+            self.attempts.append((self.params['fails'], attempt, self.cur_retry))
+            if attempt < self.params['fails']:
+                raise ValueError(attempt)
+
+    node = Flaky(max_retries=4)
+    node.attempts = []
+
+    class Batch(ParallelBatchFlow):
+        async def prep(self, shared):
+            return [{'fails': i} for i in range(4)]
+
+    await Batch(start=Flow(start=node).compile()).run({})
+    assert all(before == after for _, before, after in node.attempts), "Concurrent runs must not share cur_retry"
+    assert sorted(node.attempts) == [(f, a, a) for f in range(4) for a in range(f + 1)]
+
+@pytest.mark.asyncio
+async def test_compiled_flow_params_restored_after_nested_flow():
+    inner_node, after = RecordNode('inner'), RecordNode('after')
+
+    class InnerBatch(SequentialBatchFlow):
+        async def prep(self, shared):
+            return [{'value': 1}, {'value': 2}]
+
+    inner = InnerBatch(start=Flow(start=inner_node).compile())
+    inner >> after
+    outer = Flow(start=inner).compile()
+    outer.set_params({'value': 'outer'})
+    shared = {}
+    await outer.run(shared)
+
+    assert [(s[0], s[2]) for s in shared['seen']] == [('inner', 1), ('inner', 2), ('after', 'outer')]
+
+@pytest.mark.asyncio
+async def test_compiled_flow_params_visible_in_thread_executor():
+    node = RecordNode('threaded', executor='thread')
+    flow = Flow(start=node).compile()
+    flow.set_params({'value': 3})
+    shared = {}
+    await flow.run(shared)
+    assert shared['seen'][0][2:] == (3, 3)
+
+@pytest.mark.asyncio
+async def test_compiled_table_is_a_snapshot():
+    a, b, c = RecordNode('a'), RecordNode('b'), RecordNode('c')
+    a >> b
+    flow = Flow(start=a).compile()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        a >> c  # changes after compile() are ignored until compile() is called again
+    shared = {}
+    await flow.run(shared)
+    assert [s[0] for s in shared['seen']] == ['a', 'b']
+
+@pytest.mark.asyncio
+async def test_compiled_flow_warns_on_missing_action():
+    class Branch(Node):
+        async def post(self, shared, prep_res, exec_res):
+            return 'unknown'
+
+    start = Branch()
+    start - 'known' >> RecordNode('x')
+    with pytest.warns(UserWarning, match="Flow ends: 'unknown' not found"):
+        await Flow(start=start).compile().run({})
+
+class Review(Node):
+    async def post(self, shared, prep_res, exec_res):
+        if shared.get('ok'):
+            return 'approve'
+        else:
+            return 'reject'
+
+def compile_problems(flow):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        flow.compile()
+    return [str(w.message) for w in caught]
+
+def test_compile_accepts_well_formed_graphs():
+    counter, end = CounterNode(), RecordNode('end')
+    counter - 'loop' >> counter
+    counter - 'done' >> end
+    review = Review()
+    review - 'approve' >> RecordNode('approved')
+    review - 'reject' >> review
+
+    assert compile_problems(Flow(start=counter)) == []
+    assert compile_problems(Flow(start=review)) == []
+
+def test_compile_reports_missing_and_dead_actions():
+    review, never = Review(), RecordNode('never')
+    review - 'approve' >> RecordNode('approved')
+    review - 'retry' >> never
+    never >> RecordNode('after')
+
+    assert compile_problems(Flow(start=review)) == [
+        "Review#0 may return 'reject' but has no successor for it",
+        "Review#0 never returns 'retry', so its successor for it is never taken",
+        "RecordNode#2 is unreachable",
+        "RecordNode#3 is unreachable",
+    ]
+
+def test_compile_reports_cycles_without_exit():
+    a, b, c = RecordNode('a'), RecordNode('b'), RecordNode('c')
+    a >> b >> c >> b
+
+    assert compile_problems(Flow(start=a)) == [
+        f"RecordNode#{i} never reaches an end of the flow (cycle with no exit)" for i in range(3)
+    ]
+
+def test_compile_strict_raises_before_running():
+    a = RecordNode('a')
+    a >> a
+    with pytest.raises(ValueError, match=r"(?s)Invalid flow:.*RecordNode#0 never reaches an end of the flow \(cycle with no exit\)"):
+        Flow(start=a).compile(strict=True)
+
+def test_compile_checks_nested_flows():
+    inner = Review()
+    inner - 'approve' >> RecordNode('approved')
+
+    assert compile_problems(Flow(start=Flow(start=inner))) == ["Review#0 may return 'reject' but has no successor for it"]
+
+def test_declared_or_dynamic_actions():
+    class Dynamic(Node):
+        async def post(self, shared, prep_res, exec_res):
+            return shared['next']
+
+    dynamic = Dynamic()
+    dynamic - 'a' >> RecordNode('a')
+    dynamic - 'b' >> dynamic
+    assert compile_problems(Flow(start=dynamic)) == [], "Actions that can't be read from post() aren't checked"
+
+    dynamic.actions = ['a']
+    assert compile_problems(Flow(start=dynamic)) == ["Dynamic#0 never returns 'b', so its successor for it is never taken"]
+
+class Poll(Node):
+    async def post(self, shared, prep_res, exec_res):
+        while True:
+            if shared.get('ready'):
+                return 'ready'
+            shared['ready'] = True
+
+class Route(Node):
+    async def post(self, shared, prep_res, exec_res):
+        match shared.get('kind'):
+            case 'a':
+                return 'a'
+            case _:
+                return 'b'
+
+def test_control_flow_that_cant_be_followed_is_not_guessed():
+    poll, route = Poll(), Route()
+    poll - 'ready' >> route
+    route - 'a' >> RecordNode('a')
+    route - 'b' >> RecordNode('b')
+
+    assert compile_problems(Flow(start=poll)) == []
+    Flow(start=poll).compile(strict=True)
+
+async def _go(self, shared, prep_res, exec_res):
+    return 'go'
+
+def test_post_that_isnt_a_def_is_not_read():
+    class Lambda(Node):
+        post = lambda self, shared, prep_res, exec_res: asyncio.sleep(0, 'go')
+
+    class Alias(Node):
+        post = _go
+
+    for node in (Lambda(), Alias()):
+        node - 'go' >> RecordNode('go')
+        assert compile_problems(Flow(start=node)) == []
+        Flow(start=node).compile(strict=True)
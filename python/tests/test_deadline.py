@@ -0,0 +1,114 @@
+import pytest
+import asyncio
+import time
+from brainyflow import Node, Flow, ParallelBatchNode, ParallelBatchFlow, RetryPolicy, time_remaining
+
+class Slow(Node):
+    def __init__(self, delay, **kwargs):
+        super().__init__(**kwargs)
+        # Lists, so that the copies flows make of the node record into them too
+        self.delay, self.cancelled, self.left = delay, [], []
+
+    async def exec(self, _):
+        self.left.append(time_remaining())
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(True)
+            raise
+        return "done"
+
+    async def post(self, shared, prep_res, exec_res):
+        shared["result"] = exec_res
+
+@pytest.mark.asyncio
+async def test_run_timeout_cancels_in_flight_exec():
+    node, start = Slow(1), time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        await Flow(start=node).run({}, timeout=0.05)
+    assert time.perf_counter() - start < 0.5
+    assert node.cancelled
+
+@pytest.mark.asyncio
+async def test_deadline_visible_in_exec():
+    node = Slow(0)
+    await node.run({}, timeout=5)
+    await node.run({})
+    assert 4.5 < node.left[0] <= 5 and node.left[1] is None
+
+@pytest.mark.asyncio
+async def test_inner_timeout_cannot_extend_outer_deadline():
+    inner = Slow(0)
+
+    class Outer(Node):
+        async def exec(self, _):
+            await inner.run({}, timeout=60)
+
+    await Outer().run({}, timeout=1)
+    assert inner.left[0] <= 1
+
+@pytest.mark.asyncio
+async def test_node_timeout_is_retried():
+    class Flaky(Slow):
+        async def exec(self, prep_res):
+            self.delay = 1 if self.cur_retry == 0 else 0
+            return await super().exec(prep_res)
+
+    node, shared = Flaky(1, max_retries=2, timeout=0.02), {}
+    await node.run(shared)
+    assert shared["result"] == "done" and node.cancelled
+
+@pytest.mark.asyncio
+async def test_node_timeout_goes_to_fallback():
+    class Fallback(Slow):
+        async def exec_fallback(self, prep_res, exc):
+            return type(exc).__name__
+
+    shared = {}
+    await Fallback(1, timeout=0.02).run(shared)
+    assert shared["result"] == "TimeoutError"
+
+@pytest.mark.asyncio
+async def test_retry_wait_past_deadline_falls_back_immediately():
+    class Failing(Node):
+        async def exec(self, _):
+            raise ConnectionError("down")
+
+        async def exec_fallback(self, prep_res, exc):
+            return "fallback"
+
+    node, start = Failing(retry=RetryPolicy(max_retries=3, wait=10, jitter=False)), time.perf_counter()
+    await node.run({}, timeout=1)
+    assert time.perf_counter() - start < 0.5
+
+@pytest.mark.asyncio
+async def test_failed_item_cancels_and_awaits_siblings():
+    finished = []
+
+    class Items(ParallelBatchNode):
+        async def exec(self, item):
+            try:
+                await asyncio.sleep(0.01 if item == "bad" else 1)
+                if item == "bad":
+                    raise ValueError(item)
+            finally:
+                finished.append(item)
+
+    with pytest.raises(ValueError):
+        await Items()._exec(["a", "bad", "b"])
+    # Cancelled siblings have finished cleaning up by the time the error surfaces
+    assert sorted(finished) == ["a", "b", "bad"]
+
+@pytest.mark.asyncio
+async def test_run_timeout_cancels_parallel_batch_flow():
+    node = Slow(1)
+
+    class Batch(ParallelBatchFlow):
+        async def prep(self, shared):
+            return [{"i": i} for i in range(5)]
+
+    start = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        await Batch(start=node).run({}, timeout=0.05)
+    assert time.perf_counter() - start < 0.5
+    assert node.cancelled
@@ -0,0 +1,75 @@
+import os
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from brainyflow import Node, SequentialBatchNode, ParallelBatchNode
+
+# Nodes must live at module level to be picklable for process pools
+
+class PidNode(Node):
+    async def exec(self, prep_res):
+        return os.getpid(), prep_res * 2
+
+class CpuBatchNode(ParallelBatchNode):
+    async def exec(self, n):
+        return os.getpid(), sum(i * i for i in range(n))
+
+class SyncExecNode(Node):
+    def exec(self, prep_res):
+        return threading.get_ident()
+
+class FlakyNode(Node):
+    attempts = 0
+
+    async def exec(self, prep_res):
+        FlakyNode.attempts += 1
+        if FlakyNode.attempts < 3:
+            raise ValueError("flaky")
+        return "ok"
+
+@pytest.mark.asyncio
+async def test_process_executor_runs_exec_in_another_process():
+    node = PidNode(executor="process")
+    pid, result = await node._exec(21)
+    assert result == 42
+    assert pid != os.getpid()
+
+@pytest.mark.asyncio
+async def test_parallel_batch_node_honors_process_executor():
+    node = CpuBatchNode(executor="process", max_concurrency=4)
+    results = await node._exec([10_000] * 8)
+    assert [r for _, r in results] == [sum(i * i for i in range(10_000))] * 8
+    assert all(pid != os.getpid() for pid, _ in results)
+
+@pytest.mark.asyncio
+async def test_thread_executor_accepts_sync_exec():
+    node = SyncExecNode(executor="thread")
+    assert await node._exec(None) != threading.get_ident()
+
+@pytest.mark.asyncio
+async def test_custom_executor_instance():
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="custom") as pool:
+        class NameNode(SequentialBatchNode):
+            async def exec(self, item):
+                return threading.current_thread().name.startswith("custom")
+        assert await NameNode(executor=pool)._exec([1, 2]) == [True, True]
+
+@pytest.mark.asyncio
+async def test_retries_apply_to_offloaded_exec():
+    FlakyNode.attempts = 0
+    node = FlakyNode(max_retries=3, executor="thread")
+    assert await node._exec(None) == "ok"
+    assert FlakyNode.attempts == 3
+
+@pytest.mark.asyncio
+async def test_unpicklable_node_raises_clear_error():
+    class LocalNode(Node):
+        async def exec(self, prep_res):
+            return prep_res
+
+    with pytest.raises(TypeError, match="must be picklable"):
+        await LocalNode(executor="process")._exec(1)
+
+def test_unknown_executor_rejected():
+    with pytest.raises(ValueError, match="Unknown executor"):
+        Node(executor="gpu")
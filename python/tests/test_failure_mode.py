@@ -0,0 +1,93 @@
+import pytest
+import asyncio
+from brainyflow import ParallelBatchNode, BatchResult, BatchError, ItemError
+
+class Square(ParallelBatchNode):
+    def __init__(self, bad=(), **kwargs):
+        super().__init__(**kwargs)
+        self.bad, self.calls = set(bad), []
+
+    async def exec(self, item):
+        self.calls.append(item)
+        await asyncio.sleep(0.001)
+        if item in self.bad:
+            raise ValueError(f"bad input {item}")
+        return item * item
+
+@pytest.mark.asyncio
+async def test_fail_fast_is_the_default():
+    node = Square(bad={3}, max_concurrency=2)
+    with pytest.raises(ValueError, match="bad input 3"):
+        await node._exec(range(100))
+    assert len(node.calls) < 100
+
+@pytest.mark.asyncio
+async def test_collect_keeps_successful_results():
+    node = Square(bad={3, 7, 42}, failure_mode="collect", max_concurrency=8)
+    results = await node._exec(list(range(100)))
+
+    assert isinstance(results, BatchResult) and len(results) == 100
+    assert results[2] == 4 and results[3] is None and results[99] == 99 * 99
+    assert [(e.index, e.item) for e in results.errors] == [(3, 3), (7, 7), (42, 42)]
+    assert isinstance(results.errors[0], ItemError) and isinstance(results.errors[0].error, ValueError)
+    assert len(node.calls) == 100
+
+@pytest.mark.asyncio
+async def test_collect_after_retries_and_fallback():
+    class Flaky(Square):
+        async def exec_fallback(self, item, exc):
+            if item == 5:
+                return -1
+            raise exc
+
+    node = Flaky(bad={4, 5}, failure_mode="collect", max_retries=2)
+    results = await node._exec([4, 5, 6])
+    assert list(results) == [None, -1, 36]
+    assert [e.index for e in results.errors] == [0]
+    assert node.calls.count(4) == 2
+
+@pytest.mark.asyncio
+async def test_count_threshold():
+    results = await Square(bad={1, 2}, failure_mode=2)._exec([1, 2, 3])
+    assert [e.item for e in results.errors] == [1, 2]
+
+    node = Square(bad={1, 2, 3}, failure_mode=2, max_concurrency=1)
+    with pytest.raises(BatchError) as info:
+        await node._exec(list(range(1, 50)))
+    assert [e.item for e in info.value.errors] == [1, 2, 3]
+    assert len(node.calls) == 3
+
+@pytest.mark.asyncio
+async def test_fraction_threshold():
+    results = await Square(bad={0}, failure_mode=0.1)._exec(list(range(10)))
+    assert len(results.errors) == 1
+
+    with pytest.raises(BatchError, match="2 of 10 items failed"):
+        await Square(bad={0, 1}, failure_mode=0.1, max_concurrency=1)._exec(list(range(10)))
+
+    async def gen():
+        yield 1
+
+    with pytest.raises(TypeError):
+        await Square(failure_mode=0.5)._exec(gen())
+
+@pytest.mark.asyncio
+async def test_post_item_skips_failed_items_and_post_gets_errors():
+    class Streamed(Square):
+        async def prep(self, shared):
+            return [1, 2, 3]
+
+        async def post_item(self, shared, item, result):
+            shared.setdefault("done", []).append(item)
+
+        async def post(self, shared, prep_res, exec_res):
+            shared["errors"] = exec_res.errors
+
+    shared = {}
+    await Streamed(bad={2}, failure_mode="collect").run(shared)
+    assert sorted(shared["done"]) == [1, 3]
+    assert [e.item for e in shared["errors"]] == [2]
+
+def test_invalid_failure_mode():
+    with pytest.raises(ValueError):
+        Square(failure_mode="ignore")
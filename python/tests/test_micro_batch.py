@@ -0,0 +1,91 @@
+import pytest
+import asyncio
+from brainyflow import ParallelBatchNode, MemoryCache
+
+class EmbedNode(ParallelBatchNode):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+
+    async def exec_batch(self, texts):
+        self.calls.append(list(texts))
+        await asyncio.sleep(0.005)
+        return [len(t) for t in texts]
+
+@pytest.mark.asyncio
+async def test_items_are_coalesced_by_size():
+    node = EmbedNode(batch_size=10, batch_wait=0.05)
+    texts = ['x' * i for i in range(25)]
+    results = await node._exec(texts)
+
+    assert results == list(range(25))
+    assert [len(c) for c in node.calls] == [10, 10, 5]
+
+@pytest.mark.asyncio
+async def test_partial_batch_flushed_after_wait():
+    node = EmbedNode(batch_size=100, batch_wait=0.01)
+    assert await node._exec(['a', 'bb', 'ccc']) == [1, 2, 3]
+    assert node.calls == [['a', 'bb', 'ccc']]
+
+@pytest.mark.asyncio
+async def test_max_concurrency_bounds_batch_size():
+    node = EmbedNode(batch_size=100, batch_wait=0.01, max_concurrency=4)
+    await node._exec(['a'] * 10)
+    assert all(len(c) <= 4 for c in node.calls)
+    assert sum(len(c) for c in node.calls) == 10
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_per_item():
+    class FlakyEmbed(EmbedNode):
+        async def exec_batch(self, texts):
+            if not self.calls:
+                self.calls.append(None)
+                raise ConnectionError("provider unavailable")
+            return await super().exec_batch(texts)
+
+    node = FlakyEmbed(batch_size=3, batch_wait=0.001, max_retries=2)
+    assert await node._exec(['a', 'bb', 'ccc']) == [1, 2, 3]
+    assert node.calls == [None, ['a', 'bb', 'ccc']]
+
+@pytest.mark.asyncio
+async def test_wrong_result_count_goes_to_fallback():
+    class Broken(EmbedNode):
+        async def exec_batch(self, texts):
+            return [0]
+
+        async def exec_fallback(self, text, exc):
+            return str(exc)
+
+    results = await Broken(batch_size=2, batch_wait=0.001)._exec(['a', 'b'])
+    assert results == ['exec_batch returned 1 results for 2 items'] * 2
+
+@pytest.mark.asyncio
+async def test_sync_exec_batch_and_cache():
+    class SyncEmbed(ParallelBatchNode):
+        calls = []
+
+        def exec_batch(self, texts):
+            SyncEmbed.calls.append(list(texts))
+            return [t.upper() for t in texts]
+
+    cache = MemoryCache()
+    assert await SyncEmbed(cache=cache, batch_wait=0.001)._exec(['a', 'b']) == ['A', 'B']
+    assert await SyncEmbed(cache=cache, batch_wait=0.001)._exec(['a', 'b', 'c']) == ['A', 'B', 'C']
+    assert SyncEmbed.calls == [['a', 'b'], ['c']], "Only cache misses reach exec_batch"
+
+@pytest.mark.asyncio
+async def test_abandoned_batches_are_cancelled():
+    class Slow(ParallelBatchNode):
+        finished = []
+
+        async def exec_batch(self, items):
+            if 1 in items:
+                raise ValueError("bad batch")
+            await asyncio.sleep(0.1)
+            Slow.finished.append(items)
+            return items
+
+    with pytest.raises(ValueError):
+        await Slow(batch_size=2, batch_wait=0)._exec([1, 2, 3, 4])
+    await asyncio.sleep(0.2)
+    assert Slow.finished == [], "fail_fast cancelled every caller of [3, 4]: its call must not keep running"
@@ -233,3 +233,50 @@ async def test_handle_errors_with_concurrency():
     # but it should be > 0 if tasks actually run in parallel.
     print(f"Total items processed before/during error: {processed_count}")
     assert processed_count > 0
+
+@pytest.mark.asyncio
+async def test_accept_async_iterator_items():
+    async def items():
+        for key, value in [('a', 1), ('b', 2), ('c', 3)]:
+            yield {'key': key, 'value': value}
+
+    node = ParallelBatchNode(max_concurrency=2)
+    node.exec = ProcessingNode().exec
+
+    results = await node._exec(items())
+    assert results == [{'a': 2}, {'b': 4}, {'c': 6}]
+
+@pytest.mark.asyncio
+async def test_stream_results_with_post_item():
+    in_flight_at_post = []
+
+    class StreamingNode(ParallelBatchNode):
+        def __init__(self):
+            super().__init__(max_concurrency=2)
+            self.in_flight = 0
+
+        async def prep(self, shared):
+            async def items():
+                for i in range(6):
+                    yield i
+            return items()
+
+        async def exec(self, item):
+            self.in_flight += 1
+            await asyncio.sleep(0.01 * (3 - item % 3))
+            self.in_flight -= 1
+            return item * 2
+
+        async def post_item(self, shared, item, exec_res):
+            in_flight_at_post.append(self.in_flight)
+            shared.setdefault('results', {})[item] = exec_res
+
+        async def post(self, shared, prep_res, exec_res_list):
+            shared['post_arg'] = exec_res_list
+
+    shared = {}
+    await StreamingNode().run(shared)
+    assert shared['results'] == {i: i * 2 for i in range(6)}
+    assert shared['post_arg'] is None
+    # Results are delivered while later items are still running
+    assert any(n > 0 for n in in_flight_at_post)
@@ -0,0 +1,196 @@
+import time
+import pytest
+import asyncio
+from brainyflow import Node, Flow, SequentialBatchNode, ParallelBatchNode, Stream
+
+class StageIO:
+    """Reads `shared[src]` and writes its results (a list, or a Stream when pipelined) to `shared[dst]`."""
+    def __init__(self, src, dst, delay=0.01, **kwargs):
+        super().__init__(**kwargs)
+        self.src, self.dst, self.delay = src, dst, delay
+
+    async def prep(self, shared):
+        return shared[self.src]
+
+    async def post(self, shared, prep_res, exec_res):
+        shared[self.dst] = exec_res
+
+class Stage(StageIO, SequentialBatchNode):
+    """Spends `delay` per item."""
+    async def exec(self, item):
+        await asyncio.sleep(self.delay)
+        self.params["log"].append((self.dst, item, time.perf_counter()))
+        return item * 10
+
+class ParallelStage(StageIO, ParallelBatchNode):
+    async def exec(self, item):
+        await asyncio.sleep(self.delay * (3 - item % 3))  # finishes out of order
+        self.params["log"].append((self.dst, item, time.perf_counter()))
+        return item * 10
+
+def chain(*stages, pipeline=True):
+    for a, b in zip(stages, stages[1:]):
+        a >> b
+    flow = Flow(start=stages[0], pipeline=pipeline)
+    flow.set_params({"log": []})
+    return flow
+
+@pytest.mark.asyncio
+async def test_stages_overlap():
+    timings = {}
+    for pipeline in (False, True):
+        flow = chain(Stage("in", "a"), Stage("a", "b"), Stage("b", "c"), pipeline=pipeline)
+        shared, start = {"in": list(range(10))}, time.perf_counter()
+        await flow.run(shared)
+        timings[pipeline] = time.perf_counter() - start
+        log = flow.params["log"]
+
+        assert shared["c"] == [i * 1000 for i in range(10)]
+        if pipeline:
+            first_c = min(t for stage, _, t in log if stage == "c")
+            last_a = max(t for stage, _, t in log if stage == "a")
+            assert first_c < last_a, "the last stage starts before the first one is done"
+    # Three 100ms stages take about 300ms one after another, 100ms + two items' worth when pipelined
+    assert timings[True] < timings[False] * 0.6
+
+@pytest.mark.asyncio
+async def test_intermediate_results_are_streams_in_input_order():
+    flow = chain(Stage("in", "a", delay=0), ParallelStage("a", "b", delay=0.002), Stage("b", "c", delay=0))
+    shared = {"in": list(range(12))}
+    await flow.run(shared)
+
+    assert isinstance(shared["a"], Stream) and isinstance(shared["b"], Stream)
+    assert shared["c"] == [i * 1000 for i in range(12)], "the last stage has no successor: it still gets a list"
+
+@pytest.mark.asyncio
+async def test_bounded_queues_hold_producers_back():
+    class Slow(Stage):
+        async def exec(self, item):
+            await asyncio.sleep(0.05 if item == 0 else 0)
+            return await super().exec(item)
+
+    first = Stage("in", "a", delay=0)
+    first.stream_buffer = 2
+    flow = chain(first, Slow("a", "b", delay=0))
+    shared = {"in": list(range(50))}
+    task = asyncio.ensure_future(flow.run(shared))
+    await asyncio.sleep(0.03)
+
+    produced = sum(1 for stage, _, _ in flow.params["log"] if stage == "a")
+    assert produced <= 4  # 2 buffered, 1 being read, 1 waiting for room
+    await task
+    assert len(shared["b"]) == 50
+
+@pytest.mark.asyncio
+async def test_upstream_failure_reaches_the_flow():
+    class Broken(Stage):
+        async def exec(self, item):
+            if item == 3:
+                raise ValueError("bad item")
+            return await super().exec(item)
+
+    flow = chain(Broken("in", "a", delay=0), Stage("a", "b", delay=0))
+    with pytest.raises(ValueError, match="bad item"):
+        await flow.run({"in": list(range(10))})
+
+@pytest.mark.asyncio
+async def test_post_item_and_nested_flows_are_not_pipelined():
+    class PerItem(Stage):
+        async def post_item(self, shared, item, exec_res):
+            shared.setdefault("items", []).append(exec_res)
+
+    inner = Stage("in", "a", delay=0)
+    inner >> Stage("a", "b", delay=0)
+    inner_flow = Flow(start=inner)
+    inner_flow >> Node()
+    per_item = PerItem("in", "x", delay=0)
+    per_item >> inner_flow
+    flow = Flow(start=per_item, pipeline=True)
+    flow.set_params({"log": []})
+    shared = {"in": [1, 2]}
+    await flow.run(shared)
+
+    assert shared["items"] == [10, 20] and shared["x"] is None
+    assert shared["a"] == [10, 20] and shared["b"] == [100, 200]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_concurrency", [None, 4])
+async def test_parallel_stage_hands_results_over_while_reading(max_concurrency):
+    flow = chain(Stage("in", "a", delay=0.03), ParallelStage("a", "b", delay=0.002, max_concurrency=max_concurrency), Stage("b", "c", delay=0))
+    shared, start = {"in": list(range(10))}, time.perf_counter()
+    await flow.run(shared)
+    log = flow.params["log"]
+
+    arrived = sorted(t - start for stage, _, t in log if stage == "c")
+    last_a = max(t for stage, _, t in log if stage == "a") - start
+    # Each item reaches the last stage soon after the first stage made it, not in bursts or at the end
+    assert arrived[0] < 0.1 and arrived[4] < last_a - 0.1
+    assert shared["c"] == [i * 1000 for i in range(10)]
+
+@pytest.mark.asyncio
+async def test_failed_items_are_left_out_of_the_stream():
+    class Flaky(ParallelStage):
+        async def exec(self, item):
+            if item == 2:
+                raise ValueError("bad item")
+            return await super().exec(item)
+
+    flaky = Flaky("in", "a", delay=0, failure_mode="collect")
+    flow = chain(flaky, Stage("a", "b", delay=0))
+    shared = {"in": [1, 2, 3]}
+    await flow.run(shared)
+
+    assert shared["b"] == [100, 300]
+    assert [(e.index, e.item) for e in shared["a"].errors] == [(1, 2)]
+
+@pytest.mark.asyncio
+async def test_stages_nobody_reads_still_run_every_item():
+    class Ignores(Stage):
+        async def prep(self, shared):
+            return [0]  # doesn't read the stream it was handed
+
+    class Done(Stage):
+        async def post(self, shared, prep_res, exec_res):
+            await super().post(shared, prep_res, exec_res)
+            return "done"  # no successor for this action: the flow ends here
+
+    ignored = chain(Stage("in", "a", delay=0), Ignores("a", "b", delay=0))
+    await ignored.run({"in": list(range(100))})
+    ended = chain(Done("in", "a", delay=0), Stage("a", "b", delay=0))
+    with pytest.warns(UserWarning, match="Flow ends: 'done' not found"):
+        await ended.run({"in": list(range(100))})
+
+    for flow in (ignored, ended):
+        assert sum(1 for stage, _, _ in flow.params["log"] if stage == "a") == 100
+
+@pytest.mark.asyncio
+async def test_unread_stage_failure_reaches_the_flow():
+    class Broken(Stage):
+        async def exec(self, item):
+            if item == 3:
+                raise ValueError("bad item")
+            return await super().exec(item)
+
+        async def post(self, shared, prep_res, exec_res):
+            return "done"
+
+    flow = chain(Broken("in", "a", delay=0), Stage("a", "b", delay=0))
+    with pytest.raises(ValueError, match="bad item"), pytest.warns(UserWarning, match="Flow ends"):
+        await flow.run({"in": list(range(10))})
+
+@pytest.mark.asyncio
+async def test_stage_followed_by_a_plain_node_gets_its_results():
+    class Branches(Stage):
+        async def post(self, shared, prep_res, exec_res):
+            await super().post(shared, prep_res, exec_res)
+            return "big" if max(exec_res) > 50 else "small"
+
+    first = Branches("in", "a", delay=0)
+    first - "big" >> Node()
+    first - "small" >> Stage("a", "b", delay=0)
+    flow = Flow(start=first, pipeline=True)
+    flow.set_params({"log": []})
+    shared = {"in": list(range(10))}
+    await flow.run(shared)
+
+    assert shared["a"] == [i * 10 for i in range(10)] and "b" not in shared
@@ -0,0 +1,89 @@
+import time
+import pytest
+from brainyflow import Node, ParallelBatchNode, RetryPolicy
+
+class RateLimitError(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__("rate limited")
+        self.retry_after = retry_after
+
+class FailingNode(Node):
+    def __init__(self, failures, error=ValueError, **kwargs):
+        super().__init__(**kwargs)
+        self.failures, self.error, self.attempts = failures, error, 0
+
+    async def exec(self, prep_res):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise self.error()
+        return "success"
+
+    async def exec_fallback(self, prep_res, exc):
+        return f"fallback: {type(exc).__name__}"
+
+def test_exponential_backoff_without_jitter():
+    policy = RetryPolicy(max_retries=5, wait=0.1, backoff=2, max_wait=0.5, jitter=False)
+    delays = [policy.delay(attempt, ValueError(), 0) for attempt in range(4)]
+    assert delays == pytest.approx([0.1, 0.2, 0.4, 0.5])
+
+def test_full_jitter_stays_within_bounds():
+    policy = RetryPolicy(wait=1, backoff=2, max_wait=60, jitter=True)
+    delays = [policy.delay(3, ValueError(), 0) for _ in range(200)]
+    assert all(0 <= d <= 8 for d in delays)
+    assert len(set(delays)) > 1, "Jitter should spread retries out"
+
+def test_retry_after_hint_is_honored():
+    policy = RetryPolicy(wait=0.01, jitter=False)
+    assert policy.delay(0, RateLimitError(retry_after=3), 0) == 3
+
+    class Response:
+        headers = {'retry-after': '2'}
+    exc = Exception()
+    exc.response = Response()
+    assert policy.delay(0, exc, 0) == 2
+
+def test_max_elapsed_stops_retrying():
+    policy = RetryPolicy(wait=1, jitter=False, max_elapsed=5)
+    assert policy.delay(0, ValueError(), 3.5) == 1
+    assert policy.delay(1, ValueError(), 3.5) is None
+
+@pytest.mark.asyncio
+async def test_retries_until_success_with_policy():
+    node = FailingNode(2, retry=RetryPolicy(max_retries=3, wait=0.001))
+    assert await node._exec(None) == "success"
+    assert node.attempts == 3
+    assert node.max_retries == 3
+
+@pytest.mark.asyncio
+async def test_retry_on_filters_exceptions():
+    node = FailingNode(2, error=KeyError, retry=RetryPolicy(max_retries=5, wait=0.001, retry_on=(ValueError, RateLimitError)))
+    assert await node._exec(None) == "fallback: KeyError"
+    assert node.attempts == 1, "Non-retryable errors should go straight to the fallback"
+
+@pytest.mark.asyncio
+async def test_retry_on_predicate():
+    node = FailingNode(1, retry=RetryPolicy(max_retries=3, wait=0.001, retry_on=lambda e: isinstance(e, ValueError)))
+    assert await node._exec(None) == "success"
+    assert node.attempts == 2
+
+@pytest.mark.asyncio
+async def test_retry_after_delays_the_next_attempt():
+    node = FailingNode(1, error=lambda: RateLimitError(retry_after=0.05), retry=RetryPolicy(max_retries=2, wait=0))
+    start = time.monotonic()
+    assert await node._exec(None) == "success"
+    assert time.monotonic() - start >= 0.045
+
+@pytest.mark.asyncio
+async def test_policy_applies_to_each_batch_item():
+    attempts = {}
+
+    class FlakyBatchNode(ParallelBatchNode):
+        async def exec(self, item):
+            attempts[item] = attempts.get(item, 0) + 1
+            if attempts[item] < 3:
+                raise ValueError("flaky")
+            return item
+
+    node = FlakyBatchNode(retry=RetryPolicy(max_retries=3, wait=0.005))
+    assert await node._exec([1, 2, 3]) == [1, 2, 3]
+    assert attempts == {1: 3, 2: 3, 3: 3}
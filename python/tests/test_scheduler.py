@@ -0,0 +1,111 @@
+import time
+import pytest
+import asyncio
+from brainyflow import Node, Flow, ParallelBatchFlow, Scheduler
+
+# One big class and a few small ones: the skewed tree a per-level limit handles badly
+SCHOOL = {"big": 40, "a": 4, "b": 4, "c": 4}
+
+class Grade(Node):
+    async def prep(self, shared):
+        return self.params["class"], self.params["student"]
+
+    async def exec(self, key):
+        shared = self.params["shared"]
+        shared["running"] += 1
+        shared["peak"] = max(shared["peak"], shared["running"])
+        await asyncio.sleep(0.01)
+        shared["running"] -= 1
+        return key
+
+    async def post(self, shared, prep_res, exec_res):
+        shared["graded"].append(exec_res)
+
+class Students(ParallelBatchFlow):
+    async def prep(self, shared):
+        return [{"student": s} for s in range(SCHOOL[self.params["class"]])]
+
+    async def post(self, shared, prep_res, exec_res):
+        shared["finished"].append(self.params["class"])
+
+class Classes(ParallelBatchFlow):
+    async def prep(self, shared):
+        return [{"class": c} for c in SCHOOL]
+
+def school(**options):
+    inner = {k: v for k, v in options.items() if k != "outer"}
+    return Classes(start=Students(start=Grade(), **inner), **options.get("outer", inner))
+
+def make_shared():
+    shared = {"running": 0, "peak": 0, "graded": [], "finished": []}
+    return shared, {"shared": shared}
+
+async def timed(flow, shared, params):
+    flow.set_params(params)
+    start = time.perf_counter()
+    await flow.run(shared)
+    return time.perf_counter() - start
+
+@pytest.mark.asyncio
+async def test_shared_budget_bounds_all_levels():
+    shared, params = make_shared()
+    await timed(school(scheduler=Scheduler(6)), shared, params)
+
+    assert len(shared["graded"]) == sum(SCHOOL.values())
+    assert sorted(shared["finished"]) == sorted(SCHOOL)
+    assert shared["peak"] == 6
+
+@pytest.mark.asyncio
+async def test_idle_slots_go_to_the_big_branch():
+    shared, params = make_shared()
+    per_level = await timed(school(outer={"max_concurrency": 4}, max_concurrency=4), shared, params)
+    shared, params = make_shared()
+    scheduled = await timed(school(scheduler=Scheduler(16)), shared, params)
+
+    # Per level, the big class never runs more than 4 students at once
+    assert scheduled < per_level * 0.6
+
+@pytest.mark.asyncio
+async def test_single_slot_does_not_deadlock():
+    shared, params = make_shared()
+    await asyncio.wait_for(timed(school(scheduler=Scheduler(1)), shared, params), 5)
+
+    assert shared["peak"] == 1
+    assert len(shared["graded"]) == sum(SCHOOL.values())
+
+@pytest.mark.asyncio
+async def test_started_subtrees_finish_first():
+    shared, params = make_shared()
+    await timed(school(scheduler=Scheduler(1)), shared, params)
+
+    # Deepest runs first: each class is graded completely before the next one starts
+    classes = [c for c, _ in shared["graded"]]
+    assert classes == sorted(classes, key=list(SCHOOL).index)
+
+@pytest.mark.asyncio
+async def test_budget_is_returned_after_cancellation():
+    scheduler = Scheduler(3)
+    shared, params = make_shared()
+    flow = school(scheduler=scheduler)
+    flow.set_params(params)
+    with pytest.raises(asyncio.TimeoutError):
+        await flow.run(shared, timeout=0.015)
+
+    assert scheduler.free == 3 and not [w for w in scheduler.waiting if not w[2].done()]
+    shared, params = make_shared()
+    await timed(flow, shared, params)
+    assert len(shared["graded"]) == sum(SCHOOL.values())
+
+@pytest.mark.asyncio
+async def test_plain_flow_between_levels():
+    class Wrapped(ParallelBatchFlow):
+        async def prep(self, shared):
+            return [{"class": c} for c in SCHOOL]
+
+    scheduler = Scheduler(5)
+    shared, params = make_shared()
+    flow = Wrapped(start=Flow(start=Students(start=Grade(), scheduler=scheduler)), scheduler=scheduler)
+    await timed(flow, shared, params)
+
+    assert shared["peak"] == 5
+    assert len(shared["graded"]) == sum(SCHOOL.values())
@@ -145,3 +145,17 @@ async def test_sequential_batch_flow_modifies_shared_sequentially():
     assert 'log' in shared_state
     # Check if the log reflects the sequential processing order
     assert shared_state['log'] == ["Processed 1", "Processed 2", "Processed 3"]
+
+@pytest.mark.asyncio
+async def test_sequential_batch_flow_async_iterator_prep():
+    """Tests that prep can return an async iterator of parameter sets."""
+    class StreamingBatchFlow(SequentialBatchFlow):
+        async def prep(self, shared):
+            async def params():
+                for value in [3, 1, 2]:
+                    yield {'value': value}
+            return params()
+
+    shared = {}
+    await StreamingBatchFlow(start=sub_flow).run(shared)
+    assert shared['processed_order'] == [3, 1, 2]
@@ -261,3 +261,54 @@ async def test_handle_complex_transformations():
     assert combined['result_2']['sum'] == 9
     assert combined['result_1']['count'] == 3
     assert combined['result_2']['count'] == 2
+
+
+@pytest.mark.asyncio
+async def test_accept_async_iterator_from_prep():
+    class StreamingNode(SequentialBatchNode):
+        async def prep(self, shared):
+            async def chunks():
+                for i in range(5):
+                    yield i
+            return chunks()
+
+        async def exec(self, item):
+            return item * 10
+
+        async def post(self, shared, prep_res, exec_res_list):
+            shared['results'] = exec_res_list
+
+    shared = {}
+    await StreamingNode().run(shared)
+    assert shared['results'] == [0, 10, 20, 30, 40]
+
+
+@pytest.mark.asyncio
+async def test_stream_results_with_post_item():
+    produced = []
+
+    class StreamingNode(SequentialBatchNode):
+        async def prep(self, shared):
+            def chunks():
+                for i in range(5):
+                    produced.append(i)
+                    yield i
+            return chunks()
+
+        async def exec(self, item):
+            return item * 10
+
+        async def post_item(self, shared, item, exec_res):
+            # Each result is handed over before the next item is even produced
+            assert produced[-1] == item
+            shared.setdefault('results', []).append(exec_res)
+
+        async def post(self, shared, prep_res, exec_res_list):
+            shared['post_arg'] = exec_res_list
+            return 'done'
+
+    shared = {}
+    action = await StreamingNode().run(shared)
+    assert action == 'done'
+    assert shared['results'] == [0, 10, 20, 30, 40]
+    assert shared['post_arg'] is None
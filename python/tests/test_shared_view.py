@@ -0,0 +1,189 @@
+import pytest
+import asyncio
+from brainyflow import Node, ParallelBatchFlow, SharedView
+
+class Record(Node):
+    """Read-modify-write on the shared store with an await in between: racy without isolation."""
+    async def prep(self, shared):
+        return self.params["i"]
+
+    async def exec(self, i):
+        await asyncio.sleep(0.001 * (i % 3))
+        return i
+
+    async def post(self, shared, prep_res, i):
+        results = shared.get("results", [])
+        count = shared.get("count", 0)
+        await asyncio.sleep(0.001)
+        shared["results"] = results + [i]
+        shared["count"] = count + 1
+        shared.setdefault("by_parity", {}).setdefault(i % 2, set()).add(i)
+        shared["last"] = i
+
+class Batch(ParallelBatchFlow):
+    async def prep(self, shared):
+        return [{"i": i} for i in range(20)]
+
+@pytest.mark.asyncio
+async def test_unisolated_writes_are_lost():
+    shared = {}
+    await Batch(start=Record()).run(shared)
+    assert shared["count"] < 20
+
+class Counting(Batch):
+    def merge(self, key, base, old, new):
+        return base + new - old if key == "count" else super().merge(key, base, old, new)
+
+@pytest.mark.asyncio
+async def test_isolated_branches_merge_on_completion():
+    shared = {"results": [-1], "count": 100}
+    await Counting(start=Record(), isolate=True).run(shared)
+
+    assert shared["count"] == 120
+    assert shared["results"][0] == -1 and sorted(shared["results"][1:]) == list(range(20))
+    assert shared["by_parity"] == {0: set(range(0, 20, 2)), 1: set(range(1, 20, 2))}
+    assert shared["last"] in range(20)
+
+@pytest.mark.asyncio
+async def test_failed_branch_writes_are_dropped():
+    class Fails(Record):
+        async def post(self, shared, prep_res, i):
+            await super().post(shared, prep_res, i)
+            if i == 3:
+                raise ValueError("boom")
+
+    class Sequential(Batch):
+        async def prep(self, shared):
+            return [{"i": 3}]
+
+    shared = {"count": 0}
+    with pytest.raises(ValueError):
+        await Sequential(start=Fails(), isolate=True).run(shared)
+    assert shared == {"count": 0}
+
+@pytest.mark.asyncio
+async def test_branch_sees_its_own_copy():
+    seen = []
+
+    class Mutate(Node):
+        async def post(self, shared, prep_res, exec_res):
+            shared["config"]["branch"] = self.params["i"]
+            await asyncio.sleep(0.001)
+            seen.append(shared["config"]["branch"] == self.params["i"])
+            shared.pop("scratch", None)
+            assert "scratch" not in shared and "config" in shared
+
+    shared = {"config": {"model": "x"}, "scratch": 1}
+    await Batch(start=Mutate(), isolate=True).run(shared)
+    assert all(seen) and len(seen) == 20
+    assert shared["config"]["model"] == "x" and "scratch" not in shared
+
+@pytest.mark.asyncio
+async def test_lock_gives_live_serialized_access():
+    class Dedup(Node):
+        async def post(self, shared, prep_res, exec_res):
+            url = f"u{self.params['i'] % 5}"
+            async with shared.lock("seen"):
+                if url in shared["seen"]:
+                    return
+                await asyncio.sleep(0.001)
+                shared["seen"].add(url)
+            shared["fetched"] = shared.get("fetched", 0) + 1
+
+    shared = {"seen": set()}
+    await Batch(start=Dedup(), isolate=True).run(shared)
+    assert shared["seen"] == {f"u{i}" for i in range(5)} and shared["fetched"] == 5
+
+@pytest.mark.asyncio
+async def test_locked_in_place_writes_survive_other_branches_merge():
+    class Append(Node):
+        async def post(self, shared, prep_res, exec_res):
+            if self.params["i"] == 0:
+                shared["items"].append("A")  # on this branch's copy
+                await asyncio.sleep(0.01)
+            else:
+                async with shared.lock("items"):
+                    shared["items"].append("B")  # in the store itself
+
+    class Two(Batch):
+        async def prep(self, shared):
+            return [{"i": 0}, {"i": 1}]
+
+    shared = {"items": []}
+    await Two(start=Append(), isolate=True).run(shared)
+    assert sorted(shared["items"]) == ["A", "B"]
+
+class Grid:
+    """Like a numpy array: == compares cell by cell, and the result can't be used as a bool."""
+    def __init__(self, cells):
+        self.cells = list(cells)
+
+    def __eq__(self, other):
+        class Cells(list):
+            def __bool__(self):
+                raise ValueError("The truth value of a Grid comparison is ambiguous")
+        return Cells(a == b for a, b in zip(self.cells, other.cells))
+
+@pytest.mark.asyncio
+async def test_values_a_branch_only_read_are_not_merged():
+    class Stats:  # no __eq__: == is identity, so copies never compare equal
+        hits = 0
+
+    class Touch(Node):
+        async def post(self, shared, prep_res, exec_res):
+            stats, grid = shared["stats"], shared["grid"]  # both branches copy them before either merges
+            if self.params["i"] == 0:
+                stats.hits += 1
+                grid.cells[0] = 1
+                await asyncio.sleep(0.005)
+            else:
+                await asyncio.sleep(0.02)  # merges after branch 0, having only read both
+
+    class Two(Batch):
+        async def prep(self, shared):
+            return [{"i": 0}, {"i": 1}]
+
+    shared = {"stats": Stats(), "grid": Grid([0, 0])}
+    await Two(start=Touch(), isolate=True).run(shared)
+    assert shared["stats"].hits == 1
+    assert shared["grid"].cells == [1, 0]
+
+@pytest.mark.asyncio
+async def test_numbers_are_replaced_not_added():
+    class Price(Node):
+        async def post(self, shared, prep_res, exec_res):
+            shared["last_price"]  # read, then set: a plain assignment
+            shared["last_price"] = 100.0 + self.params["i"]
+
+    class Three(Batch):
+        async def prep(self, shared):
+            return [{"i": i} for i in range(3)]
+
+    shared = {"last_price": 99.0}
+    await Three(start=Price(), isolate=True).run(shared)
+    assert shared["last_price"] in (100.0, 101.0, 102.0)
+
+@pytest.mark.asyncio
+async def test_custom_merge():
+    class Keep(Batch):
+        def merge(self, key, base, old, new):
+            return max(base or 0, new) if key == "best" else super().merge(key, base, old, new)
+
+    class Score(Node):
+        async def post(self, shared, prep_res, exec_res):
+            shared["best"] = self.params["i"] * 7 % 20
+
+    shared = {}
+    await Keep(start=Score(), isolate=True).run(shared)
+    assert shared["best"] == 19
+
+def test_view_is_a_mapping():
+    store = {"a": 1, "b": [1]}
+    view = SharedView(store, {}, lambda k, base, old, new: new)
+    view["c"] = 3
+    view["b"].append(2)
+    del view["a"]
+    assert dict(view) == {"b": [1, 2], "c": 3} and len(view) == 2
+    assert store == {"a": 1, "b": [1]}
+    view.commit()
+    assert store == {"b": [1, 2], "c": 3}
@@ -0,0 +1,132 @@
+import pytest
+import asyncio
+import time
+from brainyflow import Node, Flow, Stream
+
+class Tokens(Node):
+    def __init__(self, tokens, delay=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.tokens, self.delay, self.produced = tokens, delay, []
+
+    async def prep(self, shared):
+        return shared.get("prompt")
+
+    async def exec(self, prompt):
+        for t in self.tokens:
+            await asyncio.sleep(self.delay)
+            self.produced.append(t)
+            yield t
+
+    async def post(self, shared, prep_res, exec_res):
+        shared["tokens"] = exec_res
+        return "default"
+
+class Reader(Node):
+    async def prep(self, shared):
+        return shared["tokens"]
+
+    async def exec(self, stream):
+        log = []
+        async for t in stream:
+            log.append((t, time.perf_counter()))
+        return log
+
+    async def post(self, shared, prep_res, exec_res):
+        shared["read"] = exec_res
+
+@pytest.mark.asyncio
+async def test_successor_consumes_tokens_as_they_arrive():
+    producer, reader = Tokens(list("abcde"), delay=0.02), Reader()
+    producer >> reader
+    shared, start = {}, time.perf_counter()
+    await Flow(start=producer).run(shared)
+
+    assert [t for t, _ in shared["read"]] == list("abcde")
+    assert isinstance(shared["tokens"], Stream)
+    # The first token reaches the successor long before the producer finishes
+    assert shared["read"][0][1] - start < 0.06
+
+@pytest.mark.asyncio
+async def test_producer_waits_for_slow_reader():
+    producer = Tokens(list(range(20)))
+    producer.stream_buffer = 3
+    stream = await producer._exec(None)
+    await asyncio.sleep(0.02)
+    assert len(producer.produced) == 4  # 3 buffered, 1 waiting for room
+
+    assert await stream.collect() == list(range(20))
+
+@pytest.mark.asyncio
+async def test_aclose_cancels_producer():
+    producer = Tokens(list(range(100)), delay=0.005)
+    stream = await producer._exec(None)
+    assert await stream.__anext__() == 0
+    await stream.aclose()
+
+    assert stream.done
+    produced = len(producer.produced)
+    await asyncio.sleep(0.03)
+    assert len(producer.produced) == produced < 100
+    assert [t async for t in stream] == list(range(1, produced))
+
+@pytest.mark.asyncio
+async def test_flow_end_cancels_unread_streams():
+    producer = Tokens(list(range(100)), delay=0.005)
+    await Flow(start=producer).run({})
+    assert len(producer.produced) < 10
+
+@pytest.mark.asyncio
+async def test_failure_before_first_token_is_retried():
+    class Flaky(Tokens):
+        async def exec(self, prompt):
+            if self.cur_retry == 0:
+                raise ConnectionError("dropped")
+            async for t in super().exec(prompt):
+                yield t
+
+    stream = await Flaky(list("ab"), max_retries=2)._exec(None)
+    assert await stream.collect() == ["a", "b"]
+
+@pytest.mark.asyncio
+async def test_failure_after_first_token_reaches_reader():
+    class Broken(Tokens):
+        async def exec(self, prompt):
+            async for t in super().exec(prompt):
+                yield t
+            raise ConnectionError("dropped mid-stream")
+
+    node = Broken(list("ab"), max_retries=3)
+    stream, got = await node._exec(None), []
+    with pytest.raises(ConnectionError, match="mid-stream"):
+        async for t in stream:
+            got.append(t)
+    assert got == ["a", "b"] and node.produced == ["a", "b"]
+
+@pytest.mark.asyncio
+async def test_fallback_result_is_streamed():
+    class Down(Tokens):
+        async def exec(self, prompt):
+            raise ConnectionError("down")
+            yield
+
+        async def exec_fallback(self, prompt, exc):
+            return "sorry"
+
+    stream = await Down([])._exec(None)
+    assert await stream.collect() == ["sorry"]
+
+@pytest.mark.asyncio
+async def test_unread_stream_error_raised_by_flow():
+    class Down(Tokens):
+        async def exec(self, prompt):
+            raise ConnectionError("down")
+            yield
+
+    class Idle(Node):
+        async def exec(self, _):
+            await asyncio.sleep(0.01)
+
+    down = Down([])
+    down >> Idle()
+    with pytest.raises(ConnectionError):
+        await Flow(start=down).run({})
@@ -1,7 +1,7 @@
 import pytest
 import asyncio
 import time
-from brainyflow import Node, ParallelBatchNode
+from brainyflow import Node, ParallelBatchNode, ParallelBatchFlow
 
 @pytest.mark.asyncio
 async def test_throttling_with_semaphore():
@@ -56,3 +56,108 @@ async def test_throttling_with_semaphore():
     print(f"Throttling test duration: {duration:.4f}s")
     assert duration >= 0.045, "Execution was too fast, throttling might not have worked"
     assert duration < 0.150, "Execution took unexpectedly long"
+
+@pytest.mark.asyncio
+async def test_builtin_max_concurrency():
+    """Tests that ParallelBatchNode keeps at most `max_concurrency` items in flight."""
+    current_concurrent = 0
+    max_concurrent = 0
+
+    class LimitedNode(ParallelBatchNode):
+        async def exec(self, item):
+            nonlocal current_concurrent, max_concurrent
+            current_concurrent += 1
+            max_concurrent = max(max_concurrent, current_concurrent)
+            await asyncio.sleep(0.01)
+            current_concurrent -= 1
+            return item * 2
+
+    node = LimitedNode(max_concurrency=3)
+    results = await node._exec(list(range(20)))
+
+    assert max_concurrent == 3, f"Expected max concurrency 3, but got {max_concurrent}"
+    assert results == [i * 2 for i in range(20)], "Results must keep input order"
+    assert current_concurrent == 0
+
+@pytest.mark.asyncio
+async def test_builtin_rate_limit():
+    """Tests that `rate_limit` spaces out item starts (token bucket, burst of `rate_limit`)."""
+    starts = []
+
+    class RateLimitedNode(ParallelBatchNode):
+        async def exec(self, item):
+            starts.append(time.monotonic())
+            return item
+
+    node = RateLimitedNode(rate_limit=50)
+    start_time = time.monotonic()
+    results = await node._exec(list(range(60)))
+    duration = time.monotonic() - start_time
+
+    # 50 tokens available immediately, the remaining 10 arrive at 50/s -> ~0.2s
+    assert results == list(range(60))
+    assert duration >= 0.18, "Execution was too fast, rate limit might not have worked"
+    assert duration < 0.5, "Execution took unexpectedly long"
+
+@pytest.mark.asyncio
+async def test_max_concurrency_cancels_remaining_on_error():
+    """Tests that a failing item stops the window and no further items are started."""
+    started = []
+
+    class FailingNode(ParallelBatchNode):
+        async def exec(self, item):
+            started.append(item)
+            await asyncio.sleep(0.01)
+            if item == 1: raise ValueError("boom")
+            return item
+
+    node = FailingNode(max_concurrency=2)
+    with pytest.raises(ValueError, match="boom"):
+        await node._exec(list(range(10)))
+    assert len(started) < 10, "Items kept being scheduled after a failure"
+
+@pytest.mark.asyncio
+async def test_parallel_batch_flow_max_concurrency():
+    """Tests that ParallelBatchFlow limits how many sub-flows run concurrently."""
+    current_concurrent = 0
+    max_concurrent = 0
+
+    class WorkNode(Node):
+        async def exec(self, prep_res):
+            nonlocal current_concurrent, max_concurrent
+            current_concurrent += 1
+            max_concurrent = max(max_concurrent, current_concurrent)
+            await asyncio.sleep(0.01)
+            current_concurrent -= 1
+
+        async def post(self, shared, prep_res, exec_res):
+            shared.setdefault('done', []).append(self.params['i'])
+
+    class LimitedFlow(ParallelBatchFlow):
+        async def prep(self, shared):
+            return [{'i': i} for i in range(10)]
+
+    shared = {}
+    await LimitedFlow(start=WorkNode(), max_concurrency=2).run(shared)
+
+    assert max_concurrent == 2, f"Expected max concurrency 2, but got {max_concurrent}"
+    assert sorted(shared['done']) == list(range(10))
+
+@pytest.mark.asyncio
+async def test_rate_limit_covers_retries():
+    """Each exec attempt takes a token, so retries can't burst past `rate_limit`."""
+    calls = []
+
+    class Flaky(ParallelBatchNode):
+        async def exec(self, item):
+            calls.append(time.monotonic())
+            raise ValueError(item)
+
+        async def exec_fallback(self, item, exc):
+            return None
+
+    start = time.monotonic()
+    await Flaky(max_retries=3, rate_limit=50)._exec(range(25))
+    assert len(calls) == 75
+    # 50 tokens at once, the other 25 attempts at 50/s -> ~0.5s
+    assert time.monotonic() - start >= 0.45
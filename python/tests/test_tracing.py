@@ -0,0 +1,108 @@
+import pytest
+import asyncio
+from brainyflow import Node, Flow, ParallelBatchNode, SequentialBatchFlow, ParallelBatchFlow, TraceRecorder, set_tracer
+
+class SleepNode(Node):
+    async def exec(self, prep_res):
+        await asyncio.sleep(0.01)
+
+    async def post(self, shared, prep_res, exec_res):
+        return 'next'
+
+class FlakyNode(Node):
+    def __init__(self):
+        super().__init__(max_retries=3)
+        self.attempts = 0
+
+    async def exec(self, prep_res):
+        self.attempts += 1
+        if self.attempts < 3:
+            raise ValueError("flaky")
+
+class DoubleBatch(ParallelBatchNode):
+    async def prep(self, shared):
+        return [1, 2, 3]
+
+    async def exec(self, item):
+        await asyncio.sleep(0.01 * item)
+        return item * 2
+
+def by_name(recorder, name):
+    return [s for s in recorder.spans if s.name == name]
+
+@pytest.fixture
+def recorder():
+    recorder = TraceRecorder()
+    set_tracer(recorder)
+    yield recorder
+    set_tracer(None)
+
+@pytest.mark.asyncio
+async def test_records_node_and_phase_spans(recorder):
+    first, second = SleepNode(), FlakyNode()
+    first - 'next' >> second
+    await Flow(start=first).run({})
+
+    node_span = by_name(recorder, 'SleepNode')[0]
+    assert node_span.attributes['brainyflow.action'] == 'next'
+    exec_span = [s for s in by_name(recorder, 'exec') if s.parent is node_span][0]
+    assert exec_span.duration >= 0.009
+    assert {s.name for s in recorder.spans if s.parent is node_span} == {'prep', 'exec', 'post'}
+
+    flaky_exec = [s for s in by_name(recorder, 'exec') if s.attributes['brainyflow.node'] == 'FlakyNode'][0]
+    assert flaky_exec.attributes['brainyflow.retries'] == 2
+
+@pytest.mark.asyncio
+async def test_records_batch_item_latency_and_queue_wait(recorder):
+    class Limited(DoubleBatch):
+        def __init__(self):
+            super().__init__(max_concurrency=1)
+
+    await Limited().run({})
+
+    items = sorted(by_name(recorder, 'item'), key=lambda s: s.attributes['brainyflow.index'])
+    assert [s.attributes['brainyflow.index'] for s in items] == [0, 1, 2]
+    assert all(s.parent.name == 'exec' for s in items)
+    assert items[2].duration >= 0.029
+    # With one slot, items are pulled lazily: the last one waits for the second (0.02s) to finish
+    assert items[2].attributes['brainyflow.queue_wait'] >= 0.019
+
+@pytest.mark.asyncio
+async def test_records_batch_flow_runs(recorder):
+    class Seq(SequentialBatchFlow):
+        async def prep(self, shared):
+            return [{'i': 0}, {'i': 1}]
+
+    class Par(ParallelBatchFlow):
+        async def prep(self, shared):
+            return [{'i': 0}, {'i': 1}, {'i': 2}]
+
+    await Seq(start=SleepNode()).run({})
+    await Par(start=SleepNode()).run({})
+
+    items = by_name(recorder, 'item')
+    assert len(items) == 5
+    assert all(any(c.parent is item and c.name == 'SleepNode' for c in recorder.spans) for item in items)
+    assert {s.name for s in recorder.spans if s.parent is None} == {'Seq', 'Par'}
+
+@pytest.mark.asyncio
+async def test_records_errors():
+    class Broken(Node):
+        async def exec(self, prep_res):
+            raise RuntimeError("broken")
+
+    recorder = TraceRecorder()
+    set_tracer(recorder)
+    try:
+        with pytest.raises(RuntimeError):
+            await Broken().run({})
+    finally:
+        set_tracer(None)
+    assert isinstance(by_name(recorder, 'exec')[0].error, RuntimeError)
+    assert by_name(recorder, 'exec')[0].attributes['brainyflow.fallback'] is True
+
+@pytest.mark.asyncio
+async def test_no_spans_without_tracer():
+    recorder = TraceRecorder()
+    await Flow(start=SleepNode()).run({})
+    assert recorder.spans == []